@@ -1 +1,2 @@
-from MissingValuesHandler.missing_data_handler import RandomForestImputer
\ No newline at end of file
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+from MissingValuesHandler.constants import VERSION as __version__
\ No newline at end of file
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - pack_histories
+                            - unpack_histories
+                            - write_checkpoint
+                            - read_checkpoint
+******************************************************************************
+Training checkpoints. A checkpoint is made of two files in its directory:
+    - checkpoint_<round>.npz: numpy arrays only(coordinates of the missing
+      values, their substitutes, convergence history...), no pickle
+    - checkpoint.json: metadata(training arguments, names of the features,
+      modalities...) and the name of the npz file
+Both are written to temporary files first and moved in place with os.replace:
+the json file, written last, always points to a complete npz file even if the
+process is killed while checkpointing.
+"""
+import json
+import os
+import numpy as np
+import MissingValuesHandler.custom_exceptions as customs
+
+
+METADATA_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
+
+def pack_histories(histories, categorical, modalities):
+    """
+    Flattens lists of substitutes into a single float64 array. Categorical
+    values are replaced with their code in 'modalities'.
+
+    Parameters
+    ----------
+    histories : list
+        Lists of substitutes.
+    categorical : list
+        True for every history of categorical values.
+    modalities : dict
+        modality -> code, updated with the new modalities.
+
+    Returns
+    -------
+    offsets : numpy.ndarray
+        History i is values[offsets[i]:offsets[i+1]].
+    values : numpy.ndarray
+    """
+    offsets = np.zeros(len(histories) + 1, dtype=np.int64)
+    values = []
+    for index, (history, is_categorical) in enumerate(zip(histories,
+                                                          categorical)):
+        if is_categorical:
+            values.extend(modalities.setdefault(value, len(modalities))
+                          for value in history)
+        else:
+            values.extend(history)
+        offsets[index + 1] = len(values)
+    return offsets, np.asarray(values, dtype=np.float64)
+
+
+def unpack_histories(offsets, values):
+    """
+    Parameters
+    ----------
+    offsets : numpy.ndarray
+
+    values : numpy.ndarray
+
+    Returns
+    -------
+    list
+        Arrays of substitutes(categorical values are still codes).
+    """
+    return [values[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _replace_atomically(path, write):
+    """
+    Parameters
+    ----------
+    path : str
+
+    write : function
+        Writes the file given its path.
+
+    Returns
+    -------
+    None
+    """
+    temporary_path = f"{path}.tmp"
+    write(temporary_path)
+    os.replace(temporary_path, path)
+
+
+def write_checkpoint(directory, arrays, metadata):
+    """
+    Parameters
+    ----------
+    directory : str
+
+    arrays : dict
+        name -> numpy.ndarray
+    metadata : dict
+        JSON serializable. Must contain the round of iterations("round").
+
+    Returns
+    -------
+    None
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays_file = f"checkpoint_{metadata['round']}.npz"
+    def write_arrays(path):
+        with open(path, "wb") as file:
+            np.savez_compressed(file, **arrays)
+    def write_metadata(path):
+        with open(path, "w") as file:
+            json.dump({**metadata,
+                       "version":CHECKPOINT_VERSION,
+                       "arrays":arrays_file}, file)
+    _replace_atomically(os.path.join(directory, arrays_file), write_arrays)
+    _replace_atomically(os.path.join(directory, METADATA_FILE), write_metadata)
+    #Previous checkpoints are no longer referenced
+    for file_name in os.listdir(directory):
+        if (file_name.startswith("checkpoint_") and
+            file_name.endswith(".npz") and file_name != arrays_file):
+            os.remove(os.path.join(directory, file_name))
+
+
+def read_checkpoint(directory):
+    """
+    Parameters
+    ----------
+    directory : str
+
+    Raises
+    ------
+    customs.CheckpointError
+
+    Returns
+    -------
+    arrays : dict
+        name -> numpy.ndarray
+    metadata : dict
+    """
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        raise customs.CheckpointError(f"No checkpoint found in '{directory}'")
+    with open(metadata_path) as file:
+        metadata = json.load(file)
+    if metadata.get("version") != CHECKPOINT_VERSION:
+        text = f"Unsupported checkpoint version: {metadata.get('version')}"
+        raise customs.CheckpointError(text)
+    with np.load(os.path.join(directory, metadata["arrays"]),
+                 allow_pickle=False) as arrays:
+        return dict(arrays), metadata
@@ -1,4 +1,28 @@
 # -*- coding: utf-8 -*-
+#Version of the package(keep in sync with setup.py)
+VERSION = "1.1.3"
 NUMERICAL   = "numerical"
 CATEGORICAL = "categorical"
 IMG_EXTENSION = ".png"
+STRATIFIED = "stratified"
+LEAF_DIVERSE = "leaf_diverse"
+ABSOLUTE = "absolute"
+IQR = "iqr"
+STD = "std"
+ORDINAL = "ordinal"
+FREQUENCY = "frequency"
+TARGET = "target"
+CONVERGED = "converged"
+IN_PROGRESS = "in progress"
+INITIAL_GUESS = "initial guess"
+CELL = "cell"
+GRID = "grid"
+PDF = "pdf"
+SMACOF = "smacof"
+CLASSICAL = "classical"
+LANDMARK = "landmark"
+DENSE = "dense"
+RESTRICTED = "restricted"
+MEMMAP = "memmap"
+SPARSE_TOP_K = "sparse_topk"
+APPROXIMATE = "approximate"
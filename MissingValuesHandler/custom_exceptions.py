@@ -61,6 +61,182 @@ class TrainingResilienceValueError(Exception):
        else:
            return 'training_resilience must be greater or equal to 2'
     
+    
+class TypeInferenceBackendError(Exception):
+   """Raised when the type inference backend is unknown"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'unknown type inference backend'
+    
+    
+class ProximityParametersError(Exception):
+   """Raised when a proximity parameter is invalid"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'invalid proximity parameter'
+    
+    
+class ConvergenceParametersError(Exception):
+   """Raised when convergence parameters are invalid"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'Invalid convergence parameters'
+    
+    
+class EncodingParametersError(Exception):
+   """Raised when encoding parameters are invalid"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'Invalid encoding parameters'
+    
+    
+class EnsembleBackendError(Exception):
+   """Raised when an ensemble backend can't be used"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'Invalid ensemble backend'
+    
+    
+class CheckpointError(Exception):
+   """Raised when a checkpoint can't be read or doesn't match the data"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'Invalid checkpoint'
+    
+    
+class PlotLayoutError(Exception):
+   """Raised when an unknown plot layout is requested"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return "Plot layout must be 'cell', 'grid' or 'pdf'"
+    
+    
+class MdsMethodError(Exception):
+   """Raised when an unknown MDS method is requested"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return "MDS method must be 'smacof', 'classical' or 'landmark'"
+    
+    
+class ResourceLimitError(Exception):
+   """Raised when no training strategy fits the memory and time limits"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'No strategy fits the memory and time limits'
+    
+    
+class DistanceMatrixShapeError(Exception):
+   """Raised when multidimensional scaling is given a non square distance matrix"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'MDS needs a square distance matrix'
+    
+    
+class AsyncExecutorError(Exception):
+   """Raised when train_async is given an executor running stages in other processes"""
+   
+   def __init__(self, message=None):
+       if message:
+           self.message=message
+       else:
+           self.message=None
+           
+   def __str__(self):
+       if self.message:
+           return "{}".format(self.message)
+       else:
+           return 'train_async needs a thread executor'
+    
 
     
 
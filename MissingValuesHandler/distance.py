@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - DistanceMatrix
+******************************************************************************
+Distance matrix(1 - proximity matrix) computed on demand from the proximity
+matrix instead of being stored next to it. The proximity matrix can be a
+numpy array, a numpy.memmap or a scipy sparse matrix(unstored proximities are
+0: distances of 1). Rows or blocks of rows are computed in float32 when they
+are indexed; the whole matrix only when a consumer needs a dense array.
+"""
+import numpy as np
+from scipy.sparse import issparse
+
+
+#Number of elements of a block of rows
+BLOCK_SIZE = 2**22
+
+
+class DistanceMatrix():
+    """
+    Lazy 1 - proximity matrix. Supports indexing(numpy semantics, the result
+    being a dense array), len, shape and np.asarray.
+    """
+    def __init__(self, proximity_matrix, dtype=np.float32):
+        """
+        Parameters
+        ----------
+        proximity_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+            Not copied.
+        dtype : numpy.dtype, optional
+            dtype of the distances. The default is np.float32.
+
+        Returns
+        -------
+        None
+        """
+        self._proximity_matrix = proximity_matrix
+        self.dtype = np.dtype(dtype)
+
+
+    @property
+    def shape(self):
+        return self._proximity_matrix.shape
+
+
+    @property
+    def ndim(self):
+        return 2
+
+
+    def __len__(self):
+        return self.shape[0]
+
+
+    def __getitem__(self, key):
+        """
+        Parameters
+        ----------
+        key : int, slice, array or tuple of them
+
+        Returns
+        -------
+        numpy.ndarray or scalar
+            Distances of the entries selected by 'key'.
+        """
+        proximities = self._proximity_matrix[key]
+        if issparse(proximities):
+            proximities = proximities.toarray()
+        #Copy: the proximities are never modified
+        distances = np.array(proximities, dtype=self.dtype)
+        np.subtract(1, distances, out=distances)
+        return distances if distances.ndim else distances[()]
+
+
+    def iter_blocks(self, block_size=BLOCK_SIZE):
+        """
+        Parameters
+        ----------
+        block_size : int, optional
+            Number of elements of a block. The default is BLOCK_SIZE.
+
+        Yields
+        ------
+        start : int
+            Position of the first row of the block.
+        numpy.ndarray
+            Distances of the rows of the block.
+        """
+        block_rows = max(1, block_size // max(1, self.shape[1]))
+        for start in range(0, self.shape[0], block_rows):
+            yield start, self[start:start + block_rows]
+
+
+    def toarray(self, out=None):
+        """
+        Materializes the distance matrix, block by block.
+
+        Parameters
+        ----------
+        out : numpy.ndarray, optional
+            Array(or numpy.memmap) of the same shape to fill. The default is
+            None: a new array is allocated.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=self.dtype)
+        for start, block in self.iter_blocks():
+            out[start:start + len(block)] = block
+        return out
+
+
+    def __array__(self, dtype=None):
+        distances = self.toarray()
+        return distances if dtype is None else distances.astype(dtype,
+                                                                copy=False)
+
+
+    def __repr__(self):
+        return (f"DistanceMatrix(shape={self.shape}, dtype={self.dtype}, "
+                f"proximities={type(self._proximity_matrix).__name__})")
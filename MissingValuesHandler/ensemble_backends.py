@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - EnsembleBackend
+                            - RandomForestBackend
+                            - ExtraTreesBackend
+                            - EstimatorBackend
+                            - get_backend
+******************************************************************************
+Ensemble backends build the tree ensemble used to compute proximities. The
+ensemble must:
+    - grow with warm_start(additional estimators are added while the out of
+      bag score improves)
+    - expose an out of bag score(oob_score_) once fitted
+    - expose its trees(estimators_), each of them able to predict, and the
+      leaf of every sample(apply)
+"""
+from sklearn.base import clone
+import MissingValuesHandler.custom_exceptions as customs
+import MissingValuesHandler.constants as const
+
+
+class EnsembleBackend():
+    """
+    Base class of ensemble backends.
+    """
+    name = None
+
+    @property
+    def cache_key(self):
+        """
+        Identifies the backend and its settings(see result_cache).
+
+        Returns
+        -------
+        tuple
+        """
+        return (self.name,)
+
+
+    def build(self, type_, parameters):
+        """
+        Parameters
+        ----------
+        type_ : str
+            Type of the target variable: const.CATEGORICAL or const.NUMERICAL.
+        parameters : dict
+            Parameters set with set_ensemble_model_parameters(n_estimators,
+            max_depth, oob_score, warm_start...).
+
+        Returns
+        -------
+        Unfitted ensemble model.
+        """
+        raise NotImplementedError
+
+
+    @staticmethod
+    def _check_interface(estimator):
+        """
+        Parameters
+        ----------
+        estimator :
+            Unfitted ensemble model.
+
+        Raises
+        ------
+        customs.EnsembleBackendError
+
+        Returns
+        -------
+        Unfitted ensemble model.
+        """
+        estimator_parameters = estimator.get_params()
+        missing = [name for name in ("n_estimators", "oob_score", "warm_start")
+                   if name not in estimator_parameters]
+        if not hasattr(estimator, "apply"):
+            missing.append("apply")
+        if missing:
+            text = (f"{type(estimator).__name__} can't be used to build "
+                    f"proximities, it lacks: {missing}")
+            raise customs.EnsembleBackendError(text)
+        return estimator
+
+
+class _SklearnEnsembleBackend(EnsembleBackend):
+    """
+    Scikit-Learn ensembles taking every parameter of
+    set_ensemble_model_parameters.
+    """
+    classifier = None
+    regressor = None
+
+    def build(self, type_, parameters):
+        Model = {const.CATEGORICAL:self.classifier,
+                 const.NUMERICAL:self.regressor}
+        return self._check_interface(Model[type_](**parameters))
+
+
+class RandomForestBackend(_SklearnEnsembleBackend):
+    """
+    Random forest: exact split search on bootstrap samples(default).
+    """
+    name = "random_forest"
+
+    @property
+    def classifier(self):
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier
+
+
+    @property
+    def regressor(self):
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor
+
+
+class ExtraTreesBackend(_SklearnEnsembleBackend):
+    """
+    Extremely randomized trees: thresholds are drawn at random instead of
+    being searched, which makes fitting much cheaper. Proximities are usually
+    good enough for imputation(see benchmarks/ensemble_backends.py).
+    """
+    name = "extra_trees"
+
+    @property
+    def classifier(self):
+        from sklearn.ensemble import ExtraTreesClassifier
+        return ExtraTreesClassifier
+
+
+    @property
+    def regressor(self):
+        from sklearn.ensemble import ExtraTreesRegressor
+        return ExtraTreesRegressor
+
+
+class EstimatorBackend(EnsembleBackend):
+    """
+    User supplied ensemble models(one for a categorical target variable, one
+    for a numerical one). They are cloned for every model built and keep
+    their own hyperparameters: only the parameters the imputer relies on
+    (number of estimators, bootstrap, out of bag score and warm start) are
+    set.
+    """
+    name = "estimator"
+    controlled_parameters = ("n_estimators", "bootstrap", "oob_score",
+                             "warm_start")
+
+    def __init__(self, classifier=None, regressor=None):
+        """
+        Parameters
+        ----------
+        classifier : Scikit-Learn compatible ensemble classifier, optional
+            The default is None.
+        regressor : Scikit-Learn compatible ensemble regressor, optional
+            The default is None.
+
+        Returns
+        -------
+        None
+        """
+        self._estimators = {const.CATEGORICAL:classifier,
+                            const.NUMERICAL:regressor}
+        for estimator in self._estimators.values():
+            if estimator is not None:
+                self._check_interface(estimator)
+
+
+    @property
+    def cache_key(self):
+        return (self.name,) + tuple(repr(estimator) for estimator 
+                                    in self._estimators.values())
+
+
+    def build(self, type_, parameters):
+        estimator = self._estimators[type_]
+        if estimator is None:
+            text = f"No estimator given for a {type_} target variable"
+            raise customs.EnsembleBackendError(text)
+        estimator = clone(estimator)
+        known_parameters = estimator.get_params()
+        estimator.set_params(**{name:parameters[name]
+                                for name in self.controlled_parameters
+                                if name in known_parameters})
+        return estimator
+
+
+BACKENDS = {RandomForestBackend.name:RandomForestBackend,
+            ExtraTreesBackend.name:ExtraTreesBackend}
+
+
+def get_backend(backend):
+    """
+    Parameters
+    ----------
+    backend : str or EnsembleBackend
+        "random_forest", "extra_trees" or an EnsembleBackend instance.
+
+    Raises
+    ------
+    customs.EnsembleBackendError
+
+    Returns
+    -------
+    EnsembleBackend
+    """
+    if isinstance(backend, EnsembleBackend):
+        return backend
+    if backend in BACKENDS:
+        return BACKENDS[backend]()
+    text = (f"Unknown ensemble backend '{backend}'. Use one of "
+            f"{list(BACKENDS)} or an EnsembleBackend instance")
+    raise customs.EnsembleBackendError(text)
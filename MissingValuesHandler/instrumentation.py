@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - Instrumentation
+                            - ProgressDisplay
+******************************************************************************
+Every stage of the training emits one event (a dict) to the callbacks
+registered by the user. An event contains:
+    - stage: name of the stage
+    - iteration: iteration the stage belongs to (0 before the first one)
+    - start: start of the stage in seconds, relative to the beginning of
+      training
+    - wall_time / cpu_time: in seconds
+    - peak_rss: peak resident set size of the process in bytes (None if it
+      can't be retrieved on the platform)
+    - n_items: number of items processed by the stage (rows, cells...)
+    - n_estimators / oob_score: size and out of bag score of the current
+      ensemble model (None before the first model is built)
+When allocation tracing is enabled(tracemalloc), events also contain:
+    - allocated: bytes still allocated at the end of the stage minus bytes
+      allocated at its beginning
+    - peak_allocated: highest number of bytes allocated during the stage,
+      above the bytes allocated at its beginning
+    - traced_peak: highest number of bytes allocated during the stage
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+
+def _peak_rss():
+    """
+    Peak resident set size of the current process.
+
+    Returns
+    -------
+    int or None
+        Bytes. None if it can't be retrieved.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        memory_info = psutil.Process().memory_info()
+        return getattr(memory_info, "peak_wset", memory_info.rss)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Instrumentation():
+    """
+    Collects stage events and dispatches them to registered callbacks.
+    """
+    def __init__(self):
+        self._callbacks = []
+        self._events = []
+        self._origin = time.perf_counter()
+        self.iteration = 0
+        #Allocation tracing: [allocated at the beginning, peak so far] of 
+        #every running stage(stages can be nested)
+        self._trace_allocations = False
+        self._started_tracemalloc = False
+        self._running_stages = []
+
+
+    def set_allocation_tracing(self, enabled):
+        """
+        Starts or stops tracing the allocations of every stage with 
+        tracemalloc(slows training down).
+
+        Parameters
+        ----------
+        enabled : bool
+
+        Returns
+        -------
+        None
+        """
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not enabled and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._trace_allocations = enabled
+        self._running_stages = []
+
+
+    def start_stage(self):
+        """
+        Called at the beginning of every stage.
+
+        Returns
+        -------
+        None
+        """
+        if not self._trace_allocations:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        if self._running_stages:
+            #The peak of the parent stage must survive reset_peak
+            parent = self._running_stages[-1]
+            parent[1] = max(parent[1], peak)
+        tracemalloc.reset_peak()
+        self._running_stages.append([current, current])
+
+
+    def _stop_stage(self):
+        """
+        Returns
+        -------
+        dict
+            Allocation fields of the event of the stage that just finished.
+        """
+        if not self._trace_allocations or not self._running_stages:
+            return {}
+        current, peak = tracemalloc.get_traced_memory()
+        start, peak_so_far = self._running_stages.pop()
+        peak = max(peak, peak_so_far)
+        if self._running_stages:
+            parent = self._running_stages[-1]
+            parent[1] = max(parent[1], peak)
+        return {"allocated":current - start,
+                "peak_allocated":peak - start,
+                "traced_peak":peak}
+
+
+    def subscribe(self, callback):
+        """
+        Parameters
+        ----------
+        callback : callable
+            Called with every stage event (dict).
+
+        Returns
+        -------
+        None
+        """
+        if callback not in self._callbacks:
+            self._callbacks.append(callback)
+
+
+    def unsubscribe(self, callback):
+        """
+        Parameters
+        ----------
+        callback : callable
+
+        Returns
+        -------
+        None
+        """
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+
+    def reset(self):
+        """
+        Forgets previous events. Called at the beginning of every training.
+
+        Returns
+        -------
+        None
+        """
+        self._events = []
+        self._origin = time.perf_counter()
+        self.iteration = 0
+        self._running_stages = []
+
+
+    def get_events(self):
+        """
+        Returns
+        -------
+        list
+            All events emitted since the last reset.
+        """
+        return list(self._events)
+
+
+    def emit(self, event):
+        """
+        Stores an event and sends it to every callback.
+
+        Parameters
+        ----------
+        event : dict
+
+        Returns
+        -------
+        None
+        """
+        self._events.append(event)
+        for callback in list(self._callbacks):
+            callback(event)
+
+
+    def record(self, stage, start, cpu_start, **fields):
+        """
+        Builds and emits the event of a stage that just finished.
+
+        Parameters
+        ----------
+        stage : str
+
+        start : float
+            time.perf_counter() at the beginning of the stage.
+        cpu_start : float
+            time.process_time() at the beginning of the stage.
+        **fields :
+            n_items, n_estimators, oob_score...
+
+        Returns
+        -------
+        None
+        """
+        event = {"stage":stage,
+                 "iteration":self.iteration,
+                 "start":start - self._origin,
+                 "wall_time":time.perf_counter() - start,
+                 "cpu_time":time.process_time() - cpu_start,
+                 "peak_rss":_peak_rss()}
+        event.update(self._stop_stage())
+        event.update(fields)
+        self.emit(event)
+
+
+    def export_trace(self, path):
+        """
+        Writes the events in the trace event JSON format (chrome://tracing,
+        Perfetto...).
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        None
+        """
+        pid = os.getpid()
+        trace_events = []
+        for event in self._events:
+            args = {key:value for key, value in event.items()
+                    if key not in ("stage", "start", "wall_time")}
+            trace_events.append({"name":event["stage"],
+                                 "cat":"training",
+                                 "ph":"X",
+                                 "ts":event["start"]*1e6,
+                                 "dur":event["wall_time"]*1e6,
+                                 "pid":pid,
+                                 "tid":0,
+                                 "args":args})
+        with open(path, "w") as trace_file:
+            json.dump({"traceEvents":trace_events,
+                       "displayTimeUnit":"ms"}, trace_file)
+
+
+class ProgressDisplay():
+    """
+    Optional subscriber: prints one line per stage on the console.
+    """
+    def __init__(self, stream=None):
+        self._stream = stream
+
+
+    def __call__(self, event):
+        text = (f"[{event['iteration']}-{event['stage'].upper()}]: "
+                f"{event['wall_time']:.2f}s")
+        if event.get("n_items") is not None:
+            text += f" - {event['n_items']} ITEM(S)"
+        if event["stage"] == "building proximity matrix":
+            text += (f" - TREES/OOB {event['n_estimators']}"
+                     f"/{event['oob_score']}")
+        print(text, file=self._stream or sys.stdout)
+
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - squared_distance_blocks
+                            - classical_mds
+                            - maxmin_landmarks
+                            - landmark_mds
+                            - subsample
+******************************************************************************
+Multidimensional scaling of distance matrices too big for SMACOF(iterative,
+O(n²) per step). The distance matrix is only read by blocks of rows: it can be
+a numpy array, a numpy.memmap or a scipy sparse matrix(unstored entries are
+distances of 0, as in any scipy matrix).
+    - classical: double centered squared distances, top eigenvectors computed
+      with a truncated eigensolver(Lanczos, scipy eigsh) that only needs
+      products with the matrix: O(n²) per product, no n*n matrix allocated
+    - landmark: classical MDS of the distances between n_landmarks rows
+      chosen with maxmin, the other rows are placed from their distances to
+      the landmarks(de Silva & Tenenbaum). Reads n_landmarks rows only
+"""
+import numpy as np
+from scipy.sparse import issparse
+from scipy.sparse.linalg import LinearOperator, eigsh
+
+
+#Number of elements of a block of rows
+BLOCK_SIZE = 2**22
+
+
+def _dense_rows(distance_matrix, rows):
+    """
+    Parameters
+    ----------
+    distance_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+
+    rows : slice or numpy.ndarray
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 rows.
+    """
+    block = distance_matrix[rows]
+    if issparse(block):
+        block = block.toarray()
+    return np.asarray(block, dtype=np.float64)
+
+
+def squared_distance_blocks(distance_matrix):
+    """
+    Parameters
+    ----------
+    distance_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+
+    Yields
+    ------
+    start : int
+        Position of the first row of the block.
+    numpy.ndarray
+        Squared distances of the rows of the block.
+    """
+    n_samples = distance_matrix.shape[0]
+    block_rows = max(1, BLOCK_SIZE // max(1, distance_matrix.shape[1]))
+    for start in range(0, n_samples, block_rows):
+        yield start, _dense_rows(distance_matrix,
+                                 slice(start, start + block_rows))**2
+
+
+def _top_eigenpairs(matrix, n_dimensions):
+    """
+    Top eigenpairs of a small symmetric matrix, negative eigenvalues being
+    clipped to 0.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    order = np.argsort(eigenvalues)[::-1][:n_dimensions]
+    return np.clip(eigenvalues[order], 0, None), eigenvectors[:, order]
+
+
+def classical_mds(distance_matrix, n_dimensions, random_state=None):
+    """
+    Parameters
+    ----------
+    distance_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+        Symmetric n*n distances.
+    n_dimensions : int
+        < n
+    random_state : int, optional
+        Seeds the starting vector of the eigensolver. The default is None.
+
+    Returns
+    -------
+    numpy.ndarray
+        n*n_dimensions coordinates.
+    """
+    n_samples = distance_matrix.shape[0]
+    #B = -1/2 * J * D² * J with J the centering matrix. D² being symmetric:
+    #B.x = -1/2 * (D².x - means * sum(x) - (means.x) + grand_mean * sum(x))
+    means = np.empty(n_samples)
+    for start, block in squared_distance_blocks(distance_matrix):
+        means[start:start + len(block)] = block.mean(axis=1)
+    grand_mean = means.mean()
+
+    def matvec(vector):
+        vector = np.ravel(vector)
+        product = np.empty(n_samples)
+        for start, block in squared_distance_blocks(distance_matrix):
+            product[start:start + len(block)] = block @ vector
+        total = vector.sum()
+        return -0.5*(product - means*total - means @ vector + grand_mean*total)
+
+    operator = LinearOperator((n_samples, n_samples),
+                              matvec=matvec,
+                              dtype=np.float64)
+    #B.1 = 0: the starting vector must not be constant
+    start_vector = np.random.RandomState(random_state).uniform(size=n_samples)
+    eigenvalues, eigenvectors = eigsh(operator,
+                                      k=n_dimensions,
+                                      which="LA",
+                                      v0=start_vector)
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues = np.clip(eigenvalues[order], 0, None)
+    return eigenvectors[:, order] * np.sqrt(eigenvalues)
+
+
+def maxmin_landmarks(distance_matrix, n_landmarks, random_state=None):
+    """
+    Landmarks spread over the data: the first one is drawn at random, the
+    next one is always the row farthest from the landmarks already chosen.
+
+    Parameters
+    ----------
+    distance_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+
+    n_landmarks : int
+
+    random_state : int, optional
+        The default is None.
+
+    Returns
+    -------
+    numpy.ndarray
+        Positions of the landmarks, in the order they were chosen.
+    """
+    n_samples = distance_matrix.shape[0]
+    landmarks = [np.random.RandomState(random_state).randint(n_samples)]
+    min_distances = _dense_rows(distance_matrix, landmarks)[0]
+    for _ in range(n_landmarks - 1):
+        min_distances[landmarks[-1]] = -1
+        landmarks.append(int(np.argmax(min_distances)))
+        min_distances = np.minimum(min_distances,
+                                   _dense_rows(distance_matrix,
+                                               landmarks[-1:])[0])
+    return np.array(landmarks)
+
+
+def landmark_mds(distance_matrix,
+                 n_dimensions,
+                 n_landmarks=1000,
+                 random_state=None):
+    """
+    Parameters
+    ----------
+    distance_matrix : numpy.ndarray, numpy.memmap or scipy sparse matrix
+        Symmetric n*n distances.
+    n_dimensions : int
+        < n_landmarks
+    n_landmarks : int, optional
+        Capped to n. The default is 1000.
+    random_state : int, optional
+        Seeds the choice of the first landmark. The default is None.
+
+    Returns
+    -------
+    coordinates : numpy.ndarray
+        n*n_dimensions coordinates.
+    landmarks : numpy.ndarray
+        Positions of the landmarks.
+    """
+    n_samples = distance_matrix.shape[0]
+    n_landmarks = min(n_landmarks, n_samples)
+    landmarks = maxmin_landmarks(distance_matrix, n_landmarks, random_state)
+    #Landmark rows(squared distances to every row, D symmetric) are read by
+    #blocks: n_landmarks*n never lives in memory
+    block_rows = max(1, BLOCK_SIZE // max(1, distance_matrix.shape[1]))
+    def landmark_blocks():
+        for start in range(0, n_landmarks, block_rows):
+            rows = landmarks[start:start + block_rows]
+            yield start, _dense_rows(distance_matrix, rows)**2
+    landmark_distances = np.empty((n_landmarks, n_landmarks))
+    for start, block in landmark_blocks():
+        landmark_distances[start:start + len(block)] = block[:, landmarks]
+    means = landmark_distances.mean(axis=0)
+    centered = (landmark_distances
+                - means[None, :]
+                - means[:, None]
+                + means.mean())
+    eigenvalues, eigenvectors = _top_eigenpairs(-0.5*centered, n_dimensions)
+    #Rows are placed with the pseudo inverse of the landmarks coordinates
+    kept = eigenvalues > 0
+    pseudo_inverse = np.zeros((n_landmarks, n_dimensions))
+    pseudo_inverse[:, kept] = eigenvectors[:, kept]/np.sqrt(eigenvalues[kept])
+    coordinates = np.zeros((n_samples, n_dimensions))
+    for start, block in landmark_blocks():
+        end = start + len(block)
+        coordinates += ((block - means[start:end, None]).T 
+                        @ pseudo_inverse[start:end])
+    return -0.5*coordinates, landmarks
+
+
+def subsample(n_points, max_points, random_state=None):
+    """
+    Parameters
+    ----------
+    n_points : int
+
+    max_points : int
+
+    random_state : int, optional
+        The default is None.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted positions of at most max_points points drawn uniformly.
+    """
+    if n_points <= max_points:
+        return np.arange(n_points)
+    random_state = np.random.RandomState(random_state)
+    return np.sort(random_state.choice(n_points, max_points, replace=False))
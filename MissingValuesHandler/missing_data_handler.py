@@ -4,11 +4,26 @@ Created on Mon Nov  4 18:46:50 2019
 
 @author: Yannick Avokandoto
 """
-from pandas import concat
+from pandas import concat, DataFrame
 from collections import defaultdict
+import numpy as np
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import time
+from MissingValuesHandler.instrumentation import Instrumentation
+import MissingValuesHandler.planner as planner
+import MissingValuesHandler.custom_exceptions as customs
+import MissingValuesHandler.constants as const
+from MissingValuesHandler.checkpoint import read_checkpoint
+from MissingValuesHandler.result_cache import (ResultCache, 
+                                                fingerprint, 
+                                                library_versions)
+from MissingValuesHandler.sampling import (stream_stratified_sample, 
+                                           rewrite_csv)
 from MissingValuesHandler.mixins import (DataPreprocessingMixin, 
                                         ModelMixin, 
-                                        PlotMixin)
+                                        PlotMixin,
+                                        Decorators)
 
 
 class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
@@ -39,37 +54,61 @@ class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
             - protected method: _separate_features_and_target_variable
             - protected method: _predict_feature_type
             - protected method: _predict_target_variable_type
+            - protected method: _run_stage
+            - protected method: _compact_data
             
         2- We retrieve the missing values coordinates(row and column) 
         and fill in the nan cells with initial values:
             - protected method: _retrieve_nan_coordinates
+            - protected method: _compute_feature_scales
+            - protected method: _compute_bin_edges
             - protected method: _make_initial_guesses
             
         3- We encode the features and the target variables if they 
         need to be encoded. As of yet, decision trees in Scikit-Learn 
         don't handle categorical variables. So encoding is necessary:
             - protected method: _encode_features
+            - protected method: _bin_numerical_features
+            - protected method: _encode_high_cardinality_features
+            - protected method: _target_encoding
+            - protected method: _one_hot_encode
+            - protected method: _build_sparse_encoded_features
+            - protected method: _encoded_rows
+            - protected method: _encoded_width
             - protected method: _encode_target_variable
     
     II - ModelMixin
         4- We build our model, fit it, evaluate it and we keep the model having 
         the best out of bag score. We then use it to build the proximity matrix:
             - protected method: _build_ensemble_model
+            - protected method: _scheduled_forest_size
             - protected method: _fit_and_evaluate_ensemble_model
-            - protected method: _fill_one_modality
-            - protected method: _build_proximity_matrices
+            - protected method: _nan_positions
+            - protected method: _accumulate_proximities
+            - protected method: _select_landmarks
+            - protected method: _select_leaf_diverse_landmarks
+            - protected method: _build_landmark_proximity_matrix
             - public method : build_proximity_matrix
         
         5- We use the proximity matrix to compute weighted averages for all 
         missing values(both in categorical and numerical variables):
             - protected method: _compute_weighted_averages
+            - protected method: _reference_proximities
             - protected method: _replace_missing_values_in_encoded_dataframe
             
         6- We check if every value that has been replaced has converged after 
         n iterations. If that's not the case, we go back to step 3 and go for 
         another round of n iterations:
             - protected method: _compute_std_and_entropy
+            - protected method: _check_and_remove_convergent_values
+            - protected method: _feature_tolerance
+            - protected method: _is_stalled
             - protected method: _check_for_final_convergence
+            - protected method: _update_forest_budget
+            - protected method: _deadline_reached
+            - protected method: _build_convergence_report
+            - protected method: _save_checkpoint
+            - protected method: _restore_checkpoint
             - protected method: _replace_missing_values_in_features_frame
         
         7- We keep the last predictions for the missing target values(if any):
@@ -77,24 +116,54 @@ class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
             - protected method: _replace_missing_values_in_target_variable
     
     III - PlotMixin
-        - protected method: _numerical_categorical_plots
+        - protected method: _history_plot_item
+        - protected method: _render_plots
         - public method: get_mds_coordinates
         - public method: show_mds_plot
         - public method: create_weighted_averages_plots
         - public method: create_target_pred_plot
         
     IV - RandomForestImputer
+        - class method: from_csv
+        - public  method: set_result_cache
+        - protected method: _result_cache_key
         - protected method: _save_new_dataset
         - protected method: _reinitialize_key_vars
+        - protected method: _preprocess
+        - protected method: _planning_workload
+        - protected method: _apply_plan
+        - public  method: plan
+        - protected method: _training_stages
+        - protected method: _build_final_dataset
+        - protected method: _next_stage
+        - protected method: _put_latest
+        - protected method: _run_to_completion
         - public  method: train
+        - public  method: resume
+        - public  method: train_async
+        
+    INSTRUMENTATION WITH:
+       - public method: add_stage_callback
+       - public method: remove_stage_callback
+       - public method: set_allocation_tracing
+       - public method: get_allocation_report
+       - public method: get_stage_events
+       - public method: export_trace
         
     DATA RETRIEVAL WITH:
        - public method: get_ensemble_model_parameters
+       - public method: get_proximity_parameters
+       - public method: get_convergence_parameters
+       - public method: get_convergence_report
+       - public method: get_plan
+       - public method: get_encoding_parameters
+       - public method: get_landmarks
        - public method: get_features_type_predictions
        - public method: get_sample
        - public method: get_target_variable_type_prediction
        - public method: get_ensemble_model
        - public method: get_encoded_features
+       - public method: get_encoded_feature_names
        - public method: get_target_variable_encoded
        - public method: get_proximity_matrix
        - public method: get_distance_matrix
@@ -105,22 +174,278 @@ class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
        - public method: create_weighted_averages_plots
        - public method: create_target_pred_plot
     """       
+    #Attributes restored with the final dataset when a result is cached
+    _CACHED_ATTRIBUTES = ("_features_type_predictions",
+                          "_target_var_type_prediction",
+                          "_data_null_index",
+                          "_has_converged",
+                          "_converged_values",
+                          "_divergent_values",
+                          "_all_weighted_averages",
+                          "_nan_target_variable_preds",
+                          "_predicted_target_value",
+                          "_nan_values_remaining_history",
+                          "_convergence_report")
+    
     def __init__(self,
                  data, 
                  target_variable_name, 
                  ordinal_features_list=None, 
                  forbidden_features_list=None, 
                  training_resilience=2,  
-                 n_iterations_for_convergence=5):
+                 n_iterations_for_convergence=5,
+                 type_inference="neural",
+                 compact_dtypes=False):
+        self._instrumentation = Instrumentation()
         DataPreprocessingMixin.__init__(self,
                                         data,
                                         target_variable_name, 
                                         ordinal_features_list, 
-                                        forbidden_features_list)
+                                        forbidden_features_list,
+                                        type_inference,
+                                        compact_dtypes)
         ModelMixin.__init__(self, 
                             training_resilience,  
                             n_iterations_for_convergence)
+        #On disk cache of training results(see set_result_cache)
+        self._result_cache = None
+        #Last resource plan(see plan)
+        self._plan = None
+
+    @classmethod
+    def from_csv(cls,
+                 path,
+                 target_variable_name,
+                 sample_size,
+                 n_quantiles=0,
+                 chunksize=100000,
+                 read_csv_kwargs=None,
+                 oversampling=0.1,
+                 **kwargs):
+        """
+        Draws an approximate stratified sample straight from a csv file, chunk
+        by chunk, 
+        and keeps every row having a missing value. Only the sample and those 
+        rows are loaded in memory: the file can be bigger than the memory.
+        
+        The 'sample_size' and 'n_quantiles' arguments of train() are ignored 
+        afterwards. train() returns the sample and the rows having missing 
+        values(indexed by their position in the file) and the whole file is 
+        rewritten chunk by chunk if 'path_to_save_dataset' is given.
+
+        Parameters
+        ----------
+        path : str
+        
+        target_variable_name : str
+        
+        sample_size [0;1[ : float
+            Proportion of complete rows to draw.
+        n_quantiles : int, optional
+            Stratifies a numerical target variable on n quantile bins. 
+            The default is 0.
+        chunksize : int, optional
+            Rows read at once. The default is 100000.
+        read_csv_kwargs : dict, optional
+            Passed on to pandas.read_csv. The default is None
+        oversampling : float, optional
+            Extra candidates kept while reading: small classes can come back 
+            underfilled, less often as it grows(see 
+            sampling.stream_stratified_sample). The default is 0.1.
+        **kwargs : 
+            Other arguments of RandomForestImputer.
 
+        Returns
+        -------
+        RandomForestImputer
+
+        """
+        data, source_rows, null_rows = stream_stratified_sample(
+            path, 
+            target_variable_name,
+            sample_size,
+            n_quantiles=n_quantiles,
+            chunksize=chunksize,
+            oversampling=oversampling,
+            read_csv_kwargs=read_csv_kwargs)
+        random_forest_imputer = cls(data, target_variable_name, **kwargs)
+        random_forest_imputer._stream_source = {"path":path, 
+                                                "chunksize":chunksize,
+                                                "read_csv_kwargs":read_csv_kwargs}
+        random_forest_imputer._source_rows = source_rows
+        random_forest_imputer._source_null_rows = null_rows
+        return random_forest_imputer
+    
+    
+    def add_stage_callback(self, callback):
+        """
+        Registers a function called with every stage event emitted during 
+        training (see MissingValuesHandler.instrumentation). 
+        MissingValuesHandler.instrumentation.ProgressDisplay can be registered 
+        to display the progress on the console.
+
+        Parameters
+        ----------
+        callback : callable
+
+        Returns
+        -------
+        None
+
+        """
+        self._instrumentation.subscribe(callback)
+        
+        
+    def remove_stage_callback(self, callback):
+        """
+        Parameters
+        ----------
+        callback : callable
+
+        Returns
+        -------
+        None
+
+        """
+        self._instrumentation.unsubscribe(callback)
+        
+        
+    def set_allocation_tracing(self, enabled=True):
+        """
+        Traces the memory allocated by every stage with tracemalloc(see
+        get_allocation_report). Training gets slower.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            The default is True.
+
+        Returns
+        -------
+        None
+
+        """
+        self._instrumentation.set_allocation_tracing(enabled)
+        
+        
+    def get_allocation_report(self):
+        """
+        Memory allocated by every stage of the last training(allocation 
+        tracing must be enabled). Memory allocated before tracing started, 
+        like the input data, is not counted: 'traced_peak' is what training 
+        needs on top of the data.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            Per stage: number of calls, total bytes allocated and still 
+            allocated at the end, maximum peak above the bytes allocated at 
+            the beginning, maximum traced peak and its ratio to the size of
+            the data.
+        """
+        events = DataFrame([event for event in self.get_stage_events() 
+                            if "traced_peak" in event])
+        if events.empty:
+            return events
+        report = (events
+                  .groupby("stage", sort=False)
+                  .agg(calls=("stage", "size"),
+                       allocated=("allocated", "sum"),
+                       peak_allocated=("peak_allocated", "max"),
+                       traced_peak=("traced_peak", "max")))
+        data_size = self._original_data_backup.memory_usage(deep=True).sum()
+        report["peak_to_data"] = report["traced_peak"] / data_size
+        return report
+    
+    
+    def get_stage_events(self):
+        """
+        Retrieves every stage event emitted during the last training.
+
+        Returns
+        -------
+        list
+
+        """
+        return self._instrumentation.get_events()
+    
+    
+    def export_trace(self, path):
+        """
+        Exports the stage events of the last training to a trace event JSON 
+        file.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        None
+
+        """
+        self._instrumentation.export_trace(path)
+        
+
+    def set_result_cache(self, directory=None, max_size=2**30):
+        """
+        Caches training results on disk. A training whose data, parameters 
+        and arguments were already seen returns the stored dataset, 
+        predictions and convergence history without training. The cache 
+        directory can be shared by several processes.
+        
+        Trainings with a time budget, resumed from a checkpoint or on data 
+        streamed from a file(from_csv) are neither looked up nor stored.
+
+        Parameters
+        ----------
+        directory : str, optional
+            None disables the cache. The default is None.
+        max_size : int, optional
+            Size of the cache in bytes. The least recently used results are 
+            removed beyond it. The default is 1 GiB.
+
+        Returns
+        -------
+        None
+        """
+        self._result_cache = (None if directory is None 
+                              else ResultCache(directory, max_size))
+        
+        
+    def _result_cache_key(self, decimals, sample_size, n_quantiles):
+        """
+        Parameters
+        ----------
+        decimals : int
+        
+        sample_size : int
+        
+        n_quantiles : int
+
+        Returns
+        -------
+        str
+            Fingerprint of the data, the parameters of the imputer, the 
+            arguments of the training and the versions of the libraries.
+        """
+        ensemble_parameters = self.get_ensemble_model_parameters()
+        ensemble_parameters["ensemble_backend"] = self._ensemble_backend.cache_key
+        return fingerprint(self._original_data_backup,
+                           self._target_variable_name,
+                           list(self._ordinal_vars),
+                           list(self._forbidden_features),
+                           self._training_resilience,
+                           self._last_n_iterations,
+                           self._type_inference.cache_key,
+                           ensemble_parameters,
+                           self.get_convergence_parameters(),
+                           self.get_encoding_parameters(),
+                           self.get_proximity_parameters(),
+                           (decimals, sample_size, n_quantiles),
+                           library_versions())
+    
+    
     def _save_new_dataset(self, final_dataset, path_to_save_dataset):
         """
         Parameters
@@ -134,15 +459,23 @@ class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
         None
 
         """
-        if path_to_save_dataset:
+        if path_to_save_dataset and self._stream_source is not None:
+            rewrite_csv(self._stream_source["path"],
+                        path_to_save_dataset,
+                        final_dataset.loc[self._source_null_rows],
+                        chunksize=self._stream_source["chunksize"],
+                        read_csv_kwargs=self._stream_source["read_csv_kwargs"])
+            self._log(f"\n- NEW DATASET SAVED in: {path_to_save_dataset}")
+        elif path_to_save_dataset:
             final_dataset.to_csv(path_or_buf=path_to_save_dataset, index=False)
-            print(f"\n- NEW DATASET SAVED in: {path_to_save_dataset}")
+            self._log(f"\n- NEW DATASET SAVED in: {path_to_save_dataset}")
     
 
     def _reinitialize_key_vars(self):
         """
         Reinitializing vars if (decimals, sample_size, n_quantiles,
-        path_to_save_dataset) is modified.
+        path_to_save_dataset) is modified. The original data is never 
+        modified during training: it is not copied.
 
         Returns
         -------
@@ -150,95 +483,635 @@ class RandomForestImputer(DataPreprocessingMixin, ModelMixin, PlotMixin):
 
         """
         self._has_converged = False
-        self._original_data = self._original_data_backup.copy(deep=True) 
+        self._instrumentation.reset()
+        self._original_data = self._original_data_backup
+        self._original_data_sampled = DataFrame()
+        self._orginal_data_temp = DataFrame()
+        self._data_null_index = None
         self._missing_values_coordinates = []
         self._divergent_values = defaultdict(list)
         self._all_weighted_averages = defaultdict(list) 
         self._std_entropy = defaultdict()
+        self._converged_values = defaultdict()
+        self._nan_values_remaining_check.clear()
+        self._nan_values_remaining_history = []
+        self._nan_target_variable_preds = defaultdict(list)
+        self._predicted_target_value = defaultdict()
+        self._forest_budget = (self._initial_budget 
+                               if self._progressive_budget else 1.0)
+        self._deadline = None
+        self._convergence_report = None
+        #Landmarks are positions in the features of the previous training
+        self._landmarks = None
+        
+        
+    def _preprocess(self, sample_size, n_quantiles):
+        """
+        Runs every preprocessing stage. A stage is skipped(and its outputs 
+        restored) if none of the parameters it depends on changed since the 
+        previous training: sweeps over decimals, n_iterations_for_convergence
+        or the ensemble model parameters don't pay the preprocessing again.
 
+        Parameters
+        ----------
+        sample_size : int
+        
+        n_quantiles : int
+
+        Returns
+        -------
+        None
 
-    def train(self, 
-              decimals=0, 
-              sample_size=0,
-              n_quantiles=0,
-              path_to_save_dataset=None):
         """
-        This is the main function. At run time, every other private functions 
-        will be executed one after another.
+        sampling_key = (sample_size, n_quantiles)
+        types_key = (sampling_key, self._type_inference.cache_key)
+        self._run_stage("data sampling", 
+                        sampling_key,
+                        ("_original_data", 
+                         "_original_data_sampled",
+                         "_orginal_data_temp",
+                         "_data_null_index"),
+                        self._data_sampling,
+                        sample_size=sample_size, 
+                        n_quantiles=n_quantiles)
+        self._run_stage("variables name validity",
+                        (sampling_key, 
+                         tuple(self._ordinal_vars), 
+                         tuple(self._forbidden_features)),
+                        (),
+                        self._check_variables_name_validity)
+        self._run_stage("isolating samples with no target value",
+                        sampling_key,
+                        ("_idx_no_target_value",),
+                        self._isolate_samples_with_no_target_value)
+        self._separate_features_and_target_variable()  
+        self._run_stage("predicting feature type",
+                        types_key,
+                        ("_features_type_predictions",),
+                        self._predict_feature_type)
+        self._run_stage("predicting target variable type",
+                        types_key,
+                        ("_target_var_type_prediction",),
+                        self._predict_target_variable_type)
+        self._run_stage("retrieving nan coordinates",
+                        sampling_key,
+                        ("_missing_values_coordinates", 
+                         "_number_of_nan_values"),
+                        self._retrieve_nan_coordinates)
+        self._run_stage("computing feature scales",
+                        types_key,
+                        ("_feature_scales",),
+                        self._compute_feature_scales)
+        self._run_stage("computing bin edges",
+                        (types_key, self._n_bins),
+                        ("_bin_edges",),
+                        self._compute_bin_edges)
+        guesses_restored = self._run_stage("making initial guesses",
+                                           types_key,
+                                           ("_initial_guesses",),
+                                           self._make_initial_guesses)
+        if guesses_restored:
+            self._features.fillna(self._initial_guesses, inplace=True)
+        self._encode_target_variable()
+        self._retrieve_target_variable_class_mappings()
+        
+
+    def _planning_workload(self):
+        """
+        Describes the training for the planner. Preprocessing must be done.
+
+        Returns
+        -------
+        planner.Workload
+        """
+        parameters = self.get_ensemble_model_parameters()
+        n_estimators = parameters["n_estimators"] or 30
+        additional_estimators = parameters["additional_estimators"] or 20
+        n_samples = len(self._features)
+        n_columns, n_dummies = self._encoded_width()
+        n_features = n_columns + n_dummies
+        classifier = (self._target_var_type_prediction.values[0,0] == 
+                      const.CATEGORICAL)
+        max_features = parameters["max_features"]
+        if max_features == "auto":
+            max_features = "sqrt" if classifier else None
+        if max_features == "sqrt":
+            n_candidate_features = np.sqrt(n_features)
+        elif max_features == "log2":
+            n_candidate_features = np.log2(max(n_features, 2))
+        elif isinstance(max_features, float):
+            n_candidate_features = max_features*n_features
+        else:
+            n_candidate_features = max_features or n_features
+        min_samples_leaf = parameters["min_samples_leaf"] or 1
+        if isinstance(min_samples_leaf, float):
+            min_samples_leaf = min_samples_leaf*n_samples
+        return planner.Workload(
+            n_samples=n_samples,
+            n_columns=n_columns,
+            n_dummies=n_dummies,
+            n_missing_cells=self._number_of_nan_values,
+            n_missing_rows=len(self._nan_positions()),
+            data_bytes=int(self._original_data.memory_usage(deep=True).sum()),
+            feature_itemsize=4 if self._compact_dtypes else 8,
+            sparse_dummies=self._sparse_one_hot,
+            classifier=classifier,
+            n_classes=self._target_variable.nunique() if classifier else 1,
+            #The out-of-bag loop usually adds a few batches of trees
+            n_trees=n_estimators + 5*additional_estimators,
+            n_fitted_trees=n_estimators + 6*additional_estimators,
+            n_candidate_features=max(1, n_candidate_features),
+            min_samples_leaf=min_samples_leaf,
+            n_iterations=(self._last_n_iterations*
+                          (2*self._training_resilience + 1)),
+            n_landmarks=self._n_landmarks or planner.DEFAULT_LANDMARKS,
+            top_k=self._top_k)
+    
+    
+    def _apply_plan(self, chosen_plan):
+        """
+        Sets the proximity parameters and the number of jobs of the forest 
+        of a plan.
 
         Parameters
         ----------
-        decimals : int, optional
-            The default is 0.
-        sample_size : int, optional
-            The default is 0.
-        n_quantiles : int, optional
-            The default is 0.
-        path_to_save_dataset : str, optional
-            The default is None
+        chosen_plan : dict
+            See plan.
 
         Returns
         -------
-        final_dataset : pandas.core.frame.DataFrame
+        None
+        """
+        strategy = chosen_plan["strategy"]
+        storages = {const.MEMMAP:const.MEMMAP, 
+                    const.SPARSE_TOP_K:const.SPARSE_TOP_K}
+        self.set_proximity_parameters(
+            n_landmarks=(chosen_plan["n_landmarks"] 
+                         if strategy == const.APPROXIMATE else 0),
+            landmark_selection=self._landmark_selection,
+            missing_rows_only=strategy != const.DENSE,
+            n_workers=chosen_plan["n_workers"],
+            storage=storages.get(strategy, const.DENSE),
+            top_k=self._top_k,
+            memmap_directory=self._memmap_directory)
+        self._n_jobs = chosen_plan["n_jobs"]
+        
+        
+    def plan(self, 
+             memory_limit=None, 
+             time_limit=None, 
+             sample_size=0, 
+             n_quantiles=0, 
+             apply=True,
+             n_cores=None):
+        """
+        Estimates the peak memory and the running time of the training 
+        before it starts(see MissingValuesHandler.planner) and chooses the 
+        most exact proximity representation fitting the limits: dense, 
+        restricted(rows of the samples having missing values), memmap, 
+        sparse_topk or approximate(landmarks), and the number of processes.
+        Preprocessing is run(and reused by the training).
+
+        Parameters
+        ----------
+        memory_limit : int, optional
+            Bytes. None for the physical memory. The default is None.
+        time_limit : float, optional
+            Seconds. The default is None.
+        sample_size, n_quantiles : 
+            See train().
+        apply : bool, optional
+            Sets the proximity parameters and the number of jobs of the 
+            forest of the plan. The default is True.
+        n_cores : int, optional
+            None for every core. The default is None.
+
+        Returns
+        -------
+        dict
+            See planner.plan. 'estimates' holds the estimates of every 
+            strategy.
+        """
+        self._reinitialize_key_vars()
+        self._preprocess(sample_size, n_quantiles)
+        self._plan = planner.plan(self._planning_workload(), 
+                                  memory_limit, 
+                                  time_limit,
+                                  n_cores)
+        if apply:
+            self._apply_plan(self._plan)
+        self._log(planner.format_plan(self._plan))
+        return self._plan
+    
+    
+    def get_plan(self):
+        """
+        Retrieves the last resource plan(see plan).
 
+        Returns
+        -------
+        dict
+        """
+        return self._plan
+        
+
+    def _training_stages(self, 
+                         decimals, 
+                         sample_size, 
+                         n_quantiles, 
+                         path_to_save_dataset, 
+                         path_to_save_trace,
+                         time_budget,
+                         checkpoint_dir=None,
+                         checkpoint=None):
+        """
+        Training as a generator: it yields the name of every stage once it is
+        done and returns the final dataset. train() runs it to completion and
+        train_async() runs every stage in an executor.
+
+        Parameters
+        ----------
+        decimals, sample_size, n_quantiles, path_to_save_dataset, 
+        path_to_save_trace, time_budget, checkpoint_dir : 
+            See train().
+        checkpoint : tuple, optional
+            (arrays, metadata) of the checkpoint to resume from(see resume).
+            The default is None.
+
+        Yields
+        ------
+        str
+            Name of the stage that just finished.
+            
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
         """
         #Initializing training
         total_iterations = 0
         self._reinitialize_key_vars()
-        self._data_sampling(title="[DATA SAMPLING]: ", 
-                            sample_size=sample_size, 
-                            n_quantiles=n_quantiles)
-        self._check_variables_name_validity()
-        self._isolate_samples_with_no_target_value(title="[ISOLATING SAMPLES"\
-                                                    "WITH NO TARGET VALUE]: ")
-        self._separate_features_and_target_variable()  
-        self._predict_feature_type(title="[PREDICTING FEATURE TYPE]: ")
-        self._predict_target_variable_type(title="[PREDICTING TARGET VARIABLE"\
-                                            "TYPE]: ") 
-        self._retrieve_nan_coordinates(title="[RETRIEVING NAN COORDINATES]: ")
-        self._make_initial_guesses(title="[MAKING INITIAL GUESSES]: ")
-        self._encode_target_variable()
-        self._retrieve_target_variable_class_mappings()
+        cache_key = None
+        if (self._result_cache is not None and time_budget is None and 
+            checkpoint is None and self._stream_source is None):
+            cache_key = self._result_cache_key(decimals, sample_size, n_quantiles)
+            cached_result = self._result_cache.get(cache_key)
+            if cached_result is not None:
+                final_dataset, attributes = cached_result
+                for name, value in attributes.items():
+                    setattr(self, name, value)
+                self._log("- RESULT RETRIEVED FROM THE CACHE")
+                self._save_new_dataset(final_dataset, path_to_save_dataset)
+                return final_dataset
+        if time_budget is not None:
+            self._deadline = time.perf_counter() + time_budget
+        self._preprocess(sample_size, n_quantiles)
+        nan_coordinates = list(self._missing_values_coordinates)
+        if checkpoint is not None:
+            total_iterations = self._restore_checkpoint(*checkpoint)
+        arguments = {"decimals":decimals, 
+                     "sample_size":sample_size, 
+                     "n_quantiles":n_quantiles}
+        yield "preprocessing"
         
-        while not self._has_converged:
+        #Training stops at the first stage boundary past the deadline
+        while not self._has_converged and not self._deadline_reached():
             for iteration in range(1, self._last_n_iterations + 1):
+                if self._deadline_reached():
+                    break
                 total_iterations += 1
+                self._instrumentation.iteration = total_iterations
                 self._encode_features()
                 #1- MODEL BULDING
-                text = (f"[{iteration}/{total_iterations}-"
-                        "BUILDING RANDOM FOREST]: ")
-                self._build_ensemble_model(title=text) 
+                self._build_ensemble_model() 
         
                 #2- FITTING AND EVALUATING THE MODEL
-                text = (f"[{iteration}-FITTING AND EVALUATING MODEL]: ")
-                self._fit_and_evaluate_ensemble_model(title=text)
+                self._fit_and_evaluate_ensemble_model()
+                yield "fitting and evaluating model"
+                if self._deadline_reached():
+                    break
                 
-                #3- BUILDING PROXIMITY MATRIX
-                text=(f"[{iteration}-BUILDING PROXIMITY MATRIX TREES/OOB "
-                      f"{self._estimator.n_estimators}"
-                      f"/{self._best_oob_score}]: ")
-                self._proximity_matrix = self.build_proximity_matrix(title=text)
+                #3- BUILDING PROXIMITY MATRIX(the previous one is freed first)
+                self._proximity_matrix = []
+                self._proximity_matrix = self.build_proximity_matrix()
                 self._retrieve_combined_predictions()  
+                yield "building proximity matrix"
+                if self._deadline_reached():
+                    break
+                
                 #4- COMPUTING WEIGHTED AVERAGES
-                text = f"[{iteration}-COMPUTING WEIGHTED AVERAGES]: "
-                self._compute_weighted_averages(title=text, 
-                                                decimals=decimals)
+                self._compute_weighted_averages(decimals=decimals)
                         
                 #5- REPLACING NAN VALUES IN ENCODED DATA 
-                text = f"[{iteration}-REPLACING MISSING VALUES]: "
-                self._replace_missing_values_in_features_frame(title=text)
-            self._compute_std_and_entropy()
-            self._check_and_remove_convergent_values()
-            self._check_for_final_convergence()
-        print(f"\n- TOTAL ITERATIONS: {total_iterations}")
+                self._replace_missing_values_in_features_frame()
+                yield "computing weighted averages"
+            else:
+                #Only complete rounds are checked for convergence
+                self._compute_std_and_entropy()
+                self._check_and_remove_convergent_values()
+                self._check_for_final_convergence()
+                if checkpoint_dir and not self._has_converged:
+                    self._save_checkpoint(checkpoint_dir, 
+                                          total_iterations, 
+                                          arguments)
+                yield "checking convergence"
+        if not self._has_converged:
+            text = (f"- TIME BUDGET EXHAUSTED: {len(self._divergent_values)} "
+                    "VALUE(S) KEEP THEIR LATEST SUBSTITUTE")
+            self._log(text)
+        self._log(f"\n- TOTAL ITERATIONS: {total_iterations}")
+        self._build_convergence_report(nan_coordinates)
         self._replace_missing_values_in_target_variable()
+        final_dataset = self._build_final_dataset(sample_size)
         #We save the final dataset if a path is given
-        all_data = (self._features, self._target_variable)
-        final_dataset = concat(all_data, axis=1)  
-        final_dataset = self._reconstruct_original_data(final_dataset, sample_size)
         self._save_new_dataset(final_dataset, path_to_save_dataset)
-        return  final_dataset 
+        if cache_key is not None:
+            attributes = {name:getattr(self, name) 
+                          for name in self._CACHED_ATTRIBUTES}
+            self._result_cache.put(cache_key, (final_dataset, attributes))
+        if path_to_save_trace:
+            self.export_trace(path_to_save_trace)
+        return  final_dataset
+    
+    
+    @Decorators.timeit("building final dataset")
+    def _build_final_dataset(self, sample_size):
+        """
+        Parameters
+        ----------
+        sample_size : int
+
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
+            Features and target variable with their substitutes.
+        """
+        all_data = (self._features, self._target_variable)
+        final_dataset = concat(all_data, axis=1, copy=False)  
+        return self._reconstruct_original_data(final_dataset, sample_size)
+    
+    
+    @staticmethod
+    def _next_stage(stages):
+        """
+        Runs the next stage of a training.
+
+        Parameters
+        ----------
+        stages : generator
+            See _training_stages.
+
+        Returns
+        -------
+        done : bool
+        
+        value : str or pandas.core.frame.DataFrame
+            Name of the stage, or the final dataset once training is done.
+        """
+        try:
+            return False, next(stages)
+        except StopIteration as stop:
+            return True, stop.value
+        
+        
+    @staticmethod
+    def _put_latest(queue, event):
+        """
+        Puts an event in an asyncio queue, dropping its oldest event if it is 
+        full.
+
+        Parameters
+        ----------
+        queue : asyncio.Queue
+        
+        event : 
 
+        Returns
+        -------
+        None
+        """
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+        
+        
+    def train(self, 
+              decimals=0, 
+              sample_size=0,
+              n_quantiles=0,
+              path_to_save_dataset=None,
+              path_to_save_trace=None,
+              verbose=True,
+              time_budget=None,
+              checkpoint_dir=None,
+              memory_limit=None,
+              time_limit=None):
+        """
+        This is the main function. At run time, every other private functions 
+        will be executed one after another.
+
+        Parameters
+        ----------
+        decimals : int, optional
+            The default is 0.
+        sample_size : int, optional
+            The default is 0.
+        n_quantiles : int, optional
+            The default is 0.
+        path_to_save_dataset : str, optional
+            The default is None
+        path_to_save_trace : str, optional
+            Exports the stage events to a trace event JSON file. 
+            The default is None
+        verbose : bool, optional
+            Prints convergence messages on the console. The default is True
+        time_budget : float, optional
+            Wall-clock budget in seconds. Once spent, training stops at the 
+            next stage boundary and returns the latest substitutes, converged
+            or not(see get_convergence_report). The median and/or the mode 
+            only replace the values that got no substitute. Missing target 
+            values that got no prediction stay empty. The default is None
+        checkpoint_dir : str, optional
+            Directory where the state of the training is saved at the end of
+            every round of iterations(see resume). The default is None
+        memory_limit : int, optional
+            Bytes. Plans the training first(see plan): the proximity 
+            parameters and the number of jobs of the forest are chosen to fit
+            memory_limit and time_limit. The default is None
+        time_limit : float, optional
+            Seconds. Plans the training first and is the time budget unless 
+            'time_budget' is given. The default is None
+
+        Raises
+        ------
+        customs.ResourceLimitError
+            No strategy fits the limits: raised before training.
+
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
+
+        """
+        self._print_messages = verbose
+        if memory_limit is not None or time_limit is not None:
+            chosen_plan = self.plan(memory_limit, 
+                                    time_limit, 
+                                    sample_size, 
+                                    n_quantiles)
+            if not chosen_plan["fits"]:
+                raise customs.ResourceLimitError(
+                    planner.format_plan(chosen_plan))
+            if time_budget is None:
+                time_budget = time_limit
+        stages = self._training_stages(decimals, 
+                                       sample_size, 
+                                       n_quantiles, 
+                                       path_to_save_dataset, 
+                                       path_to_save_trace,
+                                       time_budget,
+                                       checkpoint_dir)
+        return self._run_to_completion(stages)
+    
+    
+    def resume(self,
+               checkpoint_dir,
+               path_to_save_dataset=None,
+               path_to_save_trace=None,
+               verbose=True,
+               time_budget=None):
+        """
+        Resumes a training from the last checkpoint saved in 'checkpoint_dir'
+        (see train). The imputer must be built with the same data and 
+        parameters as the interrupted one. decimals, sample_size and 
+        n_quantiles are the ones of the interrupted training. Checkpoints 
+        are still saved in 'checkpoint_dir'.
+
+        Parameters
+        ----------
+        checkpoint_dir : str
+        
+        path_to_save_dataset, path_to_save_trace, verbose, time_budget : 
+            See train().
+
+        Raises
+        ------
+        customs.CheckpointError
+
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
+
+        """
+        arrays, metadata = read_checkpoint(checkpoint_dir)
+        arguments = metadata["arguments"]
+        self._print_messages = verbose
+        self._log(f"- RESUMING FROM ROUND {metadata['round']} "
+                  f"({metadata['total_iterations']} ITERATIONS)")
+        stages = self._training_stages(arguments["decimals"], 
+                                       arguments["sample_size"], 
+                                       arguments["n_quantiles"], 
+                                       path_to_save_dataset, 
+                                       path_to_save_trace,
+                                       time_budget,
+                                       checkpoint_dir,
+                                       (arrays, metadata))
+        return self._run_to_completion(stages)
+    
     
+    def _run_to_completion(self, stages):
+        """
+        Parameters
+        ----------
+        stages : generator
+            See _training_stages.
+
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
+        """
+        done = False
+        while not done:
+            done, final_dataset = self._next_stage(stages)
+        return final_dataset
     
     
+    async def train_async(self, 
+                          decimals=0, 
+                          sample_size=0,
+                          n_quantiles=0,
+                          path_to_save_dataset=None,
+                          path_to_save_trace=None,
+                          verbose=False,
+                          time_budget=None,
+                          checkpoint_dir=None,
+                          executor=None,
+                          progress_queue=None):
+        """
+        Same as train() for asyncio applications: every stage runs in an 
+        executor and the event loop gets control back between stages.
+        
+        Cancelling the task takes effect at the next stage boundary: the 
+        running stage is waited for(it can't be interrupted), no other stage
+        is started and asyncio.CancelledError is raised.
+        
+        Stages modify the imputer itself: they run in threads of this process,
+        never in other processes.
+
+        Parameters
+        ----------
+        decimals, sample_size, n_quantiles, path_to_save_dataset, 
+        path_to_save_trace, verbose, time_budget, checkpoint_dir : 
+            See train().
+        executor : concurrent.futures.ThreadPoolExecutor, optional
+            None for the default executor of the event loop. 
+            The default is None.
+        progress_queue : asyncio.Queue, optional
+            Receives every stage event(see add_stage_callback) and None 
+            once training is over. If the queue is bounded and full, its 
+            oldest event is dropped to make room: it keeps the latest ones. 
+            The default is None.
+
+        Raises
+        ------
+        customs.AsyncExecutorError
+            'executor' is a concurrent.futures.ProcessPoolExecutor.
+
+        Returns
+        -------
+        final_dataset : pandas.core.frame.DataFrame
+
+        """
+        if isinstance(executor, ProcessPoolExecutor):
+            text = ("train_async runs the stages of the training in threads "
+                    "of this process: use a ThreadPoolExecutor(or None), not "
+                    "a ProcessPoolExecutor")
+            raise customs.AsyncExecutorError(text)
+        loop = asyncio.get_running_loop()
+        self._print_messages = verbose
+        stages = self._training_stages(decimals, 
+                                       sample_size, 
+                                       n_quantiles, 
+                                       path_to_save_dataset, 
+                                       path_to_save_trace,
+                                       time_budget,
+                                       checkpoint_dir)
+        def forward_event(event):
+            loop.call_soon_threadsafe(self._put_latest, progress_queue, event)
+        callback = forward_event if progress_queue is not None else None
+        if callback is not None:
+            self.add_stage_callback(callback)
+        try:
+            done = False
+            while not done:
+                stage = loop.run_in_executor(executor, self._next_stage, stages)
+                try:
+                    done, final_dataset = await asyncio.shield(stage)
+                except asyncio.CancelledError:
+                    #Waiting for the running stage before closing the training
+                    await asyncio.wait([stage])
+                    stages.close()
+                    raise
+            return final_dataset
+        finally:
+            if callback is not None:
+                self.remove_stage_callback(callback)
+                self._put_latest(progress_queue, None)
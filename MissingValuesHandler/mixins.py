@@ -10,45 +10,63 @@
 ******************************************************************************
 ******************************************************************************
 ******************************************************************************
+Heavy dependencies that are not needed by the imputation itself(matplotlib, 
+sklearn.manifold, scipy, DataTypeIdentifier and therefore TensorFlow) are 
+imported the first time they are used. TensorFlow is never imported with 
+the "heuristic" type inference backend.
 """
 from collections import defaultdict, deque, Counter
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from DataTypeIdentifier.data_type_identifier import DataTypeIdentifier
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import KBinsDiscretizer
 from sklearn.preprocessing import LabelEncoder
-from mpl_toolkits.mplot3d import Axes3D
-from scipy import stats as ss
-from sklearn import manifold
+from functools import wraps
 from copy import copy
 import MissingValuesHandler.custom_exceptions as customs
+import MissingValuesHandler.type_inference as ti
+import MissingValuesHandler.ensemble_backends as eb
+import MissingValuesHandler.proximity as prox
+import MissingValuesHandler.checkpoint as ckpt
 import MissingValuesHandler.constants as const 
-import matplotlib.pyplot as plt 
-import progressbar as pb
 import numpy as np
 import pandas as pd
+import time
 import os
 
 class Decorators(): 
     """
-    Timer decorator: used to time functions
+    Instrumentation decorator: used to time stages and emit their events
     """
     @staticmethod
-    def timeit(method):
-        def timed(*args, **kwargs):
-            widgets = [kwargs["title"], 
-                       pb.Percentage(), 
-                       ' ', 
-                       pb.Bar(marker="#"), 
-                       ' ', 
-                       pb.ETA()]
-            timer = pb.ProgressBar(widgets=widgets, maxval=100).start()
-            kwargs["update"] = timer.update
-            kwargs["maxval"] = timer.maxval        
-            result = method(*args, **kwargs)
-            timer.finish()            
-            return result
-        return timed
+    def timeit(stage, n_items=None):
+        """
+        Parameters
+        ----------
+        stage : str
+            Name of the stage in the emitted events.
+        n_items : function, optional
+            Called with the instance once the stage is over to count the 
+            items it processed. The default is None
+
+        Returns
+        -------
+        function
+        """
+        def decorator(method):
+            @wraps(method)
+            def timed(self, *args, **kwargs):
+                self._instrumentation.start_stage()
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+                result = method(self, *args, **kwargs)
+                estimator = getattr(self, "_estimator", None)
+                self._instrumentation.record(
+                    stage, 
+                    start, 
+                    cpu_start,
+                    n_items=n_items(self) if n_items else None,
+                    n_estimators=getattr(estimator, "n_estimators", None),
+                    oob_score=getattr(self, "_best_oob_score", None))
+                return result
+            return timed
+        return decorator
 
 """
 ##############################################################################
@@ -62,7 +80,9 @@ class DataPreprocessingMixin():
                  data, 
                  target_variable_name, 
                  ordinal_features_list, 
-                 forbidden_features_list):
+                 forbidden_features_list,
+                 type_inference,
+                 compact_dtypes=False):
         """
         Constructor
         
@@ -76,6 +96,15 @@ class DataPreprocessingMixin():
             The default is None
         forbidden_features_list : list, optional
             The default is None
+        type_inference : str or type_inference.TypeInferenceBackend
+            "neural"(DataTypeIdentifier), "heuristic" or a custom backend.
+        compact_dtypes : bool, optional
+            Stores object columns as pandas categoricals, downcasts numerical 
+            columns to the narrowest lossless dtype and encodes the features 
+            in float32. The default is False
+        
+        The data is not copied(training never modifies it): it must not be 
+        modified in place while the imputer is used.
         
         Returns
         -------
@@ -90,17 +119,27 @@ class DataPreprocessingMixin():
         else:
             self._forbidden_features = forbidden_features_list
           
-        #Data type identifier object
-        self._data_type_identifier = DataTypeIdentifier()
+        #Type inference backend: predictions are cached per column
+        self._type_inference = ti.get_backend(type_inference)
     
     
         #Main variables
+        self._compact_dtypes = compact_dtypes
         self._original_data = None
-        self._original_data_backup = data.copy(deep=True)
+        if compact_dtypes:
+            self._original_data_backup = self._compact_data(data)
+        else:
+            self._original_data_backup = data
         self._original_data_sampled = pd.DataFrame()
         self._orginal_data_temp = pd.DataFrame()
         self._data_null_index = None
         self._idx_no_target_value = None
+        
+        #Data sampled while streaming a file(see RandomForestImputer.from_csv)
+        #source: {"path", "chunksize", "read_csv_kwargs"}
+        self._stream_source = None
+        self._source_rows = None
+        self._source_null_rows = None
     
     
         #Features and target variable: original and encoded
@@ -116,8 +155,100 @@ class DataPreprocessingMixin():
         #Label encoder for features and target variable
         self._label_encoder_features = LabelEncoder()
         self._label_encoder_target_vars = LabelEncoder()
+        
+        #Preprocessing stages outputs kept between trainings:
+        #stage name -> (key, {attribute name: value})
+        self._stage_artifacts = {}
+        self._initial_guesses = None
+        #Numerical features spread(iqr and std), used by relative tolerances
+        self._feature_scales = {}
+        
+        #Encoding policy of nominal categorical features
+        self._max_one_hot_cardinality = None
+        self._high_cardinality_encoding = const.ORDINAL
+        self._target_smoothing = 10.0
+        self._sparse_one_hot = False
+        self._encoded_feature_names = None
+        #Pre-binning of numerical features: feature name -> inner bin edges
+        self._n_bins = None
+        self._bin_edges = {}
+
+
+    @staticmethod
+    def _compact_data(data):
+        """
+        Memory compact copy of the data:
+            - object columns become pandas categoricals
+            - integer columns are downcast to the narrowest integer dtype
+            - float columns without missing values are downcast to float32 
+              if no value is altered(imputed columns stay in float64)
 
+        Parameters
+        ----------
+        data : pandas.core.frame.DataFrame
 
+        Returns
+        -------
+        compact_data : pandas.core.frame.DataFrame
+        """
+        compact_data = {}
+        for column_name, column in data.items():
+            if column.dtype == object:
+                column = column.astype("category")
+            elif pd.api.types.is_integer_dtype(column.dtype):
+                column = pd.to_numeric(column, downcast="integer")
+            elif (pd.api.types.is_float_dtype(column.dtype) and 
+                  not column.isnull().any()):
+                downcast_column = column.astype(np.float32)
+                if np.array_equal(downcast_column.values, column.values):
+                    column = downcast_column
+            compact_data[column_name] = column
+        return pd.DataFrame(compact_data, index=data.index)
+    
+    
+    def _run_stage(self, stage, key, attributes, method, **kwargs):
+        """
+        Runs a preprocessing stage only if the parameters it depends on 
+        changed since the previous training. Otherwise, the attributes it 
+        produced are restored(lists and dicts are copied since training 
+        modifies them).
+
+        Parameters
+        ----------
+        stage : str
+            
+        key : tuple
+            Every parameter that affects the output of the stage.
+        attributes : tuple
+            Names of the attributes produced by the stage.
+        method : function
+            The stage itself.
+        **kwargs : 
+            Arguments of 'method'.
+
+        Returns
+        -------
+        bool
+            True if the stage has been skipped.
+        """
+        cached = self._stage_artifacts.get(stage)
+        if cached is not None and cached[0] == key:
+            for name, value in cached[1].items():
+                if isinstance(value, (list, dict)):
+                    value = value.copy()
+                setattr(self, name, value)
+            return True
+        method(**kwargs)
+        artifacts = {}
+        for name in attributes:
+            value = getattr(self, name)
+            if isinstance(value, (list, dict)):
+                value = value.copy()
+            artifacts[name] = value
+        self._stage_artifacts[stage] = (key, artifacts)
+        return False
+    
+    
     def get_features_type_predictions(self):
         """ 
         Retrieves all features predictions type whether they are numerical 
@@ -157,11 +288,25 @@ class DataPreprocessingMixin():
         """
         Returns
         -------
-        pandas.core.frame.DataFrame
+        pandas.core.frame.DataFrame or scipy.sparse.csc_matrix
+            Sparse matrix if 'sparse_one_hot' is set(see 
+            get_encoded_feature_names).
         """
         return self._encoded_features_model
     
     
+    def get_encoded_feature_names(self):
+        """
+        Returns
+        -------
+        list
+            Names of the columns of the encoded features.
+        """
+        if self._sparse_one_hot:
+            return list(self._encoded_feature_names)
+        return self._encoded_features_model.columns.to_list()
+    
+    
     def get_target_variable_encoded(self):
         """
         Returns
@@ -169,22 +314,95 @@ class DataPreprocessingMixin():
         pandas.core.frame.DataFrame
         """
         return self._target_var_encoded
+    
+    
+    def set_encoding_parameters(self,
+                                max_one_hot_cardinality=None,
+                                high_cardinality_encoding=const.ORDINAL,
+                                target_smoothing=10.0,
+                                sparse_one_hot=False,
+                                n_bins=None):
+        """
+        Encoding policy of the nominal categorical features(those that are 
+        neither ordinal nor forbidden): features having more modalities than 
+        'max_one_hot_cardinality' are encoded in a single column instead of 
+        one column per modality.
+
+        Parameters
+        ----------
+        max_one_hot_cardinality : int, optional
+            None to one-hot encode every nominal feature. The default is None.
+        high_cardinality_encoding : str, optional
+            - ordinal: integer code of the modality.
+            - frequency: proportion of the samples having the modality.
+            - target: mean of the target variable for the modality, shrunk 
+              toward the global mean(one column per class but the first one 
+              for a categorical target variable having more than 2 classes).
+            The default is "ordinal".
+        target_smoothing : float, optional
+            Weight of the global mean in target encoding, in number of 
+            samples. The default is 10.0.
+        sparse_one_hot : bool, optional
+            Keeps the dummies sparse and feeds the ensemble model with scipy 
+            sparse matrices(see get_encoded_features). Saves memory on wide, 
+            mostly categorical data. The default is False.
+        n_bins : int [2;256], optional
+            Numerical features are quantized into at most n_bins quantile bins
+            (uint8 codes) before fitting the ensemble model: split search is 
+            much cheaper. Bin edges are computed once per training on the non
+            null values. Missing values are still imputed in original units.
+            None to use raw values. The default is None.
+
+        Raises
+        ------
+        customs.EncodingParametersError
+
+        Returns
+        -------
+        None
+        """
+        encodings = (const.ORDINAL, const.FREQUENCY, const.TARGET)
+        if high_cardinality_encoding not in encodings:
+            text = (f"high_cardinality_encoding must be one of {encodings}, "
+                    f"not '{high_cardinality_encoding}'")
+            raise customs.EncodingParametersError(text)
+        if n_bins is not None and not 2 <= n_bins <= 256:
+            text = "n_bins must be None or in [2;256]"
+            raise customs.EncodingParametersError(text)
+        if max_one_hot_cardinality is not None and max_one_hot_cardinality < 1:
+            text = "max_one_hot_cardinality must be None or greater than 0"
+            raise customs.EncodingParametersError(text)
+        self._max_one_hot_cardinality = max_one_hot_cardinality
+        self._high_cardinality_encoding = high_cardinality_encoding
+        self._target_smoothing = target_smoothing
+        self._sparse_one_hot = sparse_one_hot
+        self._n_bins = n_bins
+        
+        
+    def get_encoding_parameters(self):
+        """
+        Retrieves encoding parameters
+        
+        Returns
+        -------
+        dict
+        """
+        return {"max_one_hot_cardinality":self._max_one_hot_cardinality,
+                "high_cardinality_encoding":self._high_cardinality_encoding,
+                "target_smoothing":self._target_smoothing,
+                "sparse_one_hot":self._sparse_one_hot,
+                "n_bins":self._n_bins}
       
 
-    @Decorators.timeit
-    def _data_sampling(self, title, update, maxval, sample_size, n_quantiles):
+    @Decorators.timeit("data sampling", 
+                       n_items=lambda self: len(self._original_data))
+    def _data_sampling(self, sample_size, n_quantiles):
         """
         Draws a representative sample from the original dataset.
         It can be used when the dataset is too big.
 
         Parameters
         ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
         sample_size [0;1[ : int
             Allows to draw a representative sample from the data.
         n_quantiles : int
@@ -196,40 +414,45 @@ class DataPreprocessingMixin():
         -------
         None
         """
-        if sample_size:
-            data_sampled = None
-            null_checklist = self._original_data.isnull().any(axis=1)
-            data_null = self._original_data[null_checklist]
-            data_no_null = self._original_data.dropna()
-            target_no_null = data_no_null[self._target_variable_name]
-            if not n_quantiles:
-                train_test = train_test_split(data_no_null, 
-                                              test_size=sample_size, 
-                                              random_state=42, 
-                                              stratify=target_no_null)
-                self._orginal_data_temp = train_test[0]
-                data_sampled = train_test[1]
-            else:
+        if self._stream_source is not None:
+            #The sample has already been drawn while reading the file
+            self._data_null_index = dict(enumerate(self._source_rows))
+            self._original_data_sampled = self._original_data
+        elif sample_size:
+            from sklearn.model_selection import train_test_split
+            from sklearn.preprocessing import KBinsDiscretizer
+            #The split is done on positions: rows are only copied once, into
+            #the sample and into the rows left out
+            null_checklist = self._original_data.isnull().any(axis=1).values
+            null_positions = np.flatnonzero(null_checklist)
+            no_null_positions = np.flatnonzero(~null_checklist)
+            target_no_null = (self._original_data[self._target_variable_name]
+                              .values[no_null_positions])
+            if n_quantiles:
                 k_bins = KBinsDiscretizer(n_quantiles, "ordinal")
                 target_no_null = np.array(target_no_null).reshape((-1, 1))
-                y_binned = k_bins.fit_transform(target_no_null)
-                train_test = train_test_split(data_no_null, 
-                                              test_size=sample_size, 
-                                              random_state=42, 
-                                              stratify=y_binned) 
-                self._orginal_data_temp = train_test[0]
-                data_sampled = train_test[1]
-            self._original_data = pd.concat([data_sampled, data_null])
-            self._original_data = self._original_data.reset_index() 
-            self._data_null_index = self._original_data["index"].to_dict()
-            self._original_data = self._original_data.drop("index", axis=1)
-            self._original_data_sampled = self._original_data.copy(deep=True)
+                target_no_null = k_bins.fit_transform(target_no_null)
+            left_out_positions, sampled_positions = train_test_split(
+                                                        no_null_positions, 
+                                                        test_size=sample_size, 
+                                                        random_state=42, 
+                                                        stratify=target_no_null)
+            self._orginal_data_temp = (self._original_data
+                                       .take(left_out_positions))
+            positions = np.concatenate([sampled_positions, null_positions])
+            original_index = self._original_data.index[positions]
+            self._original_data = self._original_data.take(positions)
+            self._original_data.index = pd.RangeIndex(len(positions))
+            self._data_null_index = dict(enumerate(original_index))
+            self._original_data_sampled = self._original_data
       
         
     def _reconstruct_original_data(self, final_dataset, sample_size):
         """
         Reconstruct the original dataset with the new values if a sample has
-        been drawn.
+        been drawn. If the sample has been drawn while streaming a file, the 
+        rows left out were never loaded: only the sample and the rows having 
+        missing values are returned, indexed by their position in the file.
 
         Parameters
         ----------
@@ -241,7 +464,10 @@ class DataPreprocessingMixin():
         -------
         final_dataset : pandas.core.frame.DataFrame
         """
-        if sample_size:
+        if self._stream_source is not None:
+            final_dataset = final_dataset.rename(self._data_null_index)
+            final_dataset.sort_index(inplace=True)
+        elif sample_size:
             final_dataset = final_dataset.rename(self._data_null_index)
             final_dataset = pd.concat([self._orginal_data_temp, final_dataset])
             final_dataset.sort_index(inplace=True)
@@ -289,21 +515,13 @@ class DataPreprocessingMixin():
             raise customs.VariableNameError(text)
     
     
-    @Decorators.timeit
-    def _isolate_samples_with_no_target_value(self, title, update, maxval):
+    @Decorators.timeit("isolating samples with no target value",
+                       n_items=lambda self: len(self._idx_no_target_value))
+    def _isolate_samples_with_no_target_value(self):
         """
         Separates samples that have a missing target value and one or 
         multiple missing values in their features.
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Raises
         ------
         - customs.TargetVariableNameError
@@ -315,9 +533,7 @@ class DataPreprocessingMixin():
         """
         try:
             target_variable = self._original_data[self._target_variable_name]
-            nan_target_check = target_variable.index[target_variable.isnull()]
-            nan_target = self._original_data.loc[nan_target_check]
-            nan_idx = nan_target.index
+            nan_idx = target_variable.index[target_variable.isnull().values]
             self._idx_no_target_value = list(nan_idx)
         except KeyError:
             text = (f"Target variable '{self._target_variable_name}'"
@@ -325,8 +541,12 @@ class DataPreprocessingMixin():
             raise customs.TargetVariableNameError(text)
 
 
+    @Decorators.timeit("separating features and target variable")
     def _separate_features_and_target_variable(self):
         """
+        The features are the only copy of the data: training replaces their
+        missing values.
+        
         Returns
         -------
         None
@@ -338,66 +558,42 @@ class DataPreprocessingMixin():
                                  .copy(deep=True))
   
     
-    @Decorators.timeit
-    def _predict_feature_type(self, title, update, maxval):
+    @Decorators.timeit("predicting feature type",
+                       n_items=lambda self: self._features.shape[1])
+    def _predict_feature_type(self):
         """
         Predicts if a feature is either categorical or numerical.
         
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Returns
         -------
         None
         """
-        self._features_type_predictions = (self._data_type_identifier
-                                           .predict(self._features, 0))
+        self._features_type_predictions = ti.predict_types(self._features,
+                                                           self._type_inference)
      
         
-    @Decorators.timeit    
-    def _predict_target_variable_type(self, title, update, maxval):
+    @Decorators.timeit("predicting target variable type", 
+                       n_items=lambda self: 1)
+    def _predict_target_variable_type(self):
         """
         Predicts if the target variable is either categorical or numerical.
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Returns
         -------
         None
         """
         target_variable = self._target_variable.to_frame()
-        self._target_var_type_prediction = (self._data_type_identifier
-                                            .predict(target_variable, 0))
+        self._target_var_type_prediction = ti.predict_types(target_variable,
+                                                            self._type_inference)
    
 
-    @Decorators.timeit
-    def _retrieve_nan_coordinates(self, title, update, maxval):
+    @Decorators.timeit("retrieving nan coordinates",
+                       n_items=lambda self: self._number_of_nan_values)
+    def _retrieve_nan_coordinates(self):
         """
         Gets the coordinates(row and column) of every empty cell in the 
         features dataset.
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Raises
         ------
         customs.NoMissingValuesError
@@ -415,7 +611,7 @@ class DataPreprocessingMixin():
         features_nan_name = self._features.columns[features_nan_check]
         features_nan = self._features[features_nan_name]
           
-        for iterator, feature_nan in enumerate(features_nan):
+        for feature_nan in features_nan:
             empty_cells_checklist = self._features[feature_nan].isnull()
             row_coordinates = (self._features[feature_nan]
                               .index[empty_cells_checklist])
@@ -423,28 +619,43 @@ class DataPreprocessingMixin():
             col_row_combinations = [column_coordinate]*len(row_coordinates)
             nan_coordinates = list(zip(row_coordinates, col_row_combinations))
             self._missing_values_coordinates.extend(nan_coordinates)
-            update(iterator*(maxval/len(features_nan)))
                       
         #Getting the total number of missing values for future purposes.
         self._number_of_nan_values = len(self._missing_values_coordinates)
     
     
-    @Decorators.timeit       
-    def _make_initial_guesses(self, title, update, maxval):
+    def _compute_feature_scales(self):
+        """
+        Computes the interquartile range and the standard deviation of the 
+        non null values of every numerical feature having missing values.
+
+        Returns
+        -------
+        None
+        """
+        self._feature_scales = {}
+        nan_features = {coordinates[1] for coordinates 
+                        in self._missing_values_coordinates}
+        for feature_name in nan_features:
+            feature_type = (self._features_type_predictions
+                            .loc[feature_name]
+                            .any())
+            if feature_type != const.NUMERICAL:
+                continue
+            values = self._features[feature_name].dropna().astype(np.float64)
+            q1, q3 = np.percentile(values, [25, 75]) if len(values) else (0, 0)
+            self._feature_scales[feature_name] = {const.IQR:q3 - q1,
+                                                  const.STD:values.std(ddof=0)}
+            
+            
+    @Decorators.timeit("making initial guesses",
+                       n_items=lambda self: self._number_of_nan_values)
+    def _make_initial_guesses(self):
         """
         Replaces empty cells with initial values in the features dataset:
             - mode for categorical variables 
             - median for numerical variables
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Returns
         -------
         None
@@ -466,13 +677,17 @@ class DataPreprocessingMixin():
 
         #Calculating medians and modes
         medians = self._features[numerical_variables_names].median()
-        modes = self._features[categorical_variables_names].mode().iloc[0]
-        initial_guesses = pd.concat([medians, modes])
+        modes = self._features[categorical_variables_names].mode()
+        #No mode at all if no categorical feature contains null values
+        modes = modes.iloc[0] if len(modes) else pd.Series(dtype=object)
+        self._initial_guesses = pd.concat([medians, modes])
 
         #Replacing initial_guesses in the dataset
-        self._features.fillna(initial_guesses, inplace=True)
+        self._features.fillna(self._initial_guesses, inplace=True)
         
             
+    @Decorators.timeit("encoding features",
+                       n_items=lambda self: self._encoded_features_pred.shape[1])
     def _encode_features(self):
         """
         Encodes every categorical feature the user wants to encode. 
@@ -487,6 +702,9 @@ class DataPreprocessingMixin():
         -------
         None
         """
+        #The encoded features of the previous iteration are freed first
+        self._encoded_features_model = None
+        self._encoded_features_pred = None
         predictions = self._features_type_predictions["Predictions"] 
     
         #Checklists to highlight categorical and numerical variables only.
@@ -502,6 +720,8 @@ class DataPreprocessingMixin():
         #Retrieving all numerical and categorical variables
         numerical_vars = self._features[numerical_vars_names]   
         categorical_vars = self._features[categorical_vars_names]
+        if self._n_bins:
+            numerical_vars = self._bin_numerical_features(numerical_vars)
         
         #Separating nominal and ordinal categorical variables
         if self._ordinal_vars:
@@ -518,23 +738,45 @@ class DataPreprocessingMixin():
             # 'a_c' stands for authorized columns
             a_c = [column_name for column_name in nominal_cat_vars.columns if 
                     column_name not in self._forbidden_features] 
-            encoded_nominal_cat_vars = pd.get_dummies(nominal_cat_vars, columns=a_c)
+            nominal_cat_vars, a_c, encoded_high_cardinality_vars = \
+                self._encode_high_cardinality_features(nominal_cat_vars, a_c)
+            encoded_nominal_cat_vars = self._one_hot_encode(nominal_cat_vars, 
+                                                            a_c)
             
             #Gathering numericals variables and encoded categorical ones
             all_encoded_data  = (numerical_vars, 
                                 encoded_ordinal_cat_vars, 
-                                encoded_nominal_cat_vars)
-            self._encoded_features_model = pd.concat(all_encoded_data, axis=1)    
+                                encoded_nominal_cat_vars,
+                                *encoded_high_cardinality_vars)
+            self._encoded_features_model = pd.concat(all_encoded_data, 
+                                                     axis=1, 
+                                                     copy=False)
         elif categorical_vars_names:
             a_c = [column_name for column_name in categorical_vars.columns if 
                     column_name not in self._forbidden_features] 
-            encoded_cat_vars = pd.get_dummies(categorical_vars, columns=a_c)
+            categorical_vars, a_c, encoded_high_cardinality_vars = \
+                self._encode_high_cardinality_features(categorical_vars, a_c)
+            encoded_cat_vars = self._one_hot_encode(categorical_vars, a_c)
             
             #Gathering numerical variables and nominal categorical variables
-            all_encoded_data = (numerical_vars, encoded_cat_vars)
-            self._encoded_features_model = pd.concat(all_encoded_data, axis=1)
+            all_encoded_data = (numerical_vars, 
+                                encoded_cat_vars,
+                                *encoded_high_cardinality_vars)
+            self._encoded_features_model = pd.concat(all_encoded_data, 
+                                                     axis=1, 
+                                                     copy=False)
+        elif self._n_bins:
+            self._encoded_features_model = numerical_vars
         else:
-            self._encoded_features_model = self._features.copy(deep=True)
+            #Read only: the features frame itself
+            self._encoded_features_model = self._features
+        if self._sparse_one_hot:
+            self._build_sparse_encoded_features()
+            return
+        if self._compact_dtypes:
+            #Trees work on float32 anyway: no conversion on every fit/predict
+            self._encoded_features_model = (self._encoded_features_model
+                                            .astype(np.float32))
    
         '''
         Creating two separates encoded_features sets 
@@ -542,17 +784,273 @@ class DataPreprocessingMixin():
         1- One for the ensemble model that have a missing target value
         2- Another for building the proximity matrix and computing the weighted
         averages
+        Both are the same frame otherwise: none of them is modified.
         '''    
+        self._encoded_features_pred = self._encoded_features_model
         if len(self._idx_no_target_value)!=0:
-            self._encoded_features_pred = (self._encoded_features_model
-                                            .copy(deep=True))
-            self._encoded_features_model.drop(self._idx_no_target_value, 
-                                               inplace=True)
-        else:
-            self._encoded_features_pred = (self._encoded_features_model
-                                            .copy(deep=True))
+            self._encoded_features_model = (self._encoded_features_pred
+                                            .drop(self._idx_no_target_value))
               
                  
+    def _encoded_width(self):
+        """
+        Number of columns of the encoded features, computed from the types 
+        and cardinalities of the features without encoding them.
+
+        Returns
+        -------
+        n_columns : int
+            Numerical, ordinal, forbidden and high cardinality features.
+        n_dummies : int
+            One-hot encoded columns.
+        """
+        predictions = self._features_type_predictions["Predictions"]
+        categorical_names = predictions.index[predictions==const.CATEGORICAL]
+        n_columns = int((predictions==const.NUMERICAL).sum())
+        n_dummies = 0
+        for feature_name in categorical_names:
+            if (feature_name in self._ordinal_vars or 
+                feature_name in self._forbidden_features):
+                n_columns += 1
+                continue
+            cardinality = self._features[feature_name].nunique()
+            if (self._max_one_hot_cardinality is not None and 
+                cardinality > self._max_one_hot_cardinality):
+                n_columns += 1
+            else:
+                n_dummies += cardinality
+        return n_columns, n_dummies
+    
+    
+    def _compute_bin_edges(self):
+        """
+        Computes the inner edges of at most n_bins quantile bins for every 
+        numerical feature, on its non null values.
+
+        Returns
+        -------
+        None
+        """
+        self._bin_edges = {}
+        if not self._n_bins:
+            return
+        predictions = self._features_type_predictions["Predictions"]
+        numerical_vars_names = predictions.index[predictions==const.NUMERICAL]
+        quantiles = np.linspace(0, 1, self._n_bins + 1)[1:-1]
+        for feature_name in numerical_vars_names:
+            values = self._features[feature_name].dropna().astype(np.float64)
+            edges = np.quantile(values, quantiles) if len(values) else []
+            self._bin_edges[feature_name] = np.unique(edges)
+            
+            
+    def _bin_numerical_features(self, numerical_vars):
+        """
+        Replaces numerical features with their bin codes.
+
+        Parameters
+        ----------
+        numerical_vars : pandas.core.frame.DataFrame
+
+        Returns
+        -------
+        binned_vars : pandas.core.frame.DataFrame
+            uint8 codes.
+        """
+        binned_vars = {}
+        for feature_name, feature in numerical_vars.items():
+            codes = np.searchsorted(self._bin_edges[feature_name], 
+                                    feature.to_numpy(dtype=np.float64), 
+                                    side="right")
+            binned_vars[feature_name] = codes.astype(np.uint8)
+        return pd.DataFrame(binned_vars, 
+                            index=numerical_vars.index, 
+                            columns=numerical_vars.columns)
+    
+    
+    def _one_hot_encode(self, categorical_vars, a_c):
+        """
+        One-hot encodes the authorized columns. Dummies are sparse columns if 
+        'sparse_one_hot' is set: the dense dummies are never allocated.
+
+        Parameters
+        ----------
+        categorical_vars : pandas.core.frame.DataFrame
+        
+        a_c : list
+            Authorized columns.
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+        """
+        if not categorical_vars.shape[1]:
+            return categorical_vars
+        if not self._sparse_one_hot or not a_c:
+            return pd.get_dummies(categorical_vars, columns=a_c)
+        from scipy import sparse
+        encoded_vars = [categorical_vars.drop(a_c, axis=1)]
+        for column_name in a_c:
+            codes, modalities = pd.factorize(categorical_vars[column_name], 
+                                             sort=True)
+            rows = np.flatnonzero(codes >= 0)
+            dummies = sparse.csc_matrix((np.ones(len(rows), dtype=np.float32),
+                                         (rows, codes[rows])),
+                                        shape=(len(codes), len(modalities)))
+            dummies_names = [f"{column_name}_{modality}" 
+                             for modality in modalities]
+            encoded_vars.append(pd.DataFrame.sparse.from_spmatrix(
+                                    dummies, 
+                                    index=categorical_vars.index,
+                                    columns=dummies_names))
+        return pd.concat(encoded_vars, axis=1, copy=False)
+    
+    
+    def _build_sparse_encoded_features(self):
+        """
+        Turns the encoded features into scipy sparse matrices(dense columns 
+        first, then the dummies), passed as they are to the ensemble model:
+            - CSC for fitting(samples having a target value)
+            - CSR for predictions, apply and proximities(every sample)
+        Names of the columns are kept in 'self._encoded_feature_names'.
+
+        Returns
+        -------
+        None
+        """
+        from scipy import sparse
+        encoded_features = self._encoded_features_model
+        sparse_check = np.array([isinstance(dtype, pd.SparseDtype) 
+                                 for dtype in encoded_features.dtypes], 
+                                dtype=bool)
+        dense_vars = encoded_features.loc[:, ~sparse_check]
+        sparse_vars = encoded_features.loc[:, sparse_check]
+        blocks = [sparse.csr_matrix(dense_vars.to_numpy(dtype=np.float32))]
+        if sparse_vars.shape[1]:
+            blocks.append(sparse_vars.sparse.to_coo())
+        self._encoded_feature_names = (dense_vars.columns.to_list() + 
+                                       sparse_vars.columns.to_list())
+        self._encoded_features_pred = sparse.hstack(blocks, 
+                                                    format="csr", 
+                                                    dtype=np.float32)
+        rows_with_target = np.flatnonzero(~encoded_features.index
+                                          .isin(self._idx_no_target_value))
+        self._encoded_features_model = (self._encoded_features_pred
+                                        [rows_with_target]
+                                        .tocsc())
+    
+    
+    def _encoded_rows(self, positions):
+        """
+        Rows of the encoded features(every sample) at the given positions.
+
+        Parameters
+        ----------
+        positions : numpy.ndarray
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame or scipy.sparse.csr_matrix
+        """
+        if self._sparse_one_hot:
+            return self._encoded_features_pred[positions]
+        return self._encoded_features_pred.iloc[positions]
+    
+    
+    def _encode_high_cardinality_features(self, nominal_cat_vars, a_c):
+        """
+        Takes the features having more than 'max_one_hot_cardinality' 
+        modalities out of the one-hot encoding and encodes each of them in a 
+        single column(see set_encoding_parameters).
+
+        Parameters
+        ----------
+        nominal_cat_vars : pandas.core.frame.DataFrame
+        
+        a_c : list
+            Authorized columns(features to one-hot encode).
+
+        Returns
+        -------
+        nominal_cat_vars : pandas.core.frame.DataFrame
+            Without the high cardinality features.
+        a_c : list
+            Features left to one-hot encode.
+        encoded_high_cardinality_vars : list
+            Empty list or list holding the encoded high cardinality features 
+            (pandas.core.frame.DataFrame).
+        """
+        if self._max_one_hot_cardinality is None or not a_c:
+            return nominal_cat_vars, a_c, []
+        cardinalities = nominal_cat_vars[a_c].nunique()
+        high_cardinality_names = (cardinalities
+                                  .index[cardinalities > 
+                                         self._max_one_hot_cardinality]
+                                  .to_list())
+        if not high_cardinality_names:
+            return nominal_cat_vars, a_c, []
+        
+        high_cardinality_vars = nominal_cat_vars[high_cardinality_names]
+        if self._high_cardinality_encoding == const.TARGET:
+            encoded_vars = self._target_encoding(high_cardinality_vars)
+        else:
+            encoded_vars = pd.DataFrame(index=high_cardinality_vars.index)
+            for feature_name, feature in high_cardinality_vars.items():
+                if self._high_cardinality_encoding == const.ORDINAL:
+                    encoded_feature = pd.factorize(feature, sort=True)[0]
+                else:
+                    frequencies = feature.value_counts(normalize=True)
+                    encoded_feature = feature.map(frequencies).astype(np.float64)
+                encoded_vars[feature_name] = encoded_feature
+        a_c = [column_name for column_name in a_c 
+               if column_name not in high_cardinality_names]
+        nominal_cat_vars = nominal_cat_vars.drop(high_cardinality_names, axis=1)
+        return nominal_cat_vars, a_c, [encoded_vars]
+    
+    
+    def _target_encoding(self, high_cardinality_vars):
+        """
+        Smoothed target mean encoding. Means are computed on the samples having
+        a target value and applied to every sample(unseen modalities get the 
+        global mean).
+
+        Parameters
+        ----------
+        high_cardinality_vars : pandas.core.frame.DataFrame
+
+        Returns
+        -------
+        encoded_vars : pandas.core.frame.DataFrame
+        """
+        index_with_target = (high_cardinality_vars.index
+                             .drop(self._idx_no_target_value))
+        target = pd.Series(np.asarray(self._target_var_encoded), 
+                           index=index_with_target)
+        type_ = self._target_var_type_prediction["Predictions"].any()
+        if type_ == const.CATEGORICAL:
+            targets = pd.get_dummies(target).astype(np.float64)
+            #One indicator is enough for a binary target variable
+            targets = targets.iloc[:, 1:] if targets.shape[1] > 1 else targets
+        else:
+            targets = target.astype(np.float64).to_frame()
+        
+        encoded_vars = {}
+        for feature_name, feature in high_cardinality_vars.items():
+            feature_with_target = feature.loc[index_with_target]
+            for class_name, class_target in targets.items():
+                global_mean = class_target.mean()
+                statistics = (class_target
+                              .groupby(feature_with_target.values)
+                              .agg(["sum", "count"]))
+                means = ((statistics["sum"] + self._target_smoothing*global_mean)
+                         / (statistics["count"] + self._target_smoothing))
+                column_name = (feature_name if targets.shape[1] == 1 
+                               else f"{feature_name}_{class_name}")
+                encoded_vars[column_name] = (feature.map(means)
+                                             .astype(np.float64)
+                                             .fillna(global_mean))
+        return pd.DataFrame(encoded_vars, index=high_cardinality_vars.index)
+    
+    
     def _encode_target_variable(self):
         """
         Encodes the target variable if it is permitted by the user:
@@ -567,11 +1065,12 @@ class DataPreprocessingMixin():
         None
         """
         prediction = self._target_var_type_prediction["Predictions"]
-        target_var_cleansed = self._target_variable.copy(deep=True)
+        target_var_cleansed = self._target_variable
         
         #Removal of samples having a missing target_value
         if len(self._idx_no_target_value)!=0:
-            target_var_cleansed.drop(self._idx_no_target_value, inplace=True)
+            target_var_cleansed = target_var_cleansed.drop(
+                                    self._idx_no_target_value)
         self._target_var_encoded = target_var_cleansed
         
         #We encode it if the variable is categorical
@@ -633,7 +1132,27 @@ class ModelMixin():
             raise customs.TrainingResilienceValueError()
         #Proximity/distance matrix variables
         self._proximity_matrix = []
-        self._distance_matrix = []
+        #Positions(in the features frame) of the samples on the rows and
+        #columns of the proximity matrix
+        self._proximity_rows = None
+        self._proximity_columns = None
+        
+        #Landmark mode: proximities between samples having missing values 
+        #and a subset of complete samples only
+        self._n_landmarks = 0
+        self._landmark_selection = const.STRATIFIED
+        self._landmarks = None
+        #Proximities of the samples having missing values only
+        self._missing_rows_only = False
+        #Processes computing the proximities(1: in the main process)
+        self._proximity_workers = 1
+        #Storage of the proximities: dense array, memmap or top k per row
+        self._proximity_storage = const.DENSE
+        self._top_k = 100
+        self._memmap_directory = None
+        #(positions, leaves) of the samples run down the trees to build the 
+        #proximities, reused to predict the missing target values
+        self._tree_leaves = None
         self._divergent_values = defaultdict(list)
         self._all_weighted_averages = defaultdict(list)
 
@@ -653,6 +1172,8 @@ class ModelMixin():
         self._nan_values_remaining_check = deque(maxlen=training_resilience)
         self._last_n_iterations = n_iterations_for_convergence   
         self._has_converged = None
+        #Convergence messages printed on the console
+        self._print_messages = True
         
         #Target variable predictions(if nan target values exist)
         self._nan_target_variable_preds = defaultdict(list)
@@ -660,6 +1181,7 @@ class ModelMixin():
         self._mappings_target_variable = defaultdict()
         
         #Random forest(regressor or classifier) variables
+        self._ensemble_backend = eb.get_backend("random_forest")
         self._estimator = None
         self._n_estimators = None
         self._additional_estimators = None
@@ -678,6 +1200,25 @@ class ModelMixin():
         self._oob_score = True
         self._best_oob_score = 0
         self._warm_start = True
+        
+        #Progressive tree budget: fraction of the forest size(and depth) used
+        #for the current round of iterations
+        self._progressive_budget = False
+        self._initial_budget = 0.25
+        self._forest_budget = 1.0
+        
+        #Convergence criteria
+        self._tolerance = 1.0
+        self._tolerance_type = const.ABSOLUTE
+        self._feature_tolerances = {}
+        self._categorical_tolerance = 0.0
+        self._early_stop_rounds = None
+        self._min_shrink = 0.0
+        #Number of values remaining after every round of iterations
+        self._nan_values_remaining_history = []
+        #Wall-clock budget(time.perf_counter() deadline or None)
+        self._deadline = None
+        self._convergence_report = None
                 
      
     def set_ensemble_model_parameters(self,
@@ -693,7 +1234,10 @@ class ModelMixin():
                                       min_impurity_split=None,
                                       n_jobs=-1,
                                       random_state=None,
-                                      verbose=0):
+                                      verbose=0,
+                                      progressive_budget=False,
+                                      initial_budget=0.25,
+                                      ensemble_backend="random_forest"):
         """
         Parameters
         ----------
@@ -723,6 +1267,20 @@ class ModelMixin():
             DESCRIPTION. The default is None
         verbose : int, optional
             The default is 0.
+        progressive_budget : bool, optional
+            If True, the first rounds of iterations use small and shallow 
+            forests(initial_budget * n_estimators trees). Their size and depth
+            grow with the fraction of converged values, and the full forest 
+            is used as soon as a round brings no improvement. 
+            The default is False.
+        initial_budget : float ]0;1], optional
+            The default is 0.25.
+        ensemble_backend : str or ensemble_backends.EnsembleBackend, optional
+            - random_forest: random forest classifier or regressor.
+            - extra_trees: extremely randomized trees, much cheaper to fit.
+            - an EnsembleBackend instance(e.g EstimatorBackend wrapping user 
+              supplied ensemble models).
+            The default is "random_forest".
 
         Returns
         -------
@@ -741,8 +1299,211 @@ class ModelMixin():
         self._n_jobs = n_jobs 
         self._random_state = random_state
         self._verbose = verbose
+        self._progressive_budget = progressive_budget
+        self._initial_budget = initial_budget
+        self._ensemble_backend = eb.get_backend(ensemble_backend)
  
     
+    def set_convergence_parameters(self,
+                                   tolerance=1.0,
+                                   tolerance_type=const.ABSOLUTE,
+                                   feature_tolerances=None,
+                                   categorical_tolerance=0.0,
+                                   early_stop_rounds=None,
+                                   min_shrink=0.0):
+        """
+        A numerical value has converged when the standard deviation of its 
+        last n substitutes is lower than its tolerance. A categorical value 
+        has converged when the entropy of its last n substitutes is lower than
+        'categorical_tolerance'.
+
+        Parameters
+        ----------
+        tolerance : float, optional
+            The default is 1.0.
+        tolerance_type : str, optional
+            - absolute: the tolerance is in the units of the features.
+            - iqr: the tolerance is a fraction of the interquartile range of 
+              every feature.
+            - std: the tolerance is a fraction of the standard deviation of 
+              every feature.
+            The default is "absolute".
+        feature_tolerances : dict, optional
+            feature name -> tolerance(float, same type as 'tolerance_type') 
+            or (tolerance, tolerance_type). The default is None.
+        categorical_tolerance : float, optional
+            The default is 0.0.
+        early_stop_rounds : int, optional
+            Training stops if the number of values remaining shrank by 
+            'min_shrink'(fraction) or less over the last 'early_stop_rounds' 
+            rounds of iterations. Values remaining are then replaced with the 
+            median and/or the mode. None to only rely on training_resilience.
+            The default is None.
+        min_shrink : float [0;1[, optional
+            The default is 0.0.
+
+        Raises
+        ------
+        customs.ConvergenceParametersError
+
+        Returns
+        -------
+        None
+        """
+        feature_tolerances = dict(feature_tolerances or {})
+        tolerance_types = (const.ABSOLUTE, const.IQR, const.STD)
+        all_tolerances = [(tolerance, tolerance_type)]
+        for feature_name, feature_tolerance in feature_tolerances.items():
+            if not isinstance(feature_tolerance, tuple):
+                feature_tolerance = (feature_tolerance, tolerance_type)
+            feature_tolerances[feature_name] = feature_tolerance
+            all_tolerances.append(feature_tolerance)
+        for value, value_type in all_tolerances:
+            if value_type not in tolerance_types:
+                text = (f"tolerance_type must be one of {tolerance_types}, "
+                        f"not '{value_type}'")
+                raise customs.ConvergenceParametersError(text)
+            if value < 0:
+                raise customs.ConvergenceParametersError("tolerances must be "
+                                                         "positive")
+        if early_stop_rounds is not None and early_stop_rounds < 1:
+            text = "early_stop_rounds must be None or greater or equal to 1"
+            raise customs.ConvergenceParametersError(text)
+        if not 0 <= min_shrink < 1:
+            text = "min_shrink must be in [0;1["
+            raise customs.ConvergenceParametersError(text)
+        self._tolerance = tolerance
+        self._tolerance_type = tolerance_type
+        self._feature_tolerances = feature_tolerances
+        self._categorical_tolerance = categorical_tolerance
+        self._early_stop_rounds = early_stop_rounds
+        self._min_shrink = min_shrink
+        
+        
+    def get_convergence_parameters(self):
+        """
+        Retrieves convergence parameters
+        
+        Returns
+        -------
+        dict
+        """
+        return {"tolerance":self._tolerance,
+                "tolerance_type":self._tolerance_type,
+                "feature_tolerances":dict(self._feature_tolerances),
+                "categorical_tolerance":self._categorical_tolerance,
+                "early_stop_rounds":self._early_stop_rounds,
+                "min_shrink":self._min_shrink}
+    
+    
+    def set_proximity_parameters(self, 
+                                 n_landmarks=0, 
+                                 landmark_selection=const.STRATIFIED,
+                                 missing_rows_only=False,
+                                 n_workers=1,
+                                 storage=const.DENSE,
+                                 top_k=100,
+                                 memmap_directory=None):
+        """
+        Landmark mode: the ensemble model is trained on every sample but 
+        proximities are only computed between the samples having missing 
+        values and n_landmarks complete samples(the landmarks). Missing values
+        are then replaced with the weighted averages/frequencies of the 
+        landmarks. Memory and time are in O(missing samples * landmarks) 
+        instead of O(samples²), without throwing samples away like sampling 
+        does.
+
+        Parameters
+        ----------
+        n_landmarks : int, optional
+            0 to compute the proximities between every sample.
+            The default is 0.
+        landmark_selection : str, optional
+            - stratified: landmarks are drawn in proportion to the classes(or 
+              the quantile bins) of the target variable.
+            - leaf_diverse: landmarks are chosen to cover as many leaves of 
+              the first ensemble model as possible.
+            The default is "stratified".
+        missing_rows_only : bool, optional
+            Only computes the rows of the proximity matrix that are needed: 
+            samples having missing values(rows) against every sample 
+            (columns). The default is False.
+        n_workers : int, optional
+            Worker processes splitting the rows of the proximity matrix between
+            them(group ids and matrix in shared memory). -1 for every core. 
+            The default is 1.
+        storage : str, optional
+            - dense: numpy array
+            - memmap: numpy.memmap in a temporary file, removed once the 
+              matrix is freed. Computed in the main process
+            - sparse_topk: only the top_k largest proximities of every row 
+              (the sample itself included) are kept, in a CSR matrix. Missing
+              values are then replaced with the weighted averages/frequencies
+              of their nearest samples. Computed in the main process
+            The default is "dense".
+        top_k : int, optional
+            Only for the sparse_topk storage. The default is 100.
+        memmap_directory : str, optional
+            Only for the memmap storage. None for the default temporary 
+            directory. The default is None.
+
+        Raises
+        ------
+        customs.ProximityParametersError
+
+        Returns
+        -------
+        None
+        """
+        if landmark_selection not in (const.STRATIFIED, const.LEAF_DIVERSE):
+            text = (f"landmark_selection must be '{const.STRATIFIED}' or "
+                    f"'{const.LEAF_DIVERSE}', not '{landmark_selection}'")
+            raise customs.ProximityParametersError(text)
+        if storage not in (const.DENSE, const.MEMMAP, const.SPARSE_TOP_K):
+            text = (f"storage must be '{const.DENSE}', '{const.MEMMAP}' or "
+                    f"'{const.SPARSE_TOP_K}', not '{storage}'")
+            raise customs.ProximityParametersError(text)
+        self._n_landmarks = n_landmarks
+        self._landmark_selection = landmark_selection
+        self._missing_rows_only = missing_rows_only
+        self._proximity_workers = n_workers
+        self._proximity_storage = storage
+        self._top_k = top_k
+        self._memmap_directory = memmap_directory
+        self._landmarks = None
+        
+        
+    def get_proximity_parameters(self):
+        """
+        Retrieves proximity parameters
+        
+        Returns
+        -------
+        dict
+        """
+        return {"n_landmarks":self._n_landmarks,
+                "landmark_selection":self._landmark_selection,
+                "missing_rows_only":self._missing_rows_only,
+                "n_workers":self._proximity_workers,
+                "storage":self._proximity_storage,
+                "top_k":self._top_k,
+                "memmap_directory":self._memmap_directory}
+    
+    
+    def get_landmarks(self):
+        """
+        Retrieves the landmarks(index of the samples in the features) used in 
+        landmark mode: they are the columns of the proximity matrix.
+        
+        Returns
+        -------
+        pandas.core.indexes.base.Index
+        """
+        if self._landmarks is None:
+            return None
+        return self._features.index[self._landmarks]
+    
+    
     def get_ensemble_model_parameters(self):
         """
         Retrives random forest regressor or classifier parameters
@@ -766,13 +1527,16 @@ class ModelMixin():
                 "verbose":self._verbose,                          
                 "bootstrap":self._bootstrap,                        
                 "oob_score":self._oob_score,                        
-                "warm_start":self._warm_start}
+                "warm_start":self._warm_start,
+                "progressive_budget":self._progressive_budget,
+                "initial_budget":self._initial_budget,
+                "ensemble_backend":self._ensemble_backend.name}
     
          
         
     def get_ensemble_model(self):
         """
-        Random forest model (classifier or regressor)
+        Ensemble model (random forest classifier or regressor by default)
         
         Returns
         -------
@@ -784,7 +1548,8 @@ class ModelMixin():
     def get_proximity_matrix(self):
         """
         Retrieves the last proximity matrix built with the optimal 
-        random forest.
+        random forest. In landmark mode, rows are the samples having missing 
+        values and columns are the landmarks(see get_landmarks).
         
         Returns
         -------
@@ -795,15 +1560,17 @@ class ModelMixin():
     
     def get_distance_matrix(self):
         """
-        Retrieves distance matrix which is equals to 1 - proximity matrix.
+        Retrieves distance matrix which is equals to 1 - proximity matrix. 
+        Distances are computed in float32 from the proximity matrix when 
+        they are indexed(rows, blocks): nothing is allocated before. 
+        np.asarray or toarray() materializes the whole matrix.
 
         Returns
         -------
-        numpy.ndarray
+        MissingValuesHandler.distance.DistanceMatrix
         """
-        if len(self._distance_matrix) == 0:
-            self._distance_matrix = 1-self._proximity_matrix
-        return self._distance_matrix
+        from MissingValuesHandler.distance import DistanceMatrix
+        return DistanceMatrix(self._proximity_matrix)
             
     
     def get_nan_features_predictions(self, option):
@@ -870,78 +1637,73 @@ class ModelMixin():
                 else dict_a_options[option])
 
 
-    def get_mds_coordinates(self, n_dimensions, distance_matrix):
+    @Decorators.timeit("building random forest")
+    def _build_ensemble_model(self):
         """
-        Multidimensional scaling coordinates to reduce distance matrix 
-        to n_dimensions(< n_dimensions of distance matrix)
-        
-        Parameters
-        ----------
-        n_dimensions : int
-            NUMBER OF DIMENSIONS FOR MDS.
-        distance_matrix : numpy.array
-        
-        Returns
-        -------
-        coordinates : numpy.array
-            MDS COORDINATES
-        """
-        coordinates=None
-        if n_dimensions<len(distance_matrix):
-            mds=manifold.MDS(n_components=n_dimensions, 
-                             dissimilarity='precomputed')
-            coordinates=mds.fit_transform(distance_matrix)
-        else:
-            print("n_dimensions > n_dimensions of distance matrix")
-        return coordinates
-  
-
-    @Decorators.timeit         
-    def _build_ensemble_model(self, 
-                              title, 
-                              update, 
-                              maxval):
-        """
-        Builds an ensemble model: random forest classifier or regressor.
-
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
+        Builds an ensemble model with the ensemble backend: random forest 
+        classifier or regressor by default.
 
         Returns
         -------
         None
         """
-        Model = {const.CATEGORICAL:RandomForestClassifier, 
-                 const.NUMERICAL:RandomForestRegressor}
         type_ = self._target_var_type_prediction["Predictions"].any()
-        self._estimator = Model[type_](n_estimators=self._n_estimators,
-                                        max_depth=self._max_depth, 
-                                        min_samples_split=self._min_samples_split, 
-                                        min_samples_leaf=self._min_samples_leaf, 
-                                        min_weight_fraction_leaf=self._min_weight_fraction_leaf, 
-                                        max_features=self._max_features, 
-                                        max_leaf_nodes=self._max_leaf_nodes, 
-                                        min_impurity_decrease=self._min_impurity_decrease, 
-                                        min_impurity_split=self._min_impurity_split, 
-                                        bootstrap=self._bootstrap, 
-                                        oob_score=self._oob_score, 
-                                        n_jobs=self._n_jobs, 
-                                        random_state=self._random_state, 
-                                        verbose=self._verbose,
-                                        warm_start=self._warm_start)
+        n_estimators, _, max_depth = self._scheduled_forest_size()
+        parameters = {"n_estimators":n_estimators,
+                      "max_depth":max_depth, 
+                      "min_samples_split":self._min_samples_split, 
+                      "min_samples_leaf":self._min_samples_leaf, 
+                      "min_weight_fraction_leaf":self._min_weight_fraction_leaf, 
+                      "max_features":self._max_features, 
+                      "max_leaf_nodes":self._max_leaf_nodes, 
+                      "min_impurity_decrease":self._min_impurity_decrease, 
+                      "min_impurity_split":self._min_impurity_split, 
+                      "bootstrap":self._bootstrap, 
+                      "oob_score":self._oob_score, 
+                      "n_jobs":self._n_jobs, 
+                      "random_state":self._random_state, 
+                      "verbose":self._verbose,
+                      "warm_start":self._warm_start}
+        self._estimator = self._ensemble_backend.build(type_, parameters)
 
            
-    @Decorators.timeit 
-    def _fit_and_evaluate_ensemble_model(self, 
-                                        title,
-                                        update, 
-                                        maxval):
+    def _scheduled_forest_size(self):
+        """
+        Size of the forest for the current round of iterations. Without 
+        progressive budget, it's the size set by the user.
+
+        Returns
+        -------
+        n_estimators : int
+        
+        additional_estimators : int
+        
+        max_depth : int
+        """
+        if not self._progressive_budget or self._forest_budget >= 1:
+            return (self._n_estimators, 
+                    self._additional_estimators, 
+                    self._max_depth)
+        budget = self._forest_budget
+        n_estimators = max(1, int(np.ceil(self._n_estimators * budget)))
+        additional_estimators = max(1, int(np.ceil(self._additional_estimators 
+                                                   * budget)))
+        max_depth = self._max_depth
+        if max_depth is None:
+            #Depth needed to reach leaves of min_samples_leaf samples
+            n_samples = len(self._target_var_encoded)
+            min_samples_leaf = self._min_samples_leaf
+            if min_samples_leaf < 1:
+                min_samples_leaf = max(1, min_samples_leaf * n_samples)
+            max_depth = int(np.ceil(np.log2(max(n_samples / min_samples_leaf, 
+                                                2)))) + 1
+        max_depth = max(2, int(np.ceil(max_depth * budget)))
+        return n_estimators, additional_estimators, max_depth
+    
+    
+    @Decorators.timeit("fitting and evaluating model",
+                       n_items=lambda self: len(self._target_var_encoded))
+    def _fit_and_evaluate_ensemble_model(self):
         """
         Fits and evaluates the model. 
         1- We compare the out-of-bag score at iteration i-1 with the one at 
@@ -951,15 +1713,6 @@ class ModelMixin():
         3- If it's the other way around, we add more estimators to the total 
             number of estimators we currently have.
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Returns
         -------
         None
@@ -968,6 +1721,7 @@ class ModelMixin():
         precedent_out_of_bag_score = 0
         current_out_of_bag_score = 0
         precedent_estimator = None
+        _, additional_estimators, _ = self._scheduled_forest_size()
         while (current_out_of_bag_score > precedent_out_of_bag_score or not 
                current_out_of_bag_score):
             precedent_estimator = copy(self._estimator)
@@ -975,173 +1729,281 @@ class ModelMixin():
                                 self._target_var_encoded) 
             precedent_out_of_bag_score = current_out_of_bag_score
             current_out_of_bag_score = self._estimator.oob_score_
-            self._estimator.n_estimators += self._additional_estimators
+            self._estimator.n_estimators += additional_estimators
             
         #Keeping the configuration of the previous model(i.e the optimal one)
         self._best_oob_score = np.round(precedent_out_of_bag_score, 2)
-        self._estimator.n_estimators -= self._additional_estimators
+        self._estimator.n_estimators -= additional_estimators
         self._estimator = precedent_estimator
 
 
-    def _fill_one_modality(self, 
-                            predicted_modality, 
-                            prediction_dataframe):
+    def _select_landmarks(self):
         """
-        Handles every modality separately and construct every ad-hoc proximity 
-        matrix.
+        Chooses the landmarks among complete samples(no missing feature and 
+        a target value).
 
-        Parameters
-        ----------
-        predicted_modality : int/foat
-      
-        prediction_dataframe : pandas.core.frame.DataFrame
-       
-        encoded_features : numpy.array
-       
         Returns
         -------
-        one_modality_matrix : numpy.array
-    
-        """
-        matrix_shape = (len(self._encoded_features_pred), 
-                        len(self._encoded_features_pred))
-        one_modality_matrix = np.zeros(matrix_shape)
-        prediction_checklist = prediction_dataframe[0] == predicted_modality
-        idx_check = prediction_dataframe.index[prediction_checklist].tolist() 
-        idx_check = np.array(idx_check)
-        #Using broadcasting to replace null values by 1
-        one_modality_matrix[idx_check[:, None], idx_check] = 1
-        return one_modality_matrix
+        numpy.ndarray
+            Positions of the landmarks in the features frame.
+        """
+        random_generator = np.random.RandomState(42 if self._random_state is None
+                                                 else self._random_state)
+        nan_rows = {row for row, _ in self._missing_values_coordinates}
+        nan_rows.update(self._idx_no_target_value)
+        complete_check = ~self._features.index.isin(list(nan_rows))
+        candidates = np.flatnonzero(complete_check)
+        if self._n_landmarks >= len(candidates):
+            return candidates
+        if self._landmark_selection == const.LEAF_DIVERSE:
+            return self._select_leaf_diverse_landmarks(candidates, 
+                                                       random_generator)
+        target = self._target_variable.values[candidates]
+        if self._target_var_type_prediction.values[0,0] == const.NUMERICAL:
+            edges = np.quantile(target.astype(np.float64), 
+                                np.linspace(0, 1, 11)[1:-1])
+            target = np.searchsorted(edges, target, side="right")
+        strata = pd.unique(target)
+        stratum_sizes = np.array([np.sum(target == stratum) 
+                                  for stratum in strata])
+        #Largest remainder: the strata sizes sum up to n_landmarks
+        quotas = self._n_landmarks * stratum_sizes / len(candidates)
+        n_strata_landmarks = np.floor(quotas).astype(int)
+        n_missing = self._n_landmarks - n_strata_landmarks.sum()
+        largest_remainders = np.argsort(n_strata_landmarks - quotas, 
+                                        kind="stable")[:n_missing]
+        n_strata_landmarks[largest_remainders] += 1
+        landmarks = []
+        for stratum, n_stratum_landmarks in zip(strata, n_strata_landmarks):
+            stratum_candidates = candidates[target == stratum]
+            landmarks.append(random_generator.choice(stratum_candidates,
+                                                     n_stratum_landmarks,
+                                                     replace=False))
+        return np.sort(np.concatenate(landmarks))
         
     
-    def _build_prox_matrices(self, 
-                              iterator, 
-                              update, 
-                              maxval, 
-                              predictions, 
-                              prediction):
+    def _select_leaf_diverse_landmarks(self, candidates, random_generator):
         """
-        Builds proximity matrices.
-            1- We run all the data down the first tree and output predictions.
-            2- If two samples fall in the same node (same predictions) 
-                we count it as 1.
-            3- We do the same for every single tree, sum up the proximity 
-                matrices and divide the total by the number of estimators.
+        Greedy selection of landmarks covering as many (tree, leaf) pairs as 
+        possible: candidates are visited in random order and kept if they fall 
+        in enough leaves not covered yet. The requirement is halved after each
+        pass. Remaining landmarks(if any) are drawn at random.
 
         Parameters
         ----------
-        iterator : int
-            iterator for progress bar
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-        predictions : pandas.core.frame.DataFrame
-           
-        prediction : pandas.core.frame.DataFrame
-           
-        encoded_features : pandas.core.frame.DataFrame
+        candidates : numpy.ndarray
+        
+        random_generator : numpy.random.RandomState
         
+        Returns
+        -------
+        numpy.ndarray
+        """
+        encoded_candidates = self._encoded_rows(candidates)
+        leaves = self._estimator.apply(encoded_candidates)
+        n_trees = leaves.shape[1]
+        covered = np.zeros((n_trees, leaves.max() + 1), dtype=bool)
+        trees = np.arange(n_trees)
+        selected = np.zeros(len(candidates), dtype=bool)
+        order = random_generator.permutation(len(candidates))
+        min_new_leaves = n_trees
+        while min_new_leaves >= 1 and selected.sum() < self._n_landmarks:
+            for candidate in order:
+                if selected[candidate]:
+                    continue
+                new_leaves = ~covered[trees, leaves[candidate]]
+                if new_leaves.sum() >= min_new_leaves:
+                    selected[candidate] = True
+                    covered[trees, leaves[candidate]] = True
+                    if selected.sum() == self._n_landmarks:
+                        break
+            min_new_leaves //= 2
+        missing_landmarks = self._n_landmarks - selected.sum()
+        if missing_landmarks:
+            others = np.flatnonzero(~selected)
+            selected[random_generator.choice(others, 
+                                             missing_landmarks, 
+                                             replace=False)] = True
+        return candidates[selected]
+    
+    
+    def _build_landmark_proximity_matrix(self):
+        """
+        Proximity matrix between the samples having missing values(rows) and
+        the landmarks(columns).
+
         Returns
         -------
         proximity_matrix : numpy.array
-      
         """
-        possible_predictions = prediction[0].unique()
-        if self._target_var_type_prediction.values[0,0] == const.CATEGORICAL:
-            array_to_int = np.vectorize(lambda x: np.int(x))
-            possible_predictions = array_to_int(possible_predictions)       
-        one_modality_matrix = [self._fill_one_modality(predicted_modality, 
-                                                        prediction) 
-                               for predicted_modality in possible_predictions]
-        proximity_matrix = sum(one_modality_matrix)
-        update(iterator*(maxval/len(predictions)))
+        if self._landmarks is None:
+            self._landmarks = self._select_landmarks()
+        nan_positions = self._nan_positions()
+        positions = np.concatenate([nan_positions, self._landmarks])
+        encoded_samples = self._encoded_rows(positions)
+        n_nan_samples = len(nan_positions)
+        groups = self._tree_groups(encoded_samples, positions)
+        proximity_matrix = self._accumulate_proximities(
+                                groups, 
+                                np.arange(n_nan_samples),
+                                np.arange(n_nan_samples, len(positions)))
+        proximity_matrix /= len(self._estimator.estimators_)
+        self._proximity_rows = pd.Index(nan_positions)
+        self._proximity_columns = pd.Index(self._landmarks)
         return proximity_matrix
+    
+    
+    @Decorators.timeit("building proximity matrix",
+                       n_items=lambda self: self._encoded_features_pred.shape[0])
+    def build_proximity_matrix(self):
+        """
+        Builds final proximity matrix: 
+            1- We run all the data down every tree and output predictions.
+            2- If two samples fall in the same node (same predictions) 
+                we count it as 1(see MissingValuesHandler.proximity).
+            3- We divide the counts by the number of estimators.
+        In landmark mode, only the proximities between the samples having 
+        missing values and the landmarks are computed. With 
+        'missing_rows_only', only the rows of the samples having missing 
+        values are computed.
 
+        Returns
+        -------
+        final_proximity_matrix : numpy.array
+
+        """
+        if self._n_landmarks:
+            return self._build_landmark_proximity_matrix()
+        number_of_estimators =  self._estimator.n_estimators  
+        n_samples = self._encoded_features_pred.shape[0]
+        groups = self._tree_groups(self._encoded_features_pred, 
+                                   np.arange(n_samples))
+        if self._missing_rows_only:
+            self._proximity_rows = pd.Index(self._nan_positions())
+        else:
+            self._proximity_rows = pd.RangeIndex(n_samples)
+        self._proximity_columns = pd.RangeIndex(n_samples)
+        final_proximity_matrix = self._accumulate_proximities(
+                                    groups, 
+                                    self._proximity_rows.values)
+        final_proximity_matrix /= number_of_estimators
+        return final_proximity_matrix
+    
     
-    def _pred_to_frame(self, estimator):
+    def _tree_groups(self, encoded_samples, positions):
         """
-        Refactor method
+        Runs the samples down the trees once and keeps their leaves for 
+        _retrieve_combined_predictions.
 
         Parameters
         ----------
-        estimator : sklearn.tree
+        encoded_samples : pandas.core.frame.DataFrame or scipy.sparse matrix
+        
+        positions : numpy.ndarray
+            Positions of the samples in the features frame.
 
-        encoded_features : pandas.core.frame.DataFrame
-     
         Returns
         -------
-        pandas.core.frame.DataFrame
+        numpy.ndarray
+            (n_samples, n_trees) group ids(see MissingValuesHandler.proximity)
+        """
+        leaves = prox.tree_leaves(self._estimator, encoded_samples)
+        if leaves is None:
+            self._tree_leaves = None
+            return prox.group_ids(prox.tree_predictions(self._estimator, 
+                                                        encoded_samples))
+        self._tree_leaves = (pd.Index(positions), leaves)
+        return prox.leaf_groups(self._estimator, leaves)
     
-        """
-        return pd.DataFrame(estimator.predict(self._encoded_features_pred))
-  
     
-    @Decorators.timeit
-    def build_proximity_matrix(self, 
-                               title, 
-                               update, 
-                               maxval):
+    def _accumulate_proximities(self, groups, rows, columns=None):
         """
-        Builds final proximity matrix: sum of all proximity matrices.
+        Runs the proximity kernel in the main process or in worker processes,
+        in the storage of the proximity parameters.
 
         Parameters
         ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-        ensemble_estimator : sklearn.ensemble._forest
-         
-        encoded_features : pandas.core.frame.DataFrame
-  
+        groups : numpy.ndarray
+        
+        rows : numpy.ndarray
+        
+        columns : numpy.ndarray, optional
+            The default is None.
+
         Returns
         -------
-        final_proximity_matrix : pandas.core.frame.DataFrame
-
+        numpy.ndarray, numpy.memmap or scipy.sparse.csr_matrix
+        """
+        if self._proximity_storage == const.SPARSE_TOP_K:
+            return prox.top_k_proximities(groups, rows, columns, self._top_k)
+        if self._proximity_storage == const.MEMMAP:
+            n_columns = groups.shape[0] if columns is None else len(columns)
+            out = prox.memmap_accumulator((len(rows), n_columns), 
+                                          self._memmap_directory)
+            return prox.accumulate_proximities(groups, rows, columns, out=out)
+        if self._proximity_workers == 1:
+            return prox.accumulate_proximities(groups, rows, columns)
+        return prox.parallel_accumulate_proximities(groups, 
+                                                    rows, 
+                                                    columns,
+                                                    self._proximity_workers)
+    
+    
+    def _nan_positions(self):
         """
-
-        all_estimators_list =  self._estimator.estimators_
-        number_of_estimators =  self._estimator.n_estimators  
-        predictions = [self._pred_to_frame(estimator) 
-                       for estimator in all_estimators_list]
-        proximity_matrices = [self._build_prox_matrices(iterator, 
-                                                         update, 
-                                                         maxval, 
-                                                         predictions, 
-                                                         prediction) 
-                             for iterator, prediction in enumerate(predictions)] 
-        final_proximity_matrix = sum(proximity_matrices)/number_of_estimators
-        return final_proximity_matrix
+        Returns
+        -------
+        numpy.ndarray
+            Sorted positions(in the features) of the samples having missing 
+            values.
+        """
+        nan_rows = {row for row, _ in self._missing_values_coordinates}
+        return np.sort(self._features.index.get_indexer(list(nan_rows)))
      
     
     def _retrieve_combined_predictions(self):
         """
-        Predicts new values for the target variable(if there is any nan).
+        Predicts new values for the target variable(if there is any nan). 
+        Only the samples having no target value are predicted, from the 
+        leaves computed for the proximities when they are available.
 
         Returns
         -------
         None
 
         """
-        combined_pred = self._estimator.predict(self._encoded_features_pred)
-        for index in self._idx_no_target_value:
-            sample_pred = combined_pred[index]
-            if self._mappings_target_variable:
-                realval = self._mappings_target_variable[sample_pred]
-                self._nan_target_variable_preds[index].append(realval)
-            else:
-                self._nan_target_variable_preds[index].append(sample_pred)
+        if not len(self._idx_no_target_value):
+            return
+        target_positions = np.asarray(self._idx_no_target_value)
+        if self._tree_leaves is None:
+            combined_pred = self._estimator.predict(
+                                self._encoded_rows(target_positions))
+        else:
+            positions, leaves = self._tree_leaves
+            indexer = positions.get_indexer(target_positions)
+            known = indexer >= 0
+            target_leaves = np.empty((len(target_positions), leaves.shape[1]),
+                                     dtype=leaves.dtype)
+            target_leaves[known] = leaves[indexer[known]]
+            if not known.all():
+                target_leaves[~known] = self._estimator.apply(
+                    self._encoded_rows(target_positions[~known]))
+            combined_pred = prox.forest_predictions(self._estimator, 
+                                                    target_leaves)
+        if self._mappings_target_variable:
+            encoded_values = np.array(list(self._mappings_target_variable))
+            original_values = np.array(list(self._mappings_target_variable
+                                            .values()), dtype=object)
+            order = np.argsort(encoded_values)
+            combined_pred = original_values[order][
+                np.searchsorted(encoded_values[order], combined_pred)]
+        for index, sample_pred in zip(self._idx_no_target_value, combined_pred):
+            self._nan_target_variable_preds[index].append(sample_pred)
    
              
-    @Decorators.timeit    
-    def _compute_weighted_averages(self, 
-                                    title, 
-                                    update, 
-                                    maxval, 
-                                    decimals):
+    @Decorators.timeit("computing weighted averages",
+                       n_items=lambda self: len(self._missing_values_coordinates))
+    def _compute_weighted_averages(self, decimals):
         """
         Computes weights for every single missing value.
         For categorical variables: 
@@ -1153,19 +2015,13 @@ class ModelMixin():
 
         Parameters
         ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
         decimals : int          
 
         Returns
         -------
         None
         """     
-        for iterator, missing_sample in enumerate(self._missing_values_coordinates):     
+        for missing_sample in self._missing_values_coordinates:     
             #'nan sample number': row that has a missing value.
             #'nan feature name': name of the feature currently selected.
             nan_sample = missing_sample[0]
@@ -1173,23 +2029,23 @@ class ModelMixin():
             target_type = (self._features_type_predictions
                           .loc[nan_feature_name]
                           .any())
+            #For every sample with a missing value, we get the proximities 
+            #with the other samples(or the landmarks) and their values
+            proximities, reference_samples = (self
+                                              ._reference_proximities(nan_sample))
+            feature_values = self._features[nan_feature_name].values
+            reference_values = feature_values[reference_samples]
+            prox_values_sum = np.sum(proximities)
             if target_type == const.NUMERICAL:
-                #For every sample with a missing value, we get the proximities
-                #We strip the proximity value of the selected sample 
-                proximity_vector = self._proximity_matrix[nan_sample]
-                prox_values_of_other_samples = np.delete(proximity_vector, 
-                                                         nan_sample)
-                #We compute the weight
-                prox_values_sum = np.sum(prox_values_of_other_samples)
-                weight_vector = prox_values_of_other_samples / prox_values_sum
-                                  
-                #We get all feature's values for every other sample
-                other_samples_check = self._features.index != nan_sample
-                coords = (other_samples_check, nan_feature_name)
-                other_features_value = self._features.loc[coords].values
+                #We compute the weight(uniform if no sample is close)
+                if prox_values_sum:
+                    weight_vector = proximities / prox_values_sum
+                else:
+                    weight_vector = np.full(len(proximities), 
+                                            1 / len(proximities))
                 
                 #Dot product between each feature's value and its weight     
-                weighted_average = np.dot(other_features_value, weight_vector)
+                weighted_average = np.dot(reference_values, weight_vector)
                 
                 #Round float number if it is required.
                 rounded_value = np.around(weighted_average, decimals=decimals)
@@ -1203,33 +2059,54 @@ class ModelMixin():
                                             .value_counts())
                 proportion_per_modality = (frequencies_per_modality /
                                            np.sum(frequencies_per_modality))
-                for modality in proportion_per_modality.index.values:
-                    #We get all the samples containing the modality.
-                    checklist = self._features[nan_feature_name]==modality
-                    samples = (self._features[nan_feature_name]
-                               .index[checklist]
-                               .values)
-                    
-                    #Excluding selected sample
-                    if nan_sample in samples:
-                        samples_check = np.where(samples == nan_sample)
-                        samples = np.delete(samples, samples_check)                    
-                    #Proximity per modality
-                    prox_values = self._proximity_matrix[samples, nan_sample]             
-                    #We get all other proximities
-                    all_prox_values = self._proximity_matrix[:, nan_sample]                
-                    #We compute the weight
-                    weight = np.sum(prox_values)/np.sum(all_prox_values)                  
-                    #Weighted frequency
-                    weighted_freq = proportion_per_modality[modality] * weight
-                    proportion_per_modality[modality] = weighted_freq                
+                #Proximity per modality
+                prox_per_modality = (pd.Series(proximities)
+                                     .groupby(reference_values)
+                                     .sum()
+                                     .reindex(proportion_per_modality.index,
+                                              fill_value=0))
+                #We compute the weights
+                weights = prox_per_modality / (prox_values_sum or 1)
+                #Weighted frequencies
+                proportion_per_modality = proportion_per_modality * weights
                 #We get the modality that has the biggest weighted frequency.
                 optimal_weight = proportion_per_modality.idxmax()                                             
                 #We put every weighted frequency in the group.
                 self._divergent_values[missing_sample].append(optimal_weight) 
-            update(iterator*(maxval/len(self._missing_values_coordinates)))
 
     
+    def _reference_proximities(self, nan_sample):
+        """
+        Proximities between a sample and the reference samples: every other 
+        sample, or the landmarks in landmark mode.
+
+        Parameters
+        ----------
+        nan_sample : int
+            Index of the sample in the features.
+
+        Returns
+        -------
+        proximities : numpy.array
+        
+        reference_samples : numpy.array
+            Positions of the reference samples in the features.
+        """
+        position = self._features.index.get_loc(nan_sample)
+        row = self._proximity_rows.get_loc(position)
+        proximities = self._proximity_matrix[row]
+        if self._proximity_storage == const.SPARSE_TOP_K:
+            #Proximities out of the top k are 0: no weight
+            proximities = proximities.toarray()[0]
+        reference_samples = self._proximity_columns.values
+        if position in self._proximity_columns:
+            #We strip the proximity value of the selected sample 
+            column = self._proximity_columns.get_loc(position)
+            proximities = np.delete(proximities, column)
+            reference_samples = np.delete(reference_samples, column)
+        return proximities, reference_samples
+    
+    
     def _std_ent(self, option, variable):
         """
         Parameters
@@ -1246,6 +2123,7 @@ class ModelMixin():
         if option == "std":
             result = np.std(variable)
         elif option == "ent": 
+            from scipy import stats as ss
             frequencies=Counter(variable)
             prob = [value/len(variable) for _,value in frequencies.items()]
             result = ss.entropy(prob)
@@ -1272,33 +2150,22 @@ class ModelMixin():
                                                            last_n_substitutes)
             
          
-    @Decorators.timeit                    
-    def _replace_missing_values_in_features_frame(self, title, update, maxval):
+    @Decorators.timeit("replacing missing values",
+                       n_items=lambda self: len(self._divergent_values))
+    def _replace_missing_values_in_features_frame(self):
         """
         Replaces nan with new values in 'self._encoded_features'.
 
-        Parameters
-        ----------
-        title : str
-            Progress bar variable
-        update : function
-            Progress bar variable
-        maxval : int
-            Progress bar variable
-
         Returns
         -------
         None
         """
-        weighted_averages_iter = enumerate(self._divergent_values.items())
-        for iterator, weighted_averages in weighted_averages_iter:
-            missing_value_coordinates, substitute = weighted_averages 
+        for missing_value_coordinates, substitute in self._divergent_values.items():
             #Getting the coordinates.
             last_substitute = substitute[-1]
             
             #Replacing values in the features dataframe.
             self._features.loc[missing_value_coordinates] = last_substitute       
-            update(iterator*(maxval/len(self._divergent_values)))
 
   
     def _replace_missing_values_in_target_variable(self):
@@ -1346,8 +2213,11 @@ class ModelMixin():
             feature_type = (self._features_type_predictions
                             .loc[nan_feature_name]
                             .any())
-            if (feature_type==const.NUMERICAL and 0<=standard_deviation<=1)\
-            or (feature_type==const.CATEGORICAL and not standard_deviation):
+            if feature_type==const.NUMERICAL:
+                tolerance = self._feature_tolerance(nan_feature_name)
+            else:
+                tolerance = self._categorical_tolerance
+            if 0<=standard_deviation<=tolerance:
                 converged_value = self._divergent_values[coordinates][-1] 
                 self._converged_values[coordinates] = converged_value
                 self._all_weighted_averages[coordinates] = self._divergent_values[coordinates]
@@ -1357,13 +2227,323 @@ class ModelMixin():
                 self._std_entropy.pop(coordinates)
                 
                 
+    def _feature_tolerance(self, feature_name):
+        """
+        Absolute tolerance of a numerical feature. A relative tolerance falls 
+        back to the other scale, then to an absolute one, if the feature has 
+        no spread.
+
+        Parameters
+        ----------
+        feature_name : str
+
+        Returns
+        -------
+        float
+        """
+        tolerance, tolerance_type = self._feature_tolerances.get(
+                                      feature_name, 
+                                      (self._tolerance, self._tolerance_type))
+        if tolerance_type == const.ABSOLUTE:
+            return tolerance
+        scales = self._feature_scales.get(feature_name, {})
+        other_type = const.STD if tolerance_type == const.IQR else const.IQR
+        scale = scales.get(tolerance_type) or scales.get(other_type) or 1
+        return tolerance * scale
+    
+    
+    def _deadline_reached(self):
+        """
+        Returns
+        -------
+        bool
+            True if a time budget was given and has been spent.
+        """
+        return (self._deadline is not None and 
+                time.perf_counter() >= self._deadline)
+    
+    
+    def _build_convergence_report(self, nan_coordinates):
+        """
+        Status of every missing value once training is over:
+            - converged: its substitutes converged
+            - in progress: training stopped(time budget) before it converged,
+              its latest substitute is used
+            - initial guess: no substitute at all or unable to converge, the 
+              median or the mode is used
+
+        Parameters
+        ----------
+        nan_coordinates : list
+            (row, feature name) of every missing value.
+
+        Returns
+        -------
+        None
+        """
+        #Values left in 'self._divergent_values' fell back to the initial 
+        #guesses unless training was stopped by the time budget
+        divergent_status = (const.INITIAL_GUESS if self._has_converged 
+                            else const.IN_PROGRESS)
+        report = []
+        for coordinates in nan_coordinates:
+            if coordinates in self._converged_values:
+                status = const.CONVERGED
+                n_substitutes = len(self._all_weighted_averages[coordinates])
+            elif coordinates in self._divergent_values:
+                status = divergent_status
+                n_substitutes = len(self._divergent_values[coordinates])
+            else:
+                status, n_substitutes = const.INITIAL_GUESS, 0
+            report.append((*coordinates, 
+                           self._features.at[coordinates], 
+                           status, 
+                           n_substitutes))
+        columns = ["row", "feature", "substitute", "status", "n_substitutes"]
+        self._convergence_report = (pd.DataFrame(report, columns=columns)
+                                    .set_index(["row", "feature"]))
+        
+        
+    def get_convergence_report(self):
+        """
+        Retrieves the status of every missing value of the last training
+        (see _build_convergence_report).
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            Indexed by (row, feature): substitute, status and number of 
+            substitutes computed.
+        """
+        return self._convergence_report
+    
+    
+    def _is_categorical(self, feature_name):
+        """
+        Parameters
+        ----------
+        feature_name : str
+
+        Returns
+        -------
+        bool
+        """
+        return (self._features_type_predictions
+                .loc[feature_name]
+                .any() == const.CATEGORICAL)
+    
+    
+    @Decorators.timeit("saving checkpoint")
+    def _save_checkpoint(self, checkpoint_dir, total_iterations, arguments):
+        """
+        Saves the state of the training at the end of a round of iterations:
+        substitutes of every missing value(converged or not), predictions of 
+        the missing target values and convergence history. The features frame
+        itself is not saved: preprocessing and the latest substitutes give it
+        back.
+
+        Parameters
+        ----------
+        checkpoint_dir : str
+        
+        total_iterations : int
+        
+        arguments : dict
+            Training arguments(decimals, sample_size, n_quantiles).
+
+        Returns
+        -------
+        None
+        """
+        feature_names = list(self._features.columns)
+        feature_codes = {name:code for code, name in enumerate(feature_names)}
+        modalities = {}
+        arrays = {}
+        groups = {"divergent":[(coordinates, self._divergent_values[coordinates])
+                               for coordinates in self._missing_values_coordinates],
+                  "converged":[(coordinates, self._all_weighted_averages[coordinates])
+                               for coordinates in self._converged_values]}
+        for group, histories in groups.items():
+            coordinates = [coordinates for coordinates, _ in histories]
+            arrays[f"{group}_rows"] = np.array([row for row, _ in coordinates],
+                                               dtype=np.int64)
+            arrays[f"{group}_features"] = np.array([feature_codes[name] for _, name
+                                                    in coordinates],
+                                                   dtype=np.int32)
+            categorical = [self._is_categorical(name) for _, name in coordinates]
+            (arrays[f"{group}_offsets"], 
+             arrays[f"{group}_values"]) = ckpt.pack_histories(
+                                             [history for _, history in histories],
+                                             categorical,
+                                             modalities)
+        target_categorical = (self._target_var_type_prediction["Predictions"]
+                              .any() == const.CATEGORICAL)
+        target_predictions = self._nan_target_variable_preds
+        arrays["target_rows"] = np.array(list(target_predictions), dtype=np.int64)
+        (arrays["target_offsets"], 
+         arrays["target_values"]) = ckpt.pack_histories(
+                                      list(target_predictions.values()),
+                                      [target_categorical]*len(target_predictions),
+                                      modalities)
+        arrays["remaining_check"] = np.array(self._nan_values_remaining_check,
+                                             dtype=np.int64)
+        arrays["remaining_history"] = np.array(self._nan_values_remaining_history,
+                                               dtype=np.int64)
+        modalities = [modality.item() if isinstance(modality, np.generic) 
+                      else modality for modality in modalities]
+        metadata = {"round":len(self._nan_values_remaining_history),
+                    "total_iterations":total_iterations,
+                    "arguments":arguments,
+                    "feature_names":feature_names,
+                    "number_of_nan_values":self._number_of_nan_values,
+                    "target_categorical":bool(target_categorical),
+                    "modalities":modalities,
+                    "forest_budget":self._forest_budget}
+        ckpt.write_checkpoint(checkpoint_dir, arrays, metadata)
+        
+        
+    def _restore_checkpoint(self, arrays, metadata):
+        """
+        Restores the state saved by _save_checkpoint once preprocessing is 
+        done.
+
+        Parameters
+        ----------
+        arrays : dict
+        
+        metadata : dict
+
+        Raises
+        ------
+        customs.CheckpointError
+
+        Returns
+        -------
+        total_iterations : int
+        """
+        feature_names = metadata["feature_names"]
+        if (feature_names != list(self._features.columns) or
+            metadata["number_of_nan_values"] != self._number_of_nan_values):
+            text = "The checkpoint doesn't match the data of the imputer"
+            raise customs.CheckpointError(text)
+        modalities = metadata["modalities"]
+        integers = not metadata["arguments"]["decimals"]
+        def decode(history, categorical):
+            if categorical:
+                return [modalities[int(value)] for value in history]
+            if integers:
+                return [int(value) for value in history]
+            return list(history)
+        
+        histories = {}
+        for group in ("divergent", "converged"):
+            coordinates = [(row.item(), feature_names[feature]) 
+                           for row, feature in zip(arrays[f"{group}_rows"],
+                                                   arrays[f"{group}_features"])]
+            group_histories = ckpt.unpack_histories(arrays[f"{group}_offsets"],
+                                                    arrays[f"{group}_values"])
+            histories[group] = {coordinates:decode(history, 
+                                                   self._is_categorical(coordinates[1]))
+                                for coordinates, history in zip(coordinates,
+                                                                group_histories)}
+        all_coordinates = set(histories["divergent"]) | set(histories["converged"])
+        if not all_coordinates <= set(self._missing_values_coordinates):
+            text = "The checkpoint doesn't match the data of the imputer"
+            raise customs.CheckpointError(text)
+            
+        self._missing_values_coordinates = list(histories["divergent"])
+        self._divergent_values = defaultdict(list, histories["divergent"])
+        self._all_weighted_averages = defaultdict(list, histories["converged"])
+        self._converged_values = defaultdict()
+        for coordinates, history in histories["converged"].items():
+            self._converged_values[coordinates] = history[-1]
+        for group in histories.values():
+            for coordinates, history in group.items():
+                self._features.loc[coordinates] = history[-1]
+        target_histories = ckpt.unpack_histories(arrays["target_offsets"],
+                                                 arrays["target_values"])
+        self._nan_target_variable_preds = defaultdict(list)
+        for row, history in zip(arrays["target_rows"], target_histories):
+            self._nan_target_variable_preds[row.item()] = (
+                [modalities[int(value)] for value in history] 
+                if metadata["target_categorical"] else list(history))
+        self._nan_values_remaining_check.clear()
+        self._nan_values_remaining_check.extend(arrays["remaining_check"].tolist())
+        self._nan_values_remaining_history = arrays["remaining_history"].tolist()
+        self._forest_budget = metadata["forest_budget"]
+        return metadata["total_iterations"]
+    
+    
+    def _log(self, text):
+        """
+        Prints a training message unless training is silent.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        None
+        """
+        if self._print_messages:
+            print(text)
+            
+            
+    def _update_forest_budget(self, converged_fraction):
+        """
+        Progressive budget: the forest grows with the fraction of converged 
+        values and never shrinks. The full forest is used as soon as a round 
+        brings no improvement: training never stops on such a round without a
+        round on the full forest(see _check_for_final_convergence). Values 
+        having converged earlier keep the substitutes of the smaller forests.
+
+        Parameters
+        ----------
+        converged_fraction : float
+
+        Returns
+        -------
+        None
+        """
+        remaining_check = self._nan_values_remaining_check
+        stalled = (len(remaining_check) > 1 and 
+                   remaining_check[-1] == remaining_check[-2])
+        if stalled:
+            self._forest_budget = 1.0
+        else:
+            self._forest_budget = max(self._forest_budget,
+                                      self._initial_budget + 
+                                      (1 - self._initial_budget) 
+                                      * converged_fraction)
+        
+        
+    def _is_stalled(self):
+        """
+        Early stop rule: the number of values remaining shrank by min_shrink 
+        or less over the last early_stop_rounds rounds of iterations.
+
+        Returns
+        -------
+        bool
+        """
+        history = self._nan_values_remaining_history
+        if not self._early_stop_rounds or len(history) <= self._early_stop_rounds:
+            return False
+        previous_remaining = history[-1 - self._early_stop_rounds]
+        shrink = previous_remaining - history[-1]
+        return shrink <= self._min_shrink * previous_remaining
+        
+        
     def _check_for_final_convergence(self):
         """
          Checks if all values have converged. If it is the case, training 
         stops. Otherwise it will continue as long as there are improvements. If
         there are no improvements, the resiliency factor will kick in and try 
         for n(training_resilience) more set of iterations. If it happens that 
-        some values converged, training will continue. Otherwise, it will stop.
+        some values converged, training will continue. Otherwise, it will stop,
+        unless the round was run on a partial forest(progressive budget): one 
+        more round is then run on the full forest.
 
         Returns
         -------
@@ -1375,26 +2555,37 @@ class ModelMixin():
         nan_values_converged = total_nan_values - nan_values_remaining
         text =(f"\n\n- {nan_values_converged} VALUE(S) CONVERGED!\n" 
                f"- {nan_values_remaining} VALUE(S) REMAINING!")
-        print(text)
+        self._log(text)
         
         #Checking if there are still values that didn't converge: 
         self._nan_values_remaining_check.append(nan_values_remaining)
-        if (len(set(self._nan_values_remaining_check))==1 and 
-            len(self._nan_values_remaining_check)==self._training_resilience):   
+        self._nan_values_remaining_history.append(nan_values_remaining)
+        partial_forest = self._progressive_budget and self._forest_budget < 1
+        self._update_forest_budget(nan_values_converged / total_nan_values)
+        resilience_exhausted = (len(set(self._nan_values_remaining_check))==1 
+                                and len(self._nan_values_remaining_check)==
+                                self._training_resilience)
+        stop = resilience_exhausted or self._is_stalled()
+        if stop and partial_forest and self._missing_values_coordinates:
+            self._forest_budget = 1.0
+            text = ("- NO IMPROVEMENT WITH A PARTIAL FOREST."
+                    " ONTO A ROUND OF ITERATIONS WITH THE FULL FOREST...\n")
+            self._log(text)
+        elif stop:   
             self._has_converged = True   
             self._fill_with_nan()
-            self._make_initial_guesses(title="")
+            self._make_initial_guesses()
             text = (f"- {nan_values_remaining}/{total_nan_values} VALUES UNABLE" 
                     " TO CONVERGE. THE MEDIAN AND/OR THE MODE HAVE BEEN USED AS" 
                     " A REPLACEMENT")
-            print(text)              
+            self._log(text)              
         elif not self._missing_values_coordinates:
             self._has_converged = True
-            print("\n- ALL VALUES CONVERGED!") 
+            self._log("\n- ALL VALUES CONVERGED!") 
         else: 
             text = ("- NOT EVERY VALUE CONVERGED."
                     " ONTO THE NEXT ROUND OF ITERATIONS...\n")
-            print(text)
+            self._log(text)
             
                                                  
 """
@@ -1405,7 +2596,12 @@ class ModelMixin():
 ##############################################################################
 """  
 class PlotMixin():
-    def get_mds_coordinates(self, n_dimensions, distance_matrix):
+    def get_mds_coordinates(self, 
+                            n_dimensions, 
+                            distance_matrix, 
+                            method=const.SMACOF,
+                            n_landmarks=1000,
+                            random_state=None):
         """
         Multidimensional scaling coordinates to reduce distance matrix 
         to n_dimensions(< n_dimensions of distance matrix)
@@ -1414,24 +2610,83 @@ class PlotMixin():
         ----------
         n_dimensions : int
             NUMBER OF DIMENSIONS FOR MDS.
-        distance_matrix : numpy.array
+        distance_matrix : DistanceMatrix, numpy.array, numpy.memmap or
+                          scipy sparse matrix
+            Square distances(get_distance_matrix). Unstored entries of a 
+            sparse matrix are distances of 0.
+        method : str, optional
+            - smacof: Scikit-Learn MDS, iterative with O(n²) steps. Only 
+              suited for a few thousand samples
+            - classical: classical MDS with a truncated eigensolver, the 
+              distance matrix being read by blocks of rows
+            - landmark: classical MDS of n_landmarks samples, the others 
+              being placed from their distances to them. The fastest
+            The default is "smacof".
+        n_landmarks : int, optional
+            Only for the landmark method. The default is 1000.
+        random_state : int, optional
+            The default is None.
+
+        Raises
+        ------
+        customs.MdsMethodError
+        
+        customs.DistanceMatrixShapeError
+            The distance matrix isn't square: the proximities were computed in
+            landmark mode or with 'missing_rows_only'.
         
         Returns
         -------
         coordinates : numpy.array
             MDS COORDINATES
         """
+        import MissingValuesHandler.mds as mds
+        if method not in (const.SMACOF, const.CLASSICAL, const.LANDMARK):
+            raise customs.MdsMethodError()
+        n_rows, n_columns = distance_matrix.shape
+        if n_rows != n_columns:
+            if self._n_landmarks:
+                mode = f"landmark mode(n_landmarks={self._n_landmarks})"
+            elif self._missing_rows_only:
+                mode = "'missing_rows_only'"
+            else:
+                mode = "the proximity parameters"
+            text = (f"MDS needs a square distance matrix, not {n_rows} x "
+                    f"{n_columns}: the proximities were computed with {mode}."
+                    " Train with set_proximity_parameters(n_landmarks=0, "
+                    "missing_rows_only=False) first")
+            raise customs.DistanceMatrixShapeError(text)
         coordinates=None
-        if n_dimensions<len(distance_matrix):
-            mds=manifold.MDS(n_components=n_dimensions, 
-                             dissimilarity='precomputed')
-            coordinates=mds.fit_transform(distance_matrix)
-        else:
+        if n_dimensions>=distance_matrix.shape[0]:
             print("n_dimensions > n_dimensions of distance matrix")
+        elif method==const.CLASSICAL:
+            coordinates=mds.classical_mds(distance_matrix, 
+                                          n_dimensions,
+                                          random_state)
+        elif method==const.LANDMARK:
+            coordinates, _=mds.landmark_mds(distance_matrix, 
+                                            n_dimensions,
+                                            max(n_landmarks, n_dimensions+1),
+                                            random_state)
+        else:
+            from sklearn import manifold
+            #SMACOF needs a dense matrix: sparse matrix or DistanceMatrix
+            #(float32)
+            if hasattr(distance_matrix, "toarray"):
+                distance_matrix=distance_matrix.toarray()
+            mds_=manifold.MDS(n_components=n_dimensions, 
+                              dissimilarity='precomputed',
+                              random_state=random_state)
+            coordinates=mds_.fit_transform(distance_matrix)
         return coordinates
   
       
-    def show_mds_plot(self, coordinates, plot_type="2d", path_to_save=None):
+    def show_mds_plot(self, 
+                      coordinates, 
+                      plot_type="2d", 
+                      path_to_save=None,
+                      max_points=10000,
+                      random_state=None):
         """
         2d or 3d  multidimensional scaling plot
 
@@ -1443,106 +2698,131 @@ class PlotMixin():
             2d/3d for a 2 or 3 dimensional plot. The default is "2d".
         path_to_save : str, optional
             The default is None
+        max_points : int, optional
+            Beyond max_points samples, a uniform sample of max_points of them 
+            is displayed. Markers shrink with the number of points and are 
+            rasterized. The default is 10000.
+        random_state : int, optional
+            Seeds the sample of the points. The default is None.
 
         Returns
         -------
         None
         """
+        import matplotlib.pyplot as plt
+        from MissingValuesHandler.mds import subsample
         plot_type = plot_type.lower().strip()
         filename = ""
+        n_points = len(coordinates)
+        points = np.asarray(coordinates[subsample(n_points, 
+                                                  max_points, 
+                                                  random_state)])
+        size_scale = min(1.0, 1000/len(points))
+        title_text = (f" ({len(points)} OF {n_points} POINTS)" 
+                      if len(points) < n_points else "")
         if plot_type == "2d":
-            plt.scatter(coordinates[:,0], coordinates[:,1])
-            plt.title("2D MDS PLOT")
+            plt.scatter(points[:,0], 
+                        points[:,1], 
+                        s=36*size_scale, 
+                        rasterized=True)
+            plt.title("2D MDS PLOT"+title_text)
             plt.xlabel("MDS1")
             plt.ylabel("MDS2") 
-            plt.show()
             filename = "2d_mds_plot"+const.IMG_EXTENSION
         elif plot_type == "3d":
+            #Registers the 3d projection
+            import mpl_toolkits.mplot3d
             fig = plt.figure(figsize=(6, 6))
             ax = fig.add_subplot(111, projection=plot_type)
-            ax.scatter(coordinates[:,0], 
-                       coordinates[:,1], 
-                       coordinates[:,2], 
-                       linewidths=1, 
+            ax.scatter(points[:,0], 
+                       points[:,1], 
+                       points[:,2], 
+                       linewidths=size_scale, 
                        alpha=.7,
-                       s = 200)
-            plt.title("3D MDS PLOT")
-            plt.show()
+                       s = 200*size_scale,
+                       rasterized=True)
+            plt.title("3D MDS PLOT"+title_text)
             filename = "3d_mds_plot"+const.IMG_EXTENSION
+        #Saved before being shown: the figure is closed once shown
         if path_to_save:  
             plt.savefig(os.path.join(path_to_save, filename))
+        plt.show()
       
 
-    def _numerical_categorical_plots(self, 
-                                    predicted_values, 
-                                    variable_type_prediction, 
-                                    coordinates, 
-                                    iterations, 
-                                    std, 
-                                    path, 
-                                    filename, 
-                                    std_str):
+    def _history_plot_item(self, 
+                           predicted_values, 
+                           variable_type_prediction, 
+                           coordinates, 
+                           filename):
         """
-        Creates plot for numerical and categorical values.
+        Plot of the evolution of the substitutes of a missing value.
 
         Parameters
         ----------
-        predicted_values : str/int
+        predicted_values : list
             
         variable_type_prediction : str
             
-        coordinates : tuple
-            
-        iterations : int
-            
-        std : str
-            
-        path : str
+        coordinates : tuple or int
             
         filename : str
             
-        std_str : str
-            
         Returns
         -------
-        None
+        filename : str
+            With the std of the last n substitutes for numerical values.
+        plotting.PlotItem
         """
-        if not os.path.exists(path):
-            os.makedirs(path)
+        from MissingValuesHandler.plotting import PlotItem
+        iterations = len(predicted_values)
         if variable_type_prediction==const.NUMERICAL:
-            plt.ioff()
-            plt.figure()
+            std = np.round(np.std(predicted_values[-self._last_n_iterations:]), 2)
             title_text = (f"Evolution of value {coordinates} over {iterations}" 
                           f" iterations\nstd on the last {self._last_n_iterations}" 
                           f" iterations:{std}")
-            plt.title(title_text)
-            plt.plot(np.arange(1,iterations+1), predicted_values)
-            plt.xlabel('Iterations')
-            plt.ylabel('Values')
-            plt.savefig(os.path.join(path, filename+"_"+std_str+const.IMG_EXTENSION))
-            plt.close()
-        else:
-            plt.ioff()
-            plt.figure()
-            data = Counter(predicted_values)
-            names = list(data.keys())
-            values = list(data.values())
-            percentages = list(map(int, (values/np.sum(values))*100))
-            for i in range(len(percentages)):
-                plt.annotate(s=percentages[i], 
-                             xy=(names[i], percentages[i]+1), 
-                             fontsize=10)
-                plt.hlines(percentages[i], xmin=0, xmax=0)
-            plt.bar(names, percentages, align="center")
-            plt.ylabel('Proportion')
-            title_text = (f"Proportions of value {coordinates} modalities after"
-                          f" {iterations} iterations")
-            plt.title(title_text)
-            plt.savefig(os.path.join(path, filename+const.IMG_EXTENSION))
-            plt.close()
+            return (f"{filename}_std_{std}", 
+                    PlotItem(title_text, list(predicted_values), True))
+        title_text = (f"Proportions of value {coordinates} modalities after"
+                      f" {iterations} iterations")
+        return filename, PlotItem(title_text, list(predicted_values), False)
+    
+    
+    @staticmethod
+    def _render_plots(groups, directory_path, layout, grid_shape, n_workers):
+        """
+        Parameters
+        ----------
+        groups : dict
+            directory -> list of (file name, plotting.PlotItem)
+        directory_path : str
+        
+        layout : str
+        
+        grid_shape : tuple
+        
+        n_workers : int
+
+        Raises
+        ------
+        customs.PlotLayoutError
+
+        Returns
+        -------
+        None
+        """
+        from MissingValuesHandler import plotting
+        if layout not in (const.CELL, const.GRID, const.PDF):
+            raise customs.PlotLayoutError()
+        n_files = plotting.render(groups, layout, grid_shape, n_workers)
+        print(f"- {n_files} FILE(S) CREATED IN {directory_path}")
                 
                 
-    def create_weighted_averages_plots(self, directory_path, both_graphs=0):
+    def create_weighted_averages_plots(self, 
+                                       directory_path, 
+                                       both_graphs=0,
+                                       layout=const.CELL,
+                                       grid_shape=(4, 4),
+                                       n_workers=1):
         """
         Creates plots of nan predicted values evolution over n iterations.
         Two type of plots can be generated: for values that diverged and those 
@@ -1556,6 +2836,16 @@ class PlotMixin():
         both_graphs : int, optional
             The default is 0. If 'both_graphs' is set to 1, those two type of 
             graph will be generated.
+        layout : str, optional
+            - cell: one png per value
+            - grid: pages of grid_shape plots per feature, one png per page
+            - pdf: one multi-page pdf per feature
+            The default is "cell".
+        grid_shape : tuple, optional
+            (rows, columns) of the pages. The default is (4, 4).
+        n_workers : int, optional
+            Processes rendering the files(-1 for every core). 
+            The default is 1.
 
         Returns
         -------
@@ -1565,36 +2855,26 @@ class PlotMixin():
         if both_graphs:
             convergent_and_divergent.append((self._all_weighted_averages, 
                                              "convergent_graphs"))
-        for value in convergent_and_divergent:
-            weighted_average_dict = value[0]
-            graph_type = value[1]
-            std = 0
-            std_str = ""
+        groups = defaultdict(list)
+        for weighted_average_dict, graph_type in convergent_and_divergent:
             for coordinates, values in weighted_average_dict.items():
-                print(f"-{coordinates} graph created")                       
-                try:
-                    std = np.std(values[-self._last_n_iterations:])
-                    std = np.round(std, 2)
-                    std_str = f"std_{std}"
-                except TypeError:
-                    pass
                 row_number = coordinates[0] 
                 variable_name = coordinates[1]
                 filename = f"row_{row_number}_column_{variable_name}" 
-                iterations = len(values)
                 path = os.path.join(directory_path, graph_type, variable_name)
                 var_type = self._features_type_predictions.loc[variable_name].any()
-                self._numerical_categorical_plots(values, 
-                                                   var_type,
-                                                   coordinates,
-                                                   iterations,
-                                                   std, 
-                                                   path, 
-                                                   filename, 
-                                                   std_str)
+                groups[path].append(self._history_plot_item(values, 
+                                                            var_type,
+                                                            coordinates,
+                                                            filename))
+        self._render_plots(groups, directory_path, layout, grid_shape, n_workers)
                 
                 
-    def create_target_pred_plot(self, directory_path):
+    def create_target_pred_plot(self, 
+                                directory_path,
+                                layout=const.CELL,
+                                grid_shape=(4, 4),
+                                n_workers=1):
         """
         Creates plots to evaluate missing target values predictions evolution.
 
@@ -1602,29 +2882,19 @@ class PlotMixin():
         ----------
         directory_path : str
        
+        layout, grid_shape, n_workers :
+            See create_weighted_averages_plots.
+            
         Returns
         -------
         None
         """
-        for index, predicted_values in self._nan_target_variable_preds.items():
-            std = None
-            std_str = ""
-            filename = f"sample_{index}" 
-            iterations = len(predicted_values)
-            path = os.path.join(directory_path, "target_values_graphs")
-            print(f"graph for sample {index} created")
-            try:
-                std = np.std(predicted_values[-self._last_n_iterations:])
-                std = np.round(std, 2)
-                std_str = f"std_{std}"
-            except TypeError:
-                pass
-            var_type = self._target_var_type_prediction["Predictions"].any()
-            self._numerical_categorical_plots(predicted_values, 
-                                               var_type, 
-                                               index, 
-                                               iterations, 
-                                               std,
-                                               path, 
-                                               filename, 
-                                               std_str)
\ No newline at end of file
+        path = os.path.join(directory_path, "target_values_graphs")
+        var_type = self._target_var_type_prediction["Predictions"].any()
+        groups = {path:[self._history_plot_item(predicted_values, 
+                                                var_type, 
+                                                index, 
+                                                f"sample_{index}")
+                        for index, predicted_values 
+                        in self._nan_target_variable_preds.items()]}
+        self._render_plots(groups, directory_path, layout, grid_shape, n_workers)
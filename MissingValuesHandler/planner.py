@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - Workload
+                            - estimate
+                            - physical_memory
+                            - plan
+                            - format_plan
+******************************************************************************
+Resource planning: peak memory and running time of a training are estimated
+before it starts, from the number of samples, the width of the encoded
+features, the number of missing values and the forest parameters. Given
+memory and time limits, the first strategy(proximity representation) fitting
+both is chosen, the most exact first:
+    - dense: every sample against every sample, in memory
+    - restricted: samples having missing values against every sample, in
+      memory. Imputations are the same as dense
+    - memmap: restricted rows in a memory mapped temporary file
+    - sparse_topk: restricted rows, only the top k proximities of every row
+      being kept(nearest samples)
+    - approximate: landmark mode, samples having missing values against
+      n_landmarks complete samples
+In memory strategies are tried with every core computing the proximities
+first(the matrix is then allocated twice), then in the main process. The
+forest is fitted on every core.
+
+Estimates are orders of magnitude, not guarantees. Memory is what training
+allocates on top of the interpreter and libraries: it is the closest. Time 
+depends on the number of rounds and on the size of the forest, which both 
+depend on the data: the estimates assume 2 * training_resilience + 1 rounds 
+and 5 batches of additional trees. The costs per operation were measured on 
+one core of an x86-64 machine(scoring.csv replicated, Scikit-Learn random 
+forests) and speedups are assumed linear. Compare them with the stage events
+of a training(get_stage_events) on your machine.
+"""
+from collections import namedtuple
+import os
+import numpy as np
+import pandas as pd
+import MissingValuesHandler.constants as const
+from MissingValuesHandler.proximity import BLOCK_SIZE, TOP_K_BLOCK_SIZE
+
+
+STRATEGIES = (const.DENSE,
+              const.RESTRICTED,
+              const.MEMMAP,
+              const.SPARSE_TOP_K,
+              const.APPROXIMATE)
+#Strategies whose proximities can be computed by worker processes
+PARALLEL_STRATEGIES = (const.DENSE, const.RESTRICTED, const.APPROXIMATE)
+DEFAULT_LANDMARKS = 1000
+
+#Seconds per fitted tree, sample * log2(samples) and feature drawn at a split
+FIT_SECONDS = 3e-8
+#Seconds per cell of the proximity matrix and tree(classifier: few large
+#groups, added as dense rows)
+PROXIMITY_SECONDS = 4e-9
+#Share of that cost for a regressor(groups are leaves: small)
+REGRESSOR_PROXIMITY_SHARE = 0.3
+#Seconds per missing value and reference sample(weighted averages)
+WEIGHTED_AVERAGE_SECONDS = 5e-8
+#Throughput of the memmap storage(written once, read once per iteration)
+DISK_BYTES_PER_SECOND = 2e8
+#Bytes of a node of a Scikit-Learn tree, values excluded
+NODE_BYTES = 64
+#Bytes of a stored value of a sparse matrix(float32 value, int64 index)
+SPARSE_VALUE_BYTES = 12
+
+
+Workload = namedtuple("Workload", ["n_samples",
+                                   "n_columns",
+                                   "n_dummies",
+                                   "n_missing_cells",
+                                   "n_missing_rows",
+                                   "data_bytes",
+                                   "feature_itemsize",
+                                   "sparse_dummies",
+                                   "classifier",
+                                   "n_classes",
+                                   "n_trees",
+                                   "n_fitted_trees",
+                                   "n_candidate_features",
+                                   "min_samples_leaf",
+                                   "n_iterations",
+                                   "n_landmarks",
+                                   "top_k"])
+
+
+def _proximity_shape(workload, strategy):
+    """
+    Returns
+    -------
+    tuple
+        (rows, columns) of the proximity matrix.
+    """
+    n_samples = workload.n_samples
+    if strategy == const.DENSE:
+        return n_samples, n_samples
+    if strategy == const.APPROXIMATE:
+        n_complete = max(0, n_samples - workload.n_missing_rows)
+        return workload.n_missing_rows, min(workload.n_landmarks, n_complete)
+    return workload.n_missing_rows, n_samples
+
+
+def estimate(workload, strategy, n_workers=1, n_jobs=1):
+    """
+    Parameters
+    ----------
+    workload : Workload
+
+    strategy : str
+        One of STRATEGIES.
+    n_workers : int, optional
+        Processes computing the proximities. The default is 1.
+    n_jobs : int, optional
+        Processes fitting the forest. The default is 1.
+
+    Returns
+    -------
+    dict
+        strategy, n_workers, n_jobs, rows and columns of the proximity
+        matrix, exact, peak memory and disk in bytes, running time in seconds.
+    """
+    n_samples = workload.n_samples
+    n_features = workload.n_columns + workload.n_dummies
+    #Data, features frame/final dataset, encoded features and their float32
+    #copy for the trees
+    dummies_bytes = (SPARSE_VALUE_BYTES if workload.sparse_dummies
+                     else workload.feature_itemsize)
+    encoded_bytes = n_samples*(workload.n_columns*workload.feature_itemsize +
+                               workload.n_dummies*dummies_bytes)
+    fit_bytes = (0 if workload.feature_itemsize == 4 and
+                 not workload.sparse_dummies else n_samples*n_features*4)
+    #Leaves and group ids of every sample, nodes, sample indices of the jobs
+    leaves_bytes = n_samples*workload.n_trees*12
+    n_nodes = 2*n_samples/max(1, workload.min_samples_leaf)
+    forest_bytes = (workload.n_trees*n_nodes*
+                    (NODE_BYTES + 8*workload.n_classes))
+    jobs_bytes = n_jobs*n_samples*16
+    memory = (2*workload.data_bytes + encoded_bytes + fit_bytes +
+              leaves_bytes + forest_bytes + jobs_bytes)
+
+    rows, columns = _proximity_shape(workload, strategy)
+    matrix_bytes = rows*columns*8
+    disk = 0
+    if strategy == const.MEMMAP:
+        memory += BLOCK_SIZE*8
+        disk = matrix_bytes
+    elif strategy == const.SPARSE_TOP_K:
+        memory += (rows*min(workload.top_k, columns)*SPARSE_VALUE_BYTES +
+                   TOP_K_BLOCK_SIZE*4 + BLOCK_SIZE*8)
+    elif n_workers > 1:
+        #Shared accumulator and its copy, shared group ids
+        memory += 2*matrix_bytes + n_samples*workload.n_trees*4
+    else:
+        memory += matrix_bytes
+
+    share = 1 if workload.classifier else REGRESSOR_PROXIMITY_SHARE
+    fit_seconds = (FIT_SECONDS*workload.n_fitted_trees*
+                   n_samples*np.log2(max(n_samples, 2))*
+                   workload.n_candidate_features/n_jobs)
+    proximity_seconds = (PROXIMITY_SECONDS*share*rows*columns*
+                         workload.n_trees/n_workers)
+    if strategy == const.MEMMAP:
+        proximity_seconds += 2*matrix_bytes/DISK_BYTES_PER_SECOND
+    weighted_average_seconds = (WEIGHTED_AVERAGE_SECONDS*
+                                workload.n_missing_cells*columns)
+    seconds = workload.n_iterations*(fit_seconds +
+                                     proximity_seconds +
+                                     weighted_average_seconds)
+    return {"strategy":strategy,
+            "n_workers":n_workers,
+            "n_jobs":n_jobs,
+            "rows":rows,
+            "columns":columns,
+            "exact":strategy in (const.DENSE, const.RESTRICTED, const.MEMMAP),
+            "memory":int(memory),
+            "disk":int(disk),
+            "seconds":float(seconds)}
+
+
+def physical_memory():
+    """
+    Returns
+    -------
+    int
+        Bytes of physical memory, None if unknown(e.g. on Windows).
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE")*os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def plan(workload, memory_limit=None, time_limit=None, n_cores=None):
+    """
+    Parameters
+    ----------
+    workload : Workload
+
+    memory_limit : int, optional
+        Bytes. None for the physical memory(no limit if unknown). 
+        The default is None.
+    time_limit : float, optional
+        Seconds. None for no limit. The default is None.
+    n_cores : int, optional
+        None for every core. The default is None.
+
+    Returns
+    -------
+    dict
+        The estimate of the chosen strategy(see estimate), 'fits'(False if
+        no strategy fits the limits: the one needing the least memory is
+        returned), the limits, the number of landmarks and 'estimates': a
+        pandas.core.frame.DataFrame of every strategy and parallelism tried.
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    if memory_limit is None:
+        memory_limit = physical_memory()
+    estimates = []
+    for strategy in STRATEGIES:
+        if strategy == const.APPROXIMATE and not _proximity_shape(workload,
+                                                                  strategy)[1]:
+            #No complete sample to use as a landmark
+            continue
+        workers_options = ((n_cores, 1)
+                           if strategy in PARALLEL_STRATEGIES and n_cores > 1
+                           else (1,))
+        estimates.extend(estimate(workload, strategy, n_workers, n_cores)
+                         for n_workers in workers_options)
+    estimates = pd.DataFrame(estimates)
+    fits = ((estimates["memory"] <= (memory_limit or np.inf)) &
+            (estimates["seconds"] <= (time_limit or np.inf)))
+    chosen = (estimates[fits].iloc[0] if fits.any()
+              else estimates.loc[estimates["memory"].idxmin()])
+    return {**chosen.to_dict(),
+            "fits":bool(fits.any()),
+            "n_landmarks":workload.n_landmarks,
+            "memory_limit":memory_limit,
+            "time_limit":time_limit,
+            "estimates":estimates}
+
+
+def format_plan(chosen_plan):
+    """
+    Parameters
+    ----------
+    chosen_plan : dict
+        See plan.
+
+    Returns
+    -------
+    str
+        Report of the plan.
+    """
+    megabytes = 2**20
+    text = (f"- PLAN: {chosen_plan['strategy'].upper()} PROXIMITIES "
+            f"({chosen_plan['rows']} x {chosen_plan['columns']}), "
+            f"{chosen_plan['n_workers']} PROXIMITY WORKER(S), "
+            f"{chosen_plan['n_jobs']} FOREST JOB(S)\n"
+            f"- ESTIMATED PEAK MEMORY: {chosen_plan['memory']/megabytes:.1f} MB"
+            f", DISK: {chosen_plan['disk']/megabytes:.1f} MB, "
+            f"TIME: {chosen_plan['seconds']:.1f} s")
+    if not chosen_plan["fits"]:
+        limits = []
+        if chosen_plan["memory_limit"] is not None:
+            limits.append(f"{chosen_plan['memory_limit']/megabytes:.1f} MB")
+        if chosen_plan["time_limit"] is not None:
+            limits.append(f"{chosen_plan['time_limit']:.1f} s")
+        text += f"\n- NO STRATEGY FITS THE LIMITS ({', '.join(limits)})"
+    return text
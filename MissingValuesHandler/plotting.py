@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - PlotItem
+                            - draw_item
+                            - render_cell
+                            - render_page
+                            - render_pdf
+                            - render
+******************************************************************************
+Rendering of the evolution of the substitutes of the missing values. Figures
+are matplotlib Figure objects drawn on the Agg canvas: no pyplot, no global
+state, no display. Tasks only hold the substitutes and the paths of the files
+so they can be rendered in worker processes.
+
+Layouts:
+    - cell: one png per missing value
+    - grid: pages of small multiples(rows * columns plots) per feature, one
+      png per page
+    - pdf: one multi-page pdf per feature, pages of small multiples
+"""
+from collections import Counter, namedtuple
+import os
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import MissingValuesHandler.constants as const
+
+
+#title: str, values: list of substitutes, numerical: bool
+PlotItem = namedtuple("PlotItem", ["title", "values", "numerical"])
+
+
+def draw_item(axes, item, fontsize=10):
+    """
+    Numerical values: evolution of the substitute over the iterations.
+    Categorical values: proportion of every modality among the substitutes.
+
+    Parameters
+    ----------
+    axes : matplotlib.axes.Axes
+
+    item : PlotItem
+
+    fontsize : int, optional
+        The default is 10.
+
+    Returns
+    -------
+    None
+    """
+    axes.set_title(item.title, fontsize=fontsize)
+    if item.numerical:
+        axes.plot(np.arange(1, len(item.values) + 1), item.values)
+        axes.set_xlabel("Iterations", fontsize=fontsize)
+        axes.set_ylabel("Values", fontsize=fontsize)
+        return
+    counts = Counter(item.values)
+    names = [str(name) for name in counts]
+    values = np.array(list(counts.values()))
+    percentages = list(map(int, (values / np.sum(values)) * 100))
+    for name, percentage in zip(names, percentages):
+        axes.annotate(str(percentage),
+                      xy=(name, percentage + 1),
+                      fontsize=fontsize)
+    axes.bar(names, percentages, align="center")
+    axes.set_ylabel("Proportion", fontsize=fontsize)
+
+
+def _new_figure(figsize):
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _page_figure(items, grid_shape):
+    """
+    Parameters
+    ----------
+    items : list
+        At most rows * columns PlotItem.
+    grid_shape : tuple
+        (rows, columns)
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+    """
+    n_rows, n_columns = grid_shape
+    figure = _new_figure((4*n_columns, 3*n_rows))
+    for index, item in enumerate(items):
+        axes = figure.add_subplot(n_rows, n_columns, index + 1)
+        draw_item(axes, item, fontsize=7)
+    figure.tight_layout()
+    return figure
+
+
+def render_cell(task):
+    """
+    Parameters
+    ----------
+    task : tuple
+        (path of the png, PlotItem)
+
+    Returns
+    -------
+    None
+    """
+    path, item = task
+    figure = _new_figure((6.4, 4.8))
+    draw_item(figure.add_subplot(1, 1, 1), item)
+    figure.savefig(path)
+
+
+def render_page(task):
+    """
+    Parameters
+    ----------
+    task : tuple
+        (path of the png, list of PlotItem, grid shape)
+
+    Returns
+    -------
+    None
+    """
+    path, items, grid_shape = task
+    _page_figure(items, grid_shape).savefig(path)
+
+
+def render_pdf(task):
+    """
+    Parameters
+    ----------
+    task : tuple
+        (path of the pdf, list of PlotItem, grid shape)
+
+    Returns
+    -------
+    None
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    path, items, grid_shape = task
+    page_size = grid_shape[0] * grid_shape[1]
+    with PdfPages(path) as pdf:
+        for start in range(0, len(items), page_size):
+            pdf.savefig(_page_figure(items[start:start + page_size],
+                                     grid_shape))
+
+
+def _tasks(groups, layout, grid_shape):
+    """
+    Parameters
+    ----------
+    groups : dict
+        directory -> list of (file name, PlotItem)
+    layout : str
+        const.CELL, const.GRID or const.PDF
+    grid_shape : tuple
+
+    Returns
+    -------
+    renderer : function
+
+    tasks : list
+    """
+    page_size = grid_shape[0] * grid_shape[1]
+    tasks = []
+    for directory, named_items in groups.items():
+        items = [item for _, item in named_items]
+        if layout == const.CELL:
+            tasks.extend((os.path.join(directory, name + const.IMG_EXTENSION),
+                          item) for name, item in named_items)
+        elif layout == const.GRID:
+            tasks.extend((os.path.join(directory,
+                                       f"page_{start//page_size + 1}"
+                                       f"{const.IMG_EXTENSION}"),
+                          items[start:start + page_size],
+                          grid_shape)
+                         for start in range(0, len(items), page_size))
+        else:
+            tasks.append((directory + ".pdf", items, grid_shape))
+    renderers = {const.CELL:render_cell,
+                 const.GRID:render_page,
+                 const.PDF:render_pdf}
+    return renderers[layout], tasks
+
+
+def render(groups, layout=const.CELL, grid_shape=(4, 4), n_workers=1):
+    """
+    Renders every plot. The directories are created(pdf: the parent of the
+    directory is, the file being named after the directory). Empty groups
+    are skipped.
+
+    Parameters
+    ----------
+    groups : dict
+        directory -> list of (file name, PlotItem)
+    layout : str, optional
+        const.CELL, const.GRID or const.PDF. The default is const.CELL.
+    grid_shape : tuple, optional
+        (rows, columns) of the pages. The default is (4, 4).
+    n_workers : int, optional
+        Processes rendering the files. 1 renders in the current process, -1
+        uses every core. The default is 1.
+
+    Returns
+    -------
+    int
+        Number of files written.
+    """
+    groups = {directory:named_items for directory, named_items
+              in groups.items() if named_items}
+    for directory in groups:
+        os.makedirs(directory if layout != const.PDF
+                    else os.path.dirname(directory) or ".", exist_ok=True)
+    renderer, tasks = _tasks(groups, layout, grid_shape)
+    if n_workers < 0:
+        n_workers = os.cpu_count() or 1
+    n_workers = min(n_workers, len(tasks))
+    if n_workers <= 1:
+        for task in tasks:
+            renderer(task)
+        return len(tasks)
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(tasks) // (4*n_workers))
+    with ProcessPoolExecutor(n_workers) as executor:
+        for _ in executor.map(renderer, tasks, chunksize=chunksize):
+            pass
+    return len(tasks)
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - tree_predictions
+                            - tree_leaves
+                            - leaf_groups
+                            - forest_predictions
+                            - group_ids
+                            - accumulate_proximities
+                            - parallel_accumulate_proximities
+                            - memmap_accumulator
+                            - top_k_proximities
+******************************************************************************
+Exact proximity kernel. Two samples are close in a tree when they fall in the
+same group of that tree(same prediction). For every tree, the reference
+samples(columns) are sorted by group id once: the members of a group are then
+a contiguous slice of the sorted positions and counts are only added between
+the rows we need(e.g the samples having missing values) and the members of
+their group. The work is the number of (row, column) pairs sharing a group
+instead of rows * columns boolean comparisons per tree. Groups holding a
+large share of the columns(e.g a classifier predicting few classes) are
+added as dense rows instead: contiguous adds beat scattered ones there.
+
+The samples are run down the trees once: the leaf of every sample in every
+tree(tree_leaves) gives both the groups(the prediction of a tree is the value
+of the leaf) and the predictions of the whole ensemble(forest_predictions) for
+the samples having no target value, without another inference pass.
+
+parallel_accumulate_proximities runs the kernel in worker processes. The group
+ids and the accumulator live in shared memory(nothing is pickled but their
+names and the positions of the rows) and every worker adds the counts of all 
+the trees to its own slice of rows: no lock is needed.
+
+Two storages keep the proximities out of memory: memmap_accumulator(counts 
+in a temporary file) and top_k_proximities(the rows are computed by blocks 
+and only their k largest counts are kept, in a CSR matrix).
+"""
+import os
+import numpy as np
+import pandas as pd
+from sklearn.base import is_classifier
+
+
+#Groups holding more than this share of the columns are added as dense rows
+DENSE_GROUP_SHARE = 0.125
+#Counts are added to at most this many cells at once: fancy indexing makes a
+#temporary copy of the cells it updates
+BLOCK_SIZE = 2**20
+#Cells of the blocks of rows computed at once by top_k_proximities
+TOP_K_BLOCK_SIZE = 2**22
+
+
+def tree_predictions(estimator, encoded_features):
+    """
+    Parameters
+    ----------
+    estimator : fitted ensemble model
+
+    encoded_features : pandas.core.frame.DataFrame or scipy.sparse matrix
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, n_trees) predictions of every tree.
+    """
+    return np.column_stack([tree.predict(encoded_features)
+                            for tree in estimator.estimators_])
+
+
+def tree_leaves(estimator, encoded_features):
+    """
+    Parameters
+    ----------
+    estimator : fitted ensemble model
+
+    encoded_features : pandas.core.frame.DataFrame or scipy.sparse matrix
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, n_trees) leaf of every sample in every tree. None if the
+        trees of the ensemble aren't Scikit-Learn trees(use tree_predictions).
+    """
+    if not all(hasattr(tree, "tree_") for tree in estimator.estimators_):
+        return None
+    return estimator.apply(encoded_features)
+
+
+def _leaf_outputs(estimator, tree):
+    """
+    Parameters
+    ----------
+    estimator : fitted ensemble model
+
+    tree : fitted Scikit-Learn tree of the ensemble
+
+    Returns
+    -------
+    numpy.ndarray
+        Class probabilities(n_leaves, n_classes) of every node for a
+        classifier(normalized like DecisionTreeClassifier.predict_proba),
+        value(n_leaves,) of every node for a regressor.
+    """
+    values = tree.tree_.value[:, 0, :]
+    if not is_classifier(estimator):
+        return values[:, 0]
+    probabilities = values[:, :tree.n_classes_]
+    normalizer = probabilities.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    return probabilities / normalizer
+
+
+def leaf_groups(estimator, leaves):
+    """
+    Same as group_ids(tree_predictions(...)) from the leaves: samples are in
+    the same group of a tree if the tree predicts the same value for them.
+
+    Parameters
+    ----------
+    estimator : fitted ensemble model
+
+    leaves : numpy.ndarray
+        (n_samples, n_trees) see tree_leaves.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, n_trees) int32 group ids.
+    """
+    groups = np.empty(leaves.shape, dtype=np.int32)
+    for index, tree in enumerate(estimator.estimators_):
+        leaf_outputs = _leaf_outputs(estimator, tree)
+        if leaf_outputs.ndim == 2:
+            leaf_outputs = np.argmax(leaf_outputs, axis=1)
+        groups[:, index] = pd.factorize(leaf_outputs[leaves[:, index]])[0]
+    return groups
+
+
+def forest_predictions(estimator, leaves):
+    """
+    Same as estimator.predict from the leaves: mean of the values(regressor)
+    or of the class probabilities(classifier) of the trees.
+
+    Parameters
+    ----------
+    estimator : fitted ensemble model
+
+    leaves : numpy.ndarray
+        (n_samples, n_trees) see tree_leaves.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples,)
+    """
+    total = None
+    for index, tree in enumerate(estimator.estimators_):
+        tree_outputs = _leaf_outputs(estimator, tree)[leaves[:, index]]
+        total = tree_outputs if total is None else total + tree_outputs
+    total = total / len(estimator.estimators_)
+    if is_classifier(estimator):
+        return estimator.classes_.take(np.argmax(total, axis=1), axis=0)
+    return total
+
+
+def group_ids(predictions):
+    """
+    Turns per tree predictions(or leaves) into dense integer group ids.
+
+    Parameters
+    ----------
+    predictions : numpy.ndarray
+        (n_samples, n_trees)
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_samples, n_trees) int32, in [0, n_groups of the tree[
+    """
+    groups = np.empty(predictions.shape, dtype=np.int32)
+    for tree in range(predictions.shape[1]):
+        groups[:, tree] = pd.factorize(predictions[:, tree])[0]
+    return groups
+
+
+def accumulate_proximities(groups, rows, columns=None, out=None,
+                           dtype=np.float64):
+    """
+    Counts, for every row, the trees in which every column shares its group.
+
+    Parameters
+    ----------
+    groups : numpy.ndarray
+        (n_samples, n_trees) group ids(see group_ids).
+    rows : numpy.ndarray
+        Positions of the samples on the rows of the result.
+    columns : numpy.ndarray, optional
+        Positions of the samples on the columns of the result. None for every
+        sample. The default is None.
+    out : numpy.ndarray, optional
+        (len(rows), len(columns)) accumulator the counts are added to.
+        The default is None.
+    dtype : numpy.dtype, optional
+        Of the accumulator created when 'out' is None. Counts are exact
+        integers in float32 up to 2**24 trees. The default is numpy.float64.
+
+    Returns
+    -------
+    out : numpy.ndarray
+        (len(rows), len(columns)) counts.
+    """
+    rows = np.asarray(rows)
+    if columns is None:
+        columns = np.arange(groups.shape[0])
+    if out is None:
+        out = np.zeros((len(rows), len(columns)), dtype=dtype)
+    if not len(rows) or not len(columns):
+        return out
+    dense_group_size = DENSE_GROUP_SHARE * len(columns)
+    row_block = max(1, BLOCK_SIZE // len(columns))
+    for tree in range(groups.shape[1]):
+        column_groups = groups[columns, tree]
+        column_order = np.argsort(column_groups, kind="stable")
+        sorted_column_groups = column_groups[column_order]
+        row_groups = groups[rows, tree]
+        row_order = np.argsort(row_groups, kind="stable")
+        sorted_row_groups = row_groups[row_order]
+        #Boundaries of the groups among the rows and among the columns
+        row_starts = np.flatnonzero(np.r_[True, np.diff(sorted_row_groups) != 0])
+        row_ends = np.r_[row_starts[1:], len(rows)]
+        shared_groups = sorted_row_groups[row_starts]
+        column_starts = np.searchsorted(sorted_column_groups, shared_groups,
+                                        side="left")
+        column_ends = np.searchsorted(sorted_column_groups, shared_groups,
+                                      side="right")
+        for row_start, row_end, column_start, column_end in zip(row_starts,
+                                                                row_ends,
+                                                                column_starts,
+                                                                column_ends):
+            if column_start == column_end:
+                continue
+            group_columns = column_order[column_start:column_end]
+            if column_end - column_start >= dense_group_size:
+                indicator = np.zeros(len(columns), dtype=out.dtype)
+                indicator[group_columns] = 1
+            for block_start in range(row_start, row_end, row_block):
+                block_end = min(block_start + row_block, row_end)
+                group_rows = row_order[block_start:block_end]
+                if column_end - column_start >= dense_group_size:
+                    out[group_rows] += indicator
+                else:
+                    out[group_rows[:, None], group_columns] += 1
+    return out
+
+
+def _attach(name, shape, dtype):
+    """
+    Parameters
+    ----------
+    name : str
+        Name of a shared memory block.
+    shape : tuple
+
+    dtype : numpy.dtype
+
+    Returns
+    -------
+    shared_block : multiprocessing.shared_memory.SharedMemory
+
+    array : numpy.ndarray
+        View of the block.
+    """
+    from multiprocessing import shared_memory
+    shared_block = shared_memory.SharedMemory(name=name)
+    return shared_block, np.ndarray(shape, dtype=dtype, buffer=shared_block.buf)
+
+
+def _accumulate_partition(groups_block, out_block, rows, columns, start, end):
+    """
+    Worker: adds the counts of rows[start:end] to the same rows of the shared
+    accumulator.
+
+    Parameters
+    ----------
+    groups_block : tuple
+        (name, shape, dtype) of the shared group ids.
+    out_block : tuple
+        (name, shape, dtype) of the shared accumulator.
+    rows : numpy.ndarray
+
+    columns : numpy.ndarray
+
+    start : int
+
+    end : int
+
+    Returns
+    -------
+    None
+    """
+    groups_memory, groups = _attach(*groups_block)
+    out_memory, out = _attach(*out_block)
+    try:
+        accumulate_proximities(groups, rows[start:end], columns,
+                               out=out[start:end])
+    finally:
+        del groups, out
+        groups_memory.close()
+        out_memory.close()
+
+
+def parallel_accumulate_proximities(groups, rows, columns=None, n_workers=-1,
+                                    dtype=np.float64):
+    """
+    Same as accumulate_proximities, the rows being split between worker
+    processes.
+
+    Parameters
+    ----------
+    groups : numpy.ndarray
+        (n_samples, n_trees) group ids(see group_ids).
+    rows : numpy.ndarray
+
+    columns : numpy.ndarray, optional
+        The default is None.
+    n_workers : int, optional
+        -1 for every core. The default is -1.
+    dtype : numpy.dtype, optional
+        The default is numpy.float64.
+
+    Returns
+    -------
+    out : numpy.ndarray
+        (len(rows), len(columns)) counts.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    rows = np.asarray(rows)
+    if columns is None:
+        columns = np.arange(groups.shape[0])
+    if n_workers < 0:
+        n_workers = os.cpu_count() or 1
+    n_workers = min(n_workers, len(rows))
+    if n_workers <= 1:
+        return accumulate_proximities(groups, rows, columns, dtype=dtype)
+    
+    out_shape = (len(rows), len(columns))
+    out_size = max(int(np.prod(out_shape)) * np.dtype(dtype).itemsize, 1)
+    groups_memory = shared_memory.SharedMemory(create=True, 
+                                               size=max(groups.nbytes, 1))
+    out_memory = shared_memory.SharedMemory(create=True, size=out_size)
+    try:
+        shared_groups = np.ndarray(groups.shape, dtype=groups.dtype, 
+                                   buffer=groups_memory.buf)
+        shared_groups[:] = groups
+        out = np.ndarray(out_shape, dtype=dtype, buffer=out_memory.buf)
+        out[:] = 0
+        groups_block = (groups_memory.name, groups.shape, groups.dtype)
+        out_block = (out_memory.name, out_shape, np.dtype(dtype))
+        bounds = np.linspace(0, len(rows), n_workers + 1).astype(int)
+        with ProcessPoolExecutor(n_workers) as executor:
+            futures = [executor.submit(_accumulate_partition, 
+                                       groups_block, 
+                                       out_block, 
+                                       rows, 
+                                       columns, 
+                                       start, 
+                                       end)
+                       for start, end in zip(bounds[:-1], bounds[1:])]
+            for future in futures:
+                future.result()
+        result = out.copy()
+        del shared_groups, out
+    finally:
+        groups_memory.close()
+        groups_memory.unlink()
+        out_memory.close()
+        out_memory.unlink()
+    return result
+
+
+def memmap_accumulator(shape, directory=None, dtype=np.float64):
+    """
+    Zero filled accumulator in an anonymous temporary file, removed once the
+    array is garbage collected.
+
+    Parameters
+    ----------
+    shape : tuple
+
+    directory : str, optional
+        Directory of the temporary file. None for the default temporary
+        directory. The default is None.
+    dtype : numpy.dtype, optional
+        The default is numpy.float64.
+
+    Returns
+    -------
+    numpy.memmap
+    """
+    import tempfile
+    if not np.prod(shape):
+        return np.zeros(shape, dtype=dtype)
+    with tempfile.TemporaryFile(dir=directory) as file:
+        return np.memmap(file, dtype=dtype, mode="w+", shape=shape)
+
+
+def top_k_proximities(groups, rows, columns=None, k=100):
+    """
+    Same as accumulate_proximities, only the k largest counts of every row
+    being kept. Rows are computed by blocks of TOP_K_BLOCK_SIZE cells.
+
+    Parameters
+    ----------
+    groups : numpy.ndarray
+        (n_samples, n_trees) group ids(see group_ids).
+    rows : numpy.ndarray
+
+    columns : numpy.ndarray, optional
+        The default is None.
+    k : int, optional
+        Capped to the number of columns. The default is 100.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        (len(rows), len(columns)) float32 counts, k stored per row.
+    """
+    from scipy.sparse import csr_matrix
+    rows = np.asarray(rows)
+    if columns is None:
+        columns = np.arange(groups.shape[0])
+    k = min(k, len(columns))
+    indices = np.empty((len(rows), k), dtype=np.int64)
+    counts = np.empty((len(rows), k), dtype=np.float32)
+    row_block = max(1, TOP_K_BLOCK_SIZE // max(1, len(columns)))
+    for start in range(0, len(rows), row_block):
+        end = min(start + row_block, len(rows))
+        block = accumulate_proximities(groups, rows[start:end], columns,
+                                       dtype=np.float32)
+        top = np.sort(np.argpartition(block, len(columns) - k, axis=1)[:, -k:],
+                      axis=1)
+        indices[start:end] = top
+        counts[start:end] = np.take_along_axis(block, top, axis=1)
+    return csr_matrix((counts.ravel(), indices.ravel(),
+                       np.arange(0, len(rows)*k + 1, k)),
+                      shape=(len(rows), len(columns)))
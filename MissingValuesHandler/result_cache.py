@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - fingerprint
+                            - library_versions
+                            - ResultCache
+******************************************************************************
+On disk cache of training results, shared by the processes pointing to the
+same directory. Entries are addressed by a fingerprint(sha256) of everything
+the result depends on: the data, the variables lists, every parameter of the
+imputer, the arguments of train() and the versions of the libraries the
+result comes from(an upgrade doesn't serve results computed before it).
+    - entries are written to a temporary file and moved in place with
+      os.replace: readers never see a partial entry
+    - a hit touches the entry: the modification time is the last use and the
+      least recently used entries are evicted once the cache is bigger than
+      its maximum size
+    - eviction is serialized between processes with a lock file(created with
+      O_EXCL, portable): an entry removed by another process is just a miss
+    - an entry that can't be unpickled is removed and is a miss
+Entries are pickles: only point the cache to a directory you trust.
+"""
+import hashlib
+import os
+import pickle
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import sklearn
+import MissingValuesHandler.constants as const
+
+
+ENTRY_EXTENSION = ".pkl"
+LOCK_FILE = "cache.lock"
+
+
+def fingerprint(data, *parts):
+    """
+    Parameters
+    ----------
+    data : pandas.core.frame.DataFrame
+
+    *parts :
+        Other inputs of the result. Their repr is hashed.
+
+    Returns
+    -------
+    str
+        sha256 hexadecimal digest.
+    """
+    sha256 = hashlib.sha256()
+    sha256.update(repr([(str(name), str(dtype)) for name, dtype
+                        in data.dtypes.items()]).encode())
+    sha256.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    sha256.update(repr(parts).encode())
+    return sha256.hexdigest()
+
+
+def library_versions():
+    """
+    Returns
+    -------
+    tuple
+        Versions of MissingValuesHandler, numpy, pandas and Scikit-Learn.
+    """
+    return (const.VERSION, np.__version__, pd.__version__, sklearn.__version__)
+
+
+class ResultCache():
+    """
+    Size bounded, least recently used, on disk cache.
+    """
+    def __init__(self, directory, max_size=2**30, lock_timeout=60):
+        """
+        Parameters
+        ----------
+        directory : str
+
+        max_size : int, optional
+            Maximum size of the entries in bytes. The default is 1 GiB.
+        lock_timeout : float, optional
+            Seconds after which a lock file is considered abandoned(process
+            killed while evicting). The default is 60.
+
+        Returns
+        -------
+        None
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.lock_timeout = lock_timeout
+        os.makedirs(directory, exist_ok=True)
+
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+
+    def get(self, key):
+        """
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        object
+            The entry, None if it isn't cached or can't be read(truncated, 
+            written by other versions of the libraries...): such an entry is
+            removed.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            #Evicted by another process since it was read
+            pass
+        return entry
+
+
+    def put(self, key, entry):
+        """
+        Parameters
+        ----------
+        key : str
+
+        entry : object
+            Picklable.
+
+        Returns
+        -------
+        None
+        """
+        temporary_path = os.path.join(self.directory,
+                                      f".{key}.{os.getpid()}.{uuid.uuid4().hex}")
+        with open(temporary_path, "wb") as file:
+            pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self._entry_path(key))
+        self._evict()
+
+
+    def clear(self):
+        """
+        Removes every entry.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock():
+            for path, _, _ in self._entries():
+                self._remove(path)
+
+
+    def _entries(self):
+        """
+        Returns
+        -------
+        list
+            (path, size, last use) of every entry, least recently used first.
+        """
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(ENTRY_EXTENSION):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits in
+        max_size.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock():
+            entries = self._entries()
+            total_size = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total_size <= self.max_size:
+                    break
+                self._remove(path)
+                total_size -= size
+
+
+    def _lock(self):
+        return _LockFile(os.path.join(self.directory, LOCK_FILE),
+                         self.lock_timeout)
+
+
+class _LockFile():
+    """
+    Inter process lock: a file created with O_EXCL.
+    """
+    def __init__(self, path, timeout, poll_interval=0.01):
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+
+    def __enter__(self):
+        while True:
+            try:
+                os.close(os.open(self.path,
+                                 os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    age = time.time() - os.stat(self.path).st_mtime
+                except FileNotFoundError:
+                    continue
+                if age > self.timeout:
+                    #Abandoned lock
+                    ResultCache._remove(self.path)
+                else:
+                    time.sleep(self.poll_interval)
+
+
+    def __exit__(self, *exc_info):
+        ResultCache._remove(self.path)
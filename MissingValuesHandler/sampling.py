@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - stream_stratified_sample
+                            - rewrite_csv
+******************************************************************************
+Sampling straight from a csv file, chunk by chunk: only the sample(and its
+candidates) and the rows having missing values are ever held in memory.
+"""
+import numpy as np
+import pandas as pd
+
+
+def stream_stratified_sample(path,
+                             target_variable_name,
+                             sample_size,
+                             n_quantiles=0,
+                             chunksize=100000,
+                             oversampling=0.1,
+                             random_state=42,
+                             read_csv_kwargs=None):
+    """
+    One pass, approximate stratified sample of the complete rows of a csv 
+    file. Every row having a missing value is kept(like 
+    DataPreprocessingMixin._data_sampling).
+
+    Every complete row gets a random priority. Rows whose priority is lower
+    than sample_size*(1 + oversampling) are kept as candidates while the file
+    is read(a Bernoulli draw per row, not a reservoir: the size of a stratum 
+    is only known at the end of the pass). At the end, every stratum keeps 
+    its candidates having the lowest priorities, in proportion to its size:
+        - strata are the classes of the target variable(their exact size is
+          counted during the pass)
+        - or, if n_quantiles is set, the quantile bins of a numerical target
+          variable(bins and their size are estimated on the candidates,
+          which are a uniform sample of the complete rows)
+
+    Shortfall: a class of n complete rows gets binomial(n, sample_size*
+    (1 + oversampling)) candidates and comes back underfilled whenever they 
+    are fewer than n*sample_size. This is unlikely for large classes but not
+    for small ones: with the default oversampling, a class expected to give
+    50 rows is underfilled about once in five samples, by a few rows. Raise
+    oversampling to make it rarer, at the cost of more candidates in memory.
+    Quantile bins are never underfilled since their size is estimated on the
+    candidates, only the size of the whole sample is approximate.
+
+    Parameters
+    ----------
+    path : str
+
+    target_variable_name : str
+
+    sample_size [0;1[ : float
+        Proportion of complete rows to draw.
+    n_quantiles : int, optional
+        The default is 0.
+    chunksize : int, optional
+        Rows read at once. The default is 100000.
+    oversampling : float, optional
+        Extra candidates kept so that strata are rarely underfilled(see
+        above). The default is 0.1.
+    random_state : int, optional
+        The default is 42.
+    read_csv_kwargs : dict, optional
+        Passed on to pandas.read_csv. The default is None
+
+    Returns
+    -------
+    data : pandas.core.frame.DataFrame
+        Sample followed by the rows having missing values. Indexed from 0.
+    source_rows : numpy.ndarray
+        Position of every row of 'data' in the file.
+    null_rows : numpy.ndarray
+        Position in the file of the rows having missing values.
+    """
+    read_csv_kwargs = read_csv_kwargs or {}
+    random_generator = np.random.RandomState(random_state)
+    inclusion_threshold = min(1.0, sample_size*(1 + oversampling))
+    candidates, candidates_rows, priorities = [], [], []
+    nulls, nulls_rows = [], []
+    class_counts = pd.Series(dtype=np.int64)
+    offset = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs):
+        rows = np.arange(offset, offset + len(chunk))
+        offset += len(chunk)
+        null_checklist = chunk.isnull().any(axis=1).values
+        nulls.append(chunk[null_checklist])
+        nulls_rows.append(rows[null_checklist])
+        complete_rows = chunk[~null_checklist]
+        if not n_quantiles:
+            class_counts = class_counts.add(complete_rows[target_variable_name]
+                                            .value_counts(),
+                                            fill_value=0)
+        chunk_priorities = random_generator.random_sample(len(complete_rows))
+        candidates_check = chunk_priorities < inclusion_threshold
+        candidates.append(complete_rows[candidates_check])
+        candidates_rows.append(rows[~null_checklist][candidates_check])
+        priorities.append(chunk_priorities[candidates_check])
+
+    candidates = pd.concat(candidates)
+    candidates_rows = np.concatenate(candidates_rows)
+    priorities = np.concatenate(priorities)
+    target = candidates[target_variable_name].values
+    if n_quantiles:
+        #Quantile bins estimated on the candidates
+        edges = np.quantile(target.astype(np.float64),
+                            np.linspace(0, 1, n_quantiles + 1)[1:-1])
+        strata = np.searchsorted(edges, target, side="right")
+        stratum_sizes = {stratum:np.sum(strata==stratum)
+                         * sample_size / inclusion_threshold
+                         for stratum in np.unique(strata)}
+    else:
+        strata = target
+        stratum_sizes = {stratum:count*sample_size
+                         for stratum, count in class_counts.items()}
+
+    selected = []
+    for stratum, stratum_size in stratum_sizes.items():
+        stratum_positions = np.flatnonzero(strata==stratum)
+        n_selected = int(round(stratum_size))
+        lowest = np.argsort(priorities[stratum_positions], kind="stable")
+        selected.append(stratum_positions[lowest[:n_selected]])
+    selected = np.sort(np.concatenate(selected)) if selected else []
+
+    nulls = pd.concat(nulls)
+    nulls_rows = np.concatenate(nulls_rows)
+    data = pd.concat([candidates.iloc[selected], nulls])
+    data = data.reset_index(drop=True)
+    source_rows = np.concatenate([candidates_rows[selected], nulls_rows])
+    return data, source_rows, nulls_rows
+
+
+def rewrite_csv(source_path,
+                destination_path,
+                replacements,
+                chunksize=100000,
+                read_csv_kwargs=None):
+    """
+    Copies a csv file chunk by chunk and replaces some of its rows.
+
+    Parameters
+    ----------
+    source_path : str
+
+    destination_path : str
+        Must be different from 'source_path'.
+    replacements : pandas.core.frame.DataFrame
+        New rows indexed by their position in the file.
+    chunksize : int, optional
+        The default is 100000.
+    read_csv_kwargs : dict, optional
+        The default is None
+
+    Returns
+    -------
+    None
+    """
+    read_csv_kwargs = read_csv_kwargs or {}
+    offset = 0
+    header = True
+    for chunk in pd.read_csv(source_path, chunksize=chunksize, **read_csv_kwargs):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        rows_check = ((replacements.index >= chunk.index[0]) &
+                      (replacements.index <= chunk.index[-1]))
+        rows = replacements.index[rows_check]
+        if len(rows):
+            columns = [column_name for column_name in chunk.columns
+                       if column_name in replacements.columns]
+            chunk.loc[rows, columns] = replacements.loc[rows, columns]
+        chunk.to_csv(destination_path,
+                     mode="w" if header else "a",
+                     header=header,
+                     index=False)
+        header = False
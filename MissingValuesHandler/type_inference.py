@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+******************************************************************************
+                        This module contains:
+                            - TypeInferenceBackend
+                            - NeuralTypeInference
+                            - HeuristicTypeInference
+                            - predict_types
+******************************************************************************
+Type inference backends predict whether every column of a dataframe is
+numerical or categorical. They all return a dataframe indexed by the columns
+names with a "Predictions" column.
+
+Decisions are cached for the whole process and keyed by the backend, the
+name of the column and a fingerprint of the whole column: they are reused
+across train() calls and across RandomForestImputer instances. At most
+TYPE_CACHE_SIZE decisions are kept(least recently used first out).
+"""
+from collections import OrderedDict
+from threading import Lock
+import hashlib
+import MissingValuesHandler.custom_exceptions as customs
+import MissingValuesHandler.constants as const
+import numpy as np
+import pandas as pd
+
+
+#(backend cache key, column name, column fingerprint) -> type prediction,
+#least recently used first
+_TYPE_CACHE = OrderedDict()
+_TYPE_CACHE_LOCK = Lock()
+#Decisions kept at most, the least recently used are forgotten first
+TYPE_CACHE_SIZE = 4096
+
+
+class TypeInferenceBackend():
+    """
+    Base class of type inference backends.
+    """
+    @property
+    def cache_key(self):
+        """
+        Identifies the backend and its settings in the type cache.
+
+        Returns
+        -------
+        tuple
+        """
+        return (type(self).__module__, type(self).__qualname__)
+
+
+    def predict(self, data):
+        """
+        Parameters
+        ----------
+        data : pandas.core.frame.DataFrame
+
+        Returns
+        -------
+        pandas.core.frame.DataFrame
+            Indexed by the columns of 'data' with a "Predictions" column.
+        """
+        raise NotImplementedError
+
+
+class NeuralTypeInference(TypeInferenceBackend):
+    """
+    Neural network of DataTypeIdentifier(requires TensorFlow). The model is
+    loaded once per process, the first time it is needed.
+    """
+    _data_type_identifier = None
+
+    def predict(self, data):
+        if NeuralTypeInference._data_type_identifier is None:
+            try:
+                from DataTypeIdentifier.data_type_identifier import (
+                    DataTypeIdentifier)
+            except ImportError as error:
+                text = ("The neural type inference needs TensorFlow and "
+                        "DataTypeIdentifier: pip install "
+                        "MissingValuesHandler[dl], or use "
+                        "type_inference='heuristic'")
+                raise customs.TypeInferenceBackendError(text) from error
+            NeuralTypeInference._data_type_identifier = DataTypeIdentifier()
+        return NeuralTypeInference._data_type_identifier.predict(data, 0)
+
+
+class HeuristicTypeInference(TypeInferenceBackend):
+    """
+    Vectorized heuristic that does not need TensorFlow:
+        - object, string, boolean and category dtypes are categorical
+        - numerical columns only holding integers are categorical if they have
+          few unique values(both in absolute terms and relative to the number
+          of non null values)
+        - every other numerical column is numerical
+    """
+    def __init__(self, max_unique_values=20, max_unique_ratio=0.05):
+        """
+        Parameters
+        ----------
+        max_unique_values : int, optional
+            The default is 20.
+        max_unique_ratio : float, optional
+            The default is 0.05.
+
+        Returns
+        -------
+        None
+        """
+        self._max_unique_values = max_unique_values
+        self._max_unique_ratio = max_unique_ratio
+
+
+    @property
+    def cache_key(self):
+        return (super().cache_key,
+                self._max_unique_values,
+                self._max_unique_ratio)
+
+
+    def predict(self, data):
+        numerical_data = data.select_dtypes(include=[np.number])
+        predictions = pd.Series(const.CATEGORICAL, index=data.columns)
+        if not numerical_data.empty:
+            values = numerical_data.to_numpy(dtype=np.float64, na_value=np.nan)
+            non_null = ~np.isnan(values)
+            #NaN are considered as integers so that they don't matter
+            is_integer = np.where(non_null, np.mod(values, 1) == 0, True)
+            integer_check = is_integer.all(axis=0)
+            n_unique = numerical_data.nunique().to_numpy()
+            n_non_null = np.maximum(non_null.sum(axis=0), 1)
+            few_values = ((n_unique <= self._max_unique_values) &
+                          (n_unique / n_non_null <= self._max_unique_ratio))
+            categorical_check = integer_check & few_values
+            predictions[numerical_data.columns] = np.where(categorical_check,
+                                                           const.CATEGORICAL,
+                                                           const.NUMERICAL)
+        return predictions.to_frame("Predictions")
+
+
+BACKENDS = {"neural":NeuralTypeInference,
+            "heuristic":HeuristicTypeInference}
+
+
+def get_backend(backend):
+    """
+    Parameters
+    ----------
+    backend : str or TypeInferenceBackend
+        "neural", "heuristic" or a TypeInferenceBackend instance.
+
+    Raises
+    ------
+    customs.TypeInferenceBackendError
+
+    Returns
+    -------
+    TypeInferenceBackend
+    """
+    if isinstance(backend, TypeInferenceBackend):
+        return backend
+    if backend in BACKENDS:
+        return BACKENDS[backend]()
+    text = (f"Unknown type inference backend '{backend}'. Use one of "
+            f"{list(BACKENDS)} or a TypeInferenceBackend instance")
+    raise customs.TypeInferenceBackendError(text)
+
+
+def _fingerprint(column):
+    """
+    Fingerprint of a column: dtype, length, number of null values and hash 
+    of every value(vectorized, O(n)). Changing any value changes it.
+
+    Parameters
+    ----------
+    column : pandas.core.series.Series
+
+    Returns
+    -------
+    tuple
+    """
+    values_hash = pd.util.hash_pandas_object(column, index=False).values
+    return (str(column.dtype),
+            len(column),
+            int(column.isnull().sum()),
+            hashlib.sha1(values_hash.tobytes()).hexdigest())
+
+
+def predict_types(data, backend):
+    """
+    Predicts the type of every column, only running the backend on columns
+    that are not in the cache.
+
+    Parameters
+    ----------
+    data : pandas.core.frame.DataFrame
+
+    backend : TypeInferenceBackend
+
+    Returns
+    -------
+    pandas.core.frame.DataFrame
+        Indexed by the columns of 'data' with a "Predictions" column.
+    """
+    keys = {column_name:(backend.cache_key,
+                         column_name,
+                         _fingerprint(data[column_name]))
+            for column_name in data.columns}
+    with _TYPE_CACHE_LOCK:
+        known_types = {}
+        for column_name, key in keys.items():
+            if key in _TYPE_CACHE:
+                _TYPE_CACHE.move_to_end(key)
+                known_types[column_name] = _TYPE_CACHE[key]
+    unknown_columns = [column_name for column_name in data.columns 
+                       if column_name not in known_types]
+    if unknown_columns:
+        new_predictions = backend.predict(data[unknown_columns])
+        with _TYPE_CACHE_LOCK:
+            for column_name in unknown_columns:
+                prediction = new_predictions.loc[column_name, "Predictions"]
+                known_types[column_name] = prediction
+                _TYPE_CACHE[keys[column_name]] = prediction
+            while len(_TYPE_CACHE) > TYPE_CACHE_SIZE:
+                _TYPE_CACHE.popitem(last=False)
+    predictions = [known_types[column_name] for column_name in data.columns]
+    return pd.DataFrame({"Predictions":predictions}, index=data.columns)
+
+
+def clear_type_cache():
+    """
+    Forgets every cached type decision.
+
+    Returns
+    -------
+    None
+    """
+    with _TYPE_CACHE_LOCK:
+        _TYPE_CACHE.clear()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Ensemble backends benchmark.
+
+Every backend imputes the bundled datasets having missing values. The script
+reports the time spent fitting the ensemble models, the total training time
+and the imputation error against the complete versions of the datasets:
+    - numerical features: root mean squared error divided by the standard
+      deviation of the feature(NRMSE)
+    - categorical features: proportion of wrong modalities
+
+Usage:
+    python benchmarks/ensemble_backends.py [--backends random_forest extra_trees]
+                                           [--datasets advertising loan]
+                                           [--n-estimators 50] [--seed 0]
+"""
+from os.path import abspath, dirname, join
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+
+
+DATA_PATH = join(ROOT, "MissingValuesHandler", "data")
+#name -> (file with missing values, complete file, target variable, decimals)
+DATASETS = {"advertising":("Advertising.csv", "Advertising_no_nan.csv",
+                           "sales", 1),
+            "loan":("Loan_approval.csv", "Loan_approval_no_nan.csv",
+                    "Loan_Status", 0),
+            "scoring":("scoring.csv", "scoring_no_nan.csv", "Status", 0)}
+
+
+def imputation_error(data, imputed_data, complete_data, features_type):
+    """
+    Parameters
+    ----------
+    data : pandas.core.frame.DataFrame
+        Data with missing values.
+    imputed_data : pandas.core.frame.DataFrame
+
+    complete_data : pandas.core.frame.DataFrame
+
+    features_type : pandas.core.frame.DataFrame
+        Type predictions of the features("Predictions" column).
+
+    Returns
+    -------
+    nrmse : float
+        Mean over the numerical features having missing values(nan if none).
+    error_rate : float
+        Over every categorical missing value(nan if none).
+    """
+    nrmses, wrong, total = [], 0, 0
+    for feature_name in features_type.index:
+        missing = data[feature_name].isnull().values
+        if not missing.any():
+            continue
+        imputed = imputed_data[feature_name].values[missing]
+        truth = complete_data[feature_name].values[missing]
+        if features_type.loc[feature_name, "Predictions"] == "numerical":
+            scale = complete_data[feature_name].std() or 1
+            squared_errors = (imputed.astype(float) - truth.astype(float))**2
+            nrmses.append(np.sqrt(np.mean(squared_errors)) / scale)
+        else:
+            wrong += np.sum(imputed.astype(str) != truth.astype(str))
+            total += missing.sum()
+    nrmse = np.mean(nrmses) if nrmses else np.nan
+    error_rate = wrong / total if total else np.nan
+    return nrmse, error_rate
+
+
+def run(backend, dataset, n_estimators, seed, type_inference):
+    """
+    Returns
+    -------
+    dict
+        Fit time, training time and imputation errors.
+    """
+    nan_file, complete_file, target_variable_name, decimals = DATASETS[dataset]
+    data = pd.read_csv(join(DATA_PATH, nan_file))
+    complete_data = pd.read_csv(join(DATA_PATH, complete_file))[data.columns]
+    imputer = RandomForestImputer(data=data,
+                                  target_variable_name=target_variable_name,
+                                  training_resilience=2,
+                                  n_iterations_for_convergence=3,
+                                  type_inference=type_inference)
+    imputer.set_ensemble_model_parameters(n_estimators=n_estimators,
+                                          additional_estimators=10,
+                                          random_state=seed,
+                                          ensemble_backend=backend)
+    start = time.perf_counter()
+    imputed_data = imputer.train(decimals=decimals)
+    training_time = time.perf_counter() - start
+    fit_time = sum(event["wall_time"] for event in imputer.get_stage_events()
+                   if event["stage"] == "fitting and evaluating model")
+    nrmse, error_rate = imputation_error(data,
+                                         imputed_data,
+                                         complete_data,
+                                         imputer.get_features_type_predictions())
+    return {"fit_time":fit_time,
+            "training_time":training_time,
+            "nrmse":nrmse,
+            "error_rate":error_rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+",
+                        default=["random_forest", "extra_trees"])
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS),
+                        default=["advertising", "loan"])
+    parser.add_argument("--n-estimators", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--type-inference", default="heuristic")
+    args = parser.parse_args()
+
+    results = []
+    for dataset in args.datasets:
+        for backend in args.backends:
+            result = run(backend,
+                         dataset,
+                         args.n_estimators,
+                         args.seed,
+                         args.type_inference)
+            results.append({"dataset":dataset, "backend":backend, **result})
+    print(pd.DataFrame(results).round(3).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Import-time benchmark of the core imputer.
+
+Every measure is done in a fresh interpreter. The script fails(exit code 1)
+if the median import time goes above the budget or if one of the heavy
+modules that are only needed for plotting, MDS or neural type prediction is
+imported with the core.
+
+Usage:
+    python benchmarks/import_time.py [--runs 5] [--budget 3.0]
+"""
+from os.path import abspath, dirname
+import argparse
+import statistics
+import subprocess
+import sys
+import json
+
+
+MODULE = "MissingValuesHandler.missing_data_handler"
+FORBIDDEN_MODULES = ["tensorflow",
+                     "DataTypeIdentifier",
+                     "matplotlib",
+                     "mpl_toolkits.mplot3d",
+                     "sklearn.manifold"]
+SNIPPET = f"""
+import json, sys, time
+start = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {FORBIDDEN_MODULES!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure_once():
+    """
+    Returns
+    -------
+    dict
+        Import time in seconds and heavy modules loaded by the import.
+    """
+    output = subprocess.run([sys.executable, "-c", SNIPPET],
+                            cwd=dirname(dirname(abspath(__file__))),
+                            check=True,
+                            stdout=subprocess.PIPE,
+                            universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=3.0,
+                        help="Maximum median import time in seconds")
+    args = parser.parse_args()
+
+    measures = [measure_once() for _ in range(args.runs)]
+    median = statistics.median(measure["elapsed"] for measure in measures)
+    loaded = sorted({name for measure in measures
+                     for name in measure["loaded"]})
+    print(f"- import {MODULE}: median {median:.3f}s over {args.runs} runs "
+          f"(budget {args.budget:.3f}s)")
+    failed = False
+    if loaded:
+        print(f"- HEAVY MODULES IMPORTED WITH THE CORE: {loaded}")
+        failed = True
+    if median > args.budget:
+        print("- IMPORT TIME ABOVE BUDGET")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
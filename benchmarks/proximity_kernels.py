@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Proximity kernels micro-benchmark.
+
+scoring.csv is replicated up to --n-rows rows and a random forest is fitted on
+it. The per tree predictions are then turned into proximities with:
+    - legacy: one dense n*n matrix per tree and per predicted modality, filled
+      with broadcasting and summed(the former _fill_one_modality approach).
+      Run on --legacy-rows rows only since it needs n² memory per modality;
+      its time is extrapolated(n²) to --n-rows.
+    - mask: rows compared to every column with a boolean mask per tree.
+    - grouped: MissingValuesHandler.proximity.accumulate_proximities, samples
+      sorted by group once per tree.
+    - grouped parallel: parallel_accumulate_proximities, rows split between
+      --n-workers processes(shared memory).
+The legacy, grouped and grouped parallel results are checked to be equal.
+
+Usage:
+    python benchmarks/proximity_kernels.py [--n-rows 100000] [--n-trees 20]
+                                           [--legacy-rows 3000] [--n-workers -1]
+"""
+from os.path import abspath, dirname, join
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = dirname(dirname(abspath(__file__)))
+sys.path.insert(0, ROOT)
+import MissingValuesHandler.proximity as prox
+
+
+DATA = join(ROOT, "MissingValuesHandler", "data", "scoring.csv")
+TARGET = "Status"
+
+
+def load_data(n_rows):
+    """
+    Returns
+    -------
+    features : numpy.ndarray
+        Encoded features(missing values filled with the median/mode).
+    target : numpy.ndarray
+
+    nan_rows : numpy.ndarray
+        Positions of the rows having missing values.
+    """
+    data = pd.read_csv(DATA)
+    n_copies = int(np.ceil(n_rows / len(data)))
+    data = pd.concat([data]*n_copies, ignore_index=True).iloc[:n_rows]
+    nan_rows = np.flatnonzero(data.isnull().any(axis=1).values)
+    target = data.pop(TARGET)
+    target = target.fillna(target.mode()[0]).values
+    numerical = data.select_dtypes(include=[np.number])
+    numerical = numerical.fillna(numerical.median())
+    categorical = data.select_dtypes(exclude=[np.number])
+    categorical = categorical.fillna(categorical.mode().iloc[0])
+    features = pd.concat([numerical, pd.get_dummies(categorical)], axis=1)
+    return features.to_numpy(dtype=np.float32), target, nan_rows
+
+
+def legacy_proximities(predictions):
+    """
+    Former approach: a dense n*n matrix per tree and per predicted modality.
+    """
+    n_samples = predictions.shape[0]
+    proximity_matrix = np.zeros((n_samples, n_samples))
+    for prediction in predictions.T:
+        one_modality_matrices = []
+        for predicted_modality in np.unique(prediction):
+            one_modality_matrix = np.zeros((n_samples, n_samples))
+            idx_check = np.flatnonzero(prediction == predicted_modality)
+            one_modality_matrix[idx_check[:, None], idx_check] = 1
+            one_modality_matrices.append(one_modality_matrix)
+        proximity_matrix += sum(one_modality_matrices)
+    return proximity_matrix
+
+
+def mask_proximities(predictions, rows):
+    """
+    Rows compared to every column with a boolean mask per tree.
+    """
+    counts = np.zeros((len(rows), predictions.shape[0]), dtype=np.float32)
+    for prediction in predictions.T:
+        counts += prediction[rows, None] == prediction[None, :]
+    return counts
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n-rows", type=int, default=100000)
+    parser.add_argument("--n-trees", type=int, default=20)
+    parser.add_argument("--legacy-rows", type=int, default=3000)
+    parser.add_argument("--n-workers", type=int, default=-1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from sklearn.ensemble import RandomForestClassifier
+    features, target, nan_rows = load_data(args.n_rows)
+    forest = RandomForestClassifier(n_estimators=args.n_trees,
+                                    min_samples_leaf=20,
+                                    n_jobs=-1,
+                                    random_state=args.seed)
+    forest.fit(features, target)
+    predictions, predict_time = timed(prox.tree_predictions, forest, features)
+    groups, groups_time = timed(prox.group_ids, predictions)
+    print(f"- {args.n_rows} rows, {len(nan_rows)} with missing values, "
+          f"{args.n_trees} trees (predictions {predict_time:.2f}s, "
+          f"group ids {groups_time:.2f}s)")
+
+    results = []
+    #Legacy and grouped kernel on every row of a subset: exactness check
+    legacy_rows = min(args.legacy_rows, args.n_rows)
+    legacy, legacy_time = timed(legacy_proximities, predictions[:legacy_rows])
+    grouped, grouped_time = timed(prox.accumulate_proximities,
+                                  groups[:legacy_rows],
+                                  np.arange(legacy_rows))
+    if not np.array_equal(legacy, grouped):
+        print("- GROUPED KERNEL DIFFERS FROM THE LEGACY ONE")
+        return 1
+    extrapolation = (args.n_rows / legacy_rows)**2
+    results.append(("legacy(all rows)", legacy_rows, legacy_rows,
+                    legacy_time, legacy_time*extrapolation))
+    results.append(("grouped(all rows)", legacy_rows, legacy_rows,
+                    grouped_time, grouped_time*extrapolation))
+
+    #Rows having missing values against every row
+    _, mask_time = timed(mask_proximities, predictions, nan_rows)
+    results.append(("mask(missing rows)", len(nan_rows), args.n_rows,
+                    mask_time, mask_time))
+    grouped, grouped_time = timed(prox.accumulate_proximities,
+                                  groups,
+                                  nan_rows,
+                                  dtype=np.float32)
+    results.append(("grouped(missing rows)", len(nan_rows), args.n_rows,
+                    grouped_time, grouped_time))
+    parallel, parallel_time = timed(prox.parallel_accumulate_proximities,
+                                    groups,
+                                    nan_rows,
+                                    n_workers=args.n_workers,
+                                    dtype=np.float32)
+    if not np.array_equal(grouped, parallel):
+        print("- PARALLEL KERNEL DIFFERS FROM THE SEQUENTIAL ONE")
+        return 1
+    results.append(("grouped parallel(missing rows)", len(nan_rows),
+                    args.n_rows, parallel_time, parallel_time))
+    print(pd.DataFrame(results,
+                       columns=["kernel", "rows", "columns", "seconds",
+                                f"seconds at {args.n_rows} rows"])
+          .round(3)
+          .to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,5 @@
 # -*- coding: utf-8 -*-
-from distutils.core import setup
+from setuptools import setup
 setup(
   name = 'MissingValuesHandler',         # How you named your package folder (MyLib)
   packages = ['MissingValuesHandler'],   # Chose the same as "name"
@@ -13,13 +13,14 @@ setup(
   keywords = ['missing values', 'nan values', 'RandomForest', 'random forest imputer'],   # Keywords that define your package best
   install_requires=[            # I get to this in a second
           'scikit-learn',
-          'tensorflow',
+          'scipy',
           'numpy',
           'pandas',
           'matplotlib',
-          'progressbar',
-          'DataTypeIdentifier',
       ],
+  extras_require={              # Only for the "neural" type inference
+          'dl': ['tensorflow', 'DataTypeIdentifier'],
+      },
   classifiers=[
     'Development Status :: 3 - Alpha',      # Chose either "3 - Alpha", "4 - Beta" or "5 - Production/Stable" as the current state of your package
     'Intended Audience :: Developers',      # Define that your audience are developers
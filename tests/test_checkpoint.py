@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import os
+import pytest
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+def make_imputer(file_name, target_variable_name):
+    data = read_csv(os.path.join(DATA_DIRECTORY, file_name))
+    imputer = RandomForestImputer(data=data,
+                                  target_variable_name=target_variable_name,
+                                  n_iterations_for_convergence=3,
+                                  type_inference="heuristic")
+    imputer.set_ensemble_model_parameters(n_estimators=20,
+                                          additional_estimators=5,
+                                          random_state=0)
+    return imputer
+
+
+@pytest.mark.parametrize("file_name, target_variable_name, decimals", 
+                         [("Loan_approval.csv", "Loan_Status", 0),
+                          ("Advertising.csv", "sales", 1)])
+def test_resume_gives_the_same_dataset(tmp_path, 
+                                       file_name, 
+                                       target_variable_name, 
+                                       decimals):
+    expected = make_imputer(file_name, target_variable_name).train(
+                   decimals=decimals, 
+                   verbose=False,
+                   checkpoint_dir=str(tmp_path / "full"))
+    #Training interrupted after the checkpoint of the first round
+    checkpoint_dir = str(tmp_path / "interrupted")
+    imputer = make_imputer(file_name, target_variable_name)
+    imputer._print_messages = False
+    stages = imputer._training_stages(decimals, 0, 0, None, None, None, 
+                                      checkpoint_dir)
+    for stage in stages:
+        if stage == "checking convergence":
+            break
+    stages.close()
+    assert os.listdir(checkpoint_dir)
+    resumed = make_imputer(file_name, target_variable_name).resume(
+                  checkpoint_dir, 
+                  verbose=False)
+    assert resumed.equals(expected)
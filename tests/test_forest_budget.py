@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import os
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+class BudgetRecordingImputer(RandomForestImputer):
+    """
+    Records the forest budget of every ensemble model built.
+    """
+    def _build_ensemble_model(self):
+        self.budgets.append(self._forest_budget)
+        super()._build_ensemble_model()
+
+
+def test_full_forest_is_reached_with_default_resilience():
+    data = read_csv(os.path.join(DATA_DIRECTORY, "Advertising.csv"))
+    imputer = BudgetRecordingImputer(data=data,
+                                     target_variable_name="sales",
+                                     n_iterations_for_convergence=3,
+                                     type_inference="heuristic")
+    imputer.budgets = []
+    imputer.set_ensemble_model_parameters(n_estimators=20,
+                                          additional_estimators=5,
+                                          random_state=0,
+                                          progressive_budget=True,
+                                          initial_budget=0.25)
+    #Remaining values stall on the partial forests
+    imputer.set_convergence_parameters(tolerance=1e-9)
+    imputer.train()
+    assert imputer.budgets[0] == 0.25
+    assert imputer.budgets == sorted(imputer.budgets)
+    assert imputer.budgets[-1] == 1.0
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import os
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+def make_imputer(file_name="Loan_approval.csv", 
+                 target_variable_name="Loan_Status",
+                 random_state=0):
+    data = read_csv(os.path.join(DATA_DIRECTORY, file_name))
+    imputer = RandomForestImputer(data=data,
+                                  target_variable_name=target_variable_name,
+                                  n_iterations_for_convergence=3,
+                                  type_inference="heuristic")
+    imputer.set_ensemble_model_parameters(n_estimators=10,
+                                          additional_estimators=5,
+                                          random_state=random_state)
+    return imputer
+
+
+def test_landmarks_follow_parameters_and_sample_size():
+    imputer = make_imputer()
+    imputer.set_proximity_parameters(n_landmarks=300)
+    imputer.train()
+    assert len(imputer.get_landmarks()) == 300
+    imputer.set_proximity_parameters(n_landmarks=50)
+    imputer.train()
+    assert len(imputer.get_landmarks()) == 50
+    #Landmarks of the previous training index a larger frame
+    imputer.train(sample_size=0.3)
+    landmarks = imputer.get_landmarks()
+    assert len(landmarks) == 50
+    assert landmarks.isin(imputer._features.index).all()
+
+
+def test_stratified_landmarks_sum_up_to_n_landmarks():
+    #Rounding the 10 quantile bins one by one gave 65 landmarks
+    imputer = make_imputer("Advertising.csv", "sales")
+    imputer.set_proximity_parameters(n_landmarks=63)
+    imputer.train()
+    assert len(imputer.get_landmarks()) == 63
+
+
+def test_random_state_0_is_not_42():
+    landmarks = []
+    for random_state in (0, 42):
+        imputer = make_imputer(random_state=random_state)
+        imputer.set_proximity_parameters(n_landmarks=50)
+        imputer.train()
+        landmarks.append(set(imputer.get_landmarks()))
+    assert landmarks[0] != landmarks[1]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import os
+import pytest
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+import MissingValuesHandler.custom_exceptions as customs
+import MissingValuesHandler.constants as const
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+@pytest.mark.parametrize("proximity_parameters", [{"missing_rows_only":True},
+                                                  {"n_landmarks":100}])
+@pytest.mark.parametrize("method", [const.SMACOF, 
+                                    const.CLASSICAL, 
+                                    const.LANDMARK])
+def test_non_square_distance_matrix_is_rejected(proximity_parameters, method):
+    data = read_csv(os.path.join(DATA_DIRECTORY, "Loan_approval.csv"))
+    imputer = RandomForestImputer(data=data,
+                                  target_variable_name="Loan_Status",
+                                  n_iterations_for_convergence=3,
+                                  type_inference="heuristic")
+    imputer.set_ensemble_model_parameters(n_estimators=10,
+                                          additional_estimators=5,
+                                          random_state=0)
+    imputer.set_proximity_parameters(**proximity_parameters)
+    imputer.train()
+    with pytest.raises(customs.DistanceMatrixShapeError):
+        imputer.get_mds_coordinates(2, 
+                                    imputer.get_distance_matrix(), 
+                                    method=method)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from sklearn.ensemble import (RandomForestClassifier,
+                              RandomForestRegressor,
+                              ExtraTreesClassifier,
+                              ExtraTreesRegressor)
+import MissingValuesHandler.proximity as prox
+
+
+def make_groups(n_samples=300, n_trees=12, random_state=0):
+    """
+    Group ids of trees having a few large groups(dense rows of the kernel)
+    and trees having many small ones(scattered adds).
+    """
+    random_generator = np.random.RandomState(random_state)
+    n_groups = [3 if tree % 2 else 60 for tree in range(n_trees)]
+    return np.column_stack([random_generator.randint(n_group, size=n_samples)
+                            for n_group in n_groups]).astype(np.int32)
+
+
+def brute_force_proximities(groups, rows, columns):
+    return (groups[rows][:, None, :] ==
+            groups[columns][None, :, :]).sum(axis=2).astype(np.float64)
+
+
+ROWS = np.array([5, 0, 17, 17, 299, 42])
+COLUMNS = np.arange(10, 250, 3)
+
+
+@pytest.mark.parametrize("columns", [None, COLUMNS])
+@pytest.mark.parametrize("storage", ["array", "memmap"])
+def test_accumulate_proximities_is_exact(columns, storage):
+    groups = make_groups()
+    expected_columns = np.arange(len(groups)) if columns is None else columns
+    expected = brute_force_proximities(groups, ROWS, expected_columns)
+    out = None
+    if storage == "memmap":
+        out = prox.memmap_accumulator(expected.shape)
+    proximities = prox.accumulate_proximities(groups, ROWS, columns, out=out)
+    np.testing.assert_array_equal(proximities, expected)
+    if out is not None:
+        assert proximities is out
+
+
+@pytest.mark.parametrize("columns", [None, COLUMNS])
+def test_parallel_accumulate_proximities_is_exact(columns):
+    groups = make_groups()
+    expected_columns = np.arange(len(groups)) if columns is None else columns
+    expected = brute_force_proximities(groups, ROWS, expected_columns)
+    proximities = prox.parallel_accumulate_proximities(groups,
+                                                       ROWS,
+                                                       columns,
+                                                       n_workers=2)
+    np.testing.assert_array_equal(proximities, expected)
+
+
+@pytest.mark.parametrize("columns", [None, COLUMNS])
+def test_top_k_proximities_keeps_the_largest_counts(columns):
+    groups = make_groups()
+    k = 7
+    dense = prox.accumulate_proximities(groups, ROWS, columns)
+    top_k = prox.top_k_proximities(groups, ROWS, columns, k=k)
+    assert top_k.shape == dense.shape
+    assert np.all(np.diff(top_k.indptr) == k)
+    for row in range(len(ROWS)):
+        stored = top_k[row]
+        #Ties can be broken differently: the kept counts must be the largest
+        np.testing.assert_array_equal(np.sort(stored.data)[::-1],
+                                      np.sort(dense[row])[::-1][:k])
+        np.testing.assert_array_equal(stored.data, dense[row, stored.indices])
+
+
+ESTIMATORS = [RandomForestClassifier,
+              RandomForestRegressor,
+              ExtraTreesClassifier,
+              ExtraTreesRegressor]
+
+
+def fit(Estimator):
+    random_generator = np.random.RandomState(0)
+    features = random_generator.normal(size=(200, 5))
+    target = features[:, 0] + features[:, 1]**2
+    if Estimator in (RandomForestClassifier, ExtraTreesClassifier):
+        target = np.digitize(target, [-1, 0.5, 2])
+    estimator = Estimator(n_estimators=15,
+                          min_samples_leaf=3,
+                          random_state=0)
+    return estimator.fit(features, target), features
+
+
+@pytest.mark.parametrize("Estimator", ESTIMATORS)
+def test_leaf_groups_match_tree_predictions(Estimator):
+    estimator, features = fit(Estimator)
+    leaves = prox.tree_leaves(estimator, features)
+    expected = prox.group_ids(prox.tree_predictions(estimator, features))
+    np.testing.assert_array_equal(prox.leaf_groups(estimator, leaves),
+                                  expected)
+
+
+@pytest.mark.parametrize("Estimator", ESTIMATORS)
+def test_forest_predictions_match_predict(Estimator):
+    estimator, features = fit(Estimator)
+    leaves = prox.tree_leaves(estimator, features)
+    predictions = prox.forest_predictions(estimator, leaves)
+    if Estimator in (RandomForestClassifier, ExtraTreesClassifier):
+        np.testing.assert_array_equal(predictions, estimator.predict(features))
+    else:
+        np.testing.assert_allclose(predictions, estimator.predict(features))
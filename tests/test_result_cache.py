@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import os
+import pickle
+from MissingValuesHandler.result_cache import ResultCache
+
+
+class Renamed():
+    pass
+
+
+def test_unreadable_entry_is_a_miss_and_removed(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("key", Renamed())
+    #Entry written by a version having a class since renamed
+    payload = pickle.dumps(Renamed()).replace(b"Renamed", b"Removed")
+    with open(cache._entry_path("key"), "wb") as file:
+        file.write(payload)
+    assert cache.get("key") is None
+    assert not os.path.exists(cache._entry_path("key"))
+
+
+def test_entry_evicted_after_read_is_still_returned(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    cache.put("key", [1, 2])
+    def utime(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(os, "utime", utime)
+    assert cache.get("key") == [1, 2]
+
+
+def test_key_depends_on_library_versions(monkeypatch):
+    from pandas import DataFrame
+    from MissingValuesHandler.missing_data_handler import RandomForestImputer
+    import MissingValuesHandler.constants as const
+    data = DataFrame({"x":[1.0, None, 3.0, 4.0], "y":[0, 1, 0, 1]})
+    imputer = RandomForestImputer(data, "y", type_inference="heuristic")
+    key = imputer._result_cache_key(0, 0, 0)
+    assert imputer._result_cache_key(0, 0, 0) == key
+    monkeypatch.setattr(const, "VERSION", const.VERSION + ".post1")
+    assert imputer._result_cache_key(0, 0, 0) != key
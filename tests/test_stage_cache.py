@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import os
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+class StageRecordingImputer(RandomForestImputer):
+    """
+    Records the preprocessing stages restored from the previous training.
+    """
+    def _run_stage(self, stage, key, attributes, method, **kwargs):
+        skipped = super()._run_stage(stage, key, attributes, method, **kwargs)
+        if skipped:
+            self.skipped_stages.append(stage)
+        return skipped
+
+
+def make_imputer():
+    data = read_csv(os.path.join(DATA_DIRECTORY, "Loan_approval.csv"))
+    imputer = StageRecordingImputer(data=data,
+                                    target_variable_name="Loan_Status",
+                                    n_iterations_for_convergence=3,
+                                    type_inference="heuristic")
+    imputer.skipped_stages = []
+    imputer.set_ensemble_model_parameters(n_estimators=10,
+                                          additional_estimators=5,
+                                          random_state=0)
+    return imputer
+
+
+def test_restored_stages_give_the_same_output_as_a_fresh_imputer():
+    #(encoding parameters, arguments of train(), stages restored from the 
+    #previous training) of successive trainings
+    every_stage_but_bins = ["data sampling", 
+                            "variables name validity",
+                            "isolating samples with no target value",
+                            "predicting feature type",
+                            "predicting target variable type",
+                            "retrieving nan coordinates",
+                            "computing feature scales",
+                            "making initial guesses"]
+    every_stage = every_stage_but_bins[:-1] + ["computing bin edges",
+                                               "making initial guesses"]
+    trainings = [({}, {}, []),
+                 ({"n_bins":8}, {}, every_stage_but_bins),
+                 ({"n_bins":8, "max_one_hot_cardinality":2,
+                   "high_cardinality_encoding":"frequency"}, {}, every_stage),
+                 #Every stage depends on the sample
+                 ({"n_bins":8}, {"sample_size":0.5}, []),
+                 ({}, {"sample_size":0.5}, every_stage_but_bins)]
+    imputer = make_imputer()
+    for encoding_parameters, arguments, restored_stages in trainings:
+        imputer.set_encoding_parameters(**encoding_parameters)
+        imputer.skipped_stages.clear()
+        reused = imputer.train(verbose=False, **arguments)
+        assert imputer.skipped_stages == restored_stages
+        fresh_imputer = make_imputer()
+        fresh_imputer.set_encoding_parameters(**encoding_parameters)
+        fresh = fresh_imputer.train(verbose=False, **arguments)
+        assert reused.equals(fresh)
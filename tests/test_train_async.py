@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from pandas import read_csv
+from MissingValuesHandler.missing_data_handler import RandomForestImputer
+import MissingValuesHandler.custom_exceptions as customs
+
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__),
+                              os.pardir,
+                              "MissingValuesHandler",
+                              "data")
+
+
+def make_imputer():
+    data = read_csv(os.path.join(DATA_DIRECTORY, "Advertising.csv"))
+    imputer = RandomForestImputer(data=data,
+                                  target_variable_name="sales",
+                                  n_iterations_for_convergence=3,
+                                  type_inference="heuristic")
+    imputer.set_ensemble_model_parameters(n_estimators=10,
+                                          additional_estimators=5,
+                                          random_state=0)
+    return imputer
+
+
+def test_process_pool_is_rejected():
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(customs.AsyncExecutorError):
+            asyncio.run(make_imputer().train_async(executor=executor))
+
+
+def test_bounded_queue_keeps_the_latest_events():
+    async def train():
+        progress_queue = asyncio.Queue(maxsize=2)
+        final_dataset = await make_imputer().train_async(
+                            progress_queue=progress_queue)
+        events = []
+        while not progress_queue.empty():
+            events.append(progress_queue.get_nowait())
+        return final_dataset, events
+    final_dataset, events = asyncio.run(train())
+    assert len(events) == 2 and events[-1] is None
+    expected = make_imputer().train()
+    assert final_dataset.equals(expected)
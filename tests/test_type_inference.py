@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import MissingValuesHandler.type_inference as ti
+
+
+def test_changed_column_is_predicted_again():
+    ti.clear_type_cache()
+    backend = ti.HeuristicTypeInference()
+    data = pd.DataFrame({"x":[1.0, 2.0, 3.0]*400})
+    first = ti.predict_types(data, backend).loc["x", "Predictions"]
+    data.loc[1, "x"] = 2.5
+    data.loc[2, "x"] = 7.25
+    expected = backend.predict(data).loc["x", "Predictions"]
+    assert expected != first
+    assert ti.predict_types(data, backend).loc["x", "Predictions"] == expected
+
+
+def test_type_cache_is_bounded(monkeypatch):
+    ti.clear_type_cache()
+    monkeypatch.setattr(ti, "TYPE_CACHE_SIZE", 3)
+    backend = ti.HeuristicTypeInference()
+    for shift in range(5):
+        ti.predict_types(pd.DataFrame({"x":[shift, 1, 2]}), backend)
+    assert len(ti._TYPE_CACHE) == 3